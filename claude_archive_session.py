@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Claude session archiver - moves cold sessions out of ~/.claude/projects
+into xz-compressed archives and restores them on demand.
+
+Each session becomes ~/.claude/session-archive/<project>/<sessionId>.tar.xz
+(transcript plus any agent subdirectory). The project's manifest.json
+keeps the session metadata and a short preview of the last exchanges, so
+the pickers and search can list archived sessions without decompressing.
+claude_sessions.py restores an archived session before resuming it.
+
+  claude_archive_session.py                      pick sessions to archive
+  claude_archive_session.py --older-than 60d -y  archive by policy
+  claude_archive_session.py --restore            pick sessions to restore
+  claude_archive_session.py --list               list archived sessions
+"""
+
+import argparse
+import json
+import os
+import sys
+import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import claude_delete_session as cds
+import claude_session_index as csi
+
+
+# Worker threads compressing sessions in parallel (lzma releases the GIL)
+ARCHIVE_JOBS = 4
+ARCHIVE_SUFFIX = ".tar.xz"
+
+# Session fields carried over into the manifest
+MANIFEST_FIELDS = ["sessionId", "projectPath", "sessionName", "modified", "projectDir"]
+
+
+def find_index_entry(session: dict) -> Optional[dict]:
+    """Return the session's raw sessions-index.json entry, if it is indexed."""
+    index_file = session.get("indexFile", "")
+    if not index_file:
+        return None
+    try:
+        with open(index_file, "r") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return None
+
+    for entry in data.get("entries", []):
+        if entry.get("sessionId") == session["sessionId"]:
+            return entry
+    return None
+
+
+def archive_session(session: dict) -> Optional[dict]:
+    """Compress one session into its project archive dir. Returns its manifest entry."""
+    session_id = session["sessionId"]
+    project_dir = Path(session["projectDir"])
+    jsonl_path = Path(csi.transcript_path(session))
+    if not jsonl_path.exists():
+        return None
+
+    archive_dir = csi.ARCHIVE_DIR / project_dir.name
+    archive_path = archive_dir / f"{session_id}{ARCHIVE_SUFFIX}"
+    tmp_path = archive_dir / f".{session_id}.tmp"
+
+    try:
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        size = jsonl_path.stat().st_size
+        preview = [
+            [role, text[:csi.PREVIEW_CHARS]]
+            for role, text in csi.read_tail_messages(str(jsonl_path), csi.PREVIEW_MESSAGES)
+        ]
+
+        with tarfile.open(tmp_path, "w:xz") as tar:
+            tar.add(jsonl_path, arcname=jsonl_path.name)
+            session_dir = project_dir / session_id
+            if session_dir.is_dir():
+                tar.add(session_dir, arcname=session_id)
+        os.replace(tmp_path, archive_path)
+    except (OSError, tarfile.TarError):
+        if tmp_path.exists():
+            tmp_path.unlink()
+        return None
+
+    entry = {field: session.get(field, "") for field in MANIFEST_FIELDS}
+    entry.update({
+        "archived": True,
+        "archivePath": str(archive_path),
+        "archivedAt": time.time(),
+        "size": size,
+        "preview": preview,
+        "indexEntry": find_index_entry(session),
+    })
+    return entry
+
+
+def update_manifests(added: List[dict], removed: List[dict]) -> None:
+    """Apply manifest additions/removals, rewriting each project manifest once."""
+    by_dir: Dict[Path, tuple] = {}
+    for entry in added:
+        by_dir.setdefault(Path(entry["archivePath"]).parent, ([], set()))[0].append(entry)
+    for entry in removed:
+        by_dir.setdefault(Path(entry["archivePath"]).parent, ([], set()))[1].add(entry["sessionId"])
+
+    for archive_dir, (new_entries, removed_ids) in by_dir.items():
+        manifest = csi.load_manifest(archive_dir)
+        replaced = removed_ids | {e["sessionId"] for e in new_entries}
+        manifest["entries"] = [
+            e for e in manifest.get("entries", []) if e.get("sessionId") not in replaced
+        ] + new_entries
+        csi.write_json_atomic(str(archive_dir / csi.MANIFEST_NAME), manifest)
+
+
+def archive_sessions(sessions: List[dict]) -> int:
+    """Archive sessions, then delete the originals. Returns how many were archived."""
+    with ThreadPoolExecutor(max_workers=ARCHIVE_JOBS) as pool:
+        entries = list(pool.map(archive_session, sessions))
+
+    archived = [(s, e) for s, e in zip(sessions, entries) if e]
+    if not archived:
+        return 0
+
+    # Manifest first: originals are only removed once the archive is listed
+    try:
+        update_manifests([e for _, e in archived], [])
+    except OSError as e:
+        print(f"Failed to write archive manifest: {e}")
+        return 0
+
+    cds.delete_sessions([s for s, _ in archived])
+    return len(archived)
+
+
+def restore_session(session: dict) -> bool:
+    """Extract an archived session back into its project dir and re-index it."""
+    archive_path = session.get("archivePath", "")
+    project_dir = Path(session["projectDir"])
+
+    try:
+        project_dir.mkdir(parents=True, exist_ok=True)
+        with tarfile.open(archive_path, "r:xz") as tar:
+            if hasattr(tarfile, "data_filter"):
+                tar.extractall(project_dir, filter="data")
+            else:
+                tar.extractall(project_dir)
+    except (OSError, tarfile.TarError) as e:
+        print(f"Failed to restore {session['sessionId']}: {e}")
+        return False
+
+    index_entry = session.get("indexEntry")
+    if index_entry:
+        index_file = project_dir / "sessions-index.json"
+        try:
+            with open(index_file, "r") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            data = {"version": 1, "entries": []}
+        entries = data.setdefault("entries", [])
+        if not any(e.get("sessionId") == session["sessionId"] for e in entries):
+            entries.append(index_entry)
+            try:
+                csi.write_json_atomic(str(index_file), data)
+            except OSError as e:
+                print(f"Warning: could not re-index {session['sessionId']}: {e}")
+
+    # The session is usable again; a stale manifest entry or leftover
+    # archive only costs disk space, so report it and carry on
+    try:
+        update_manifests([], [session])
+        os.remove(archive_path)
+    except OSError as e:
+        print(f"Warning: restored {session['sessionId']} but could not clean up its archive: {e}")
+    return True
+
+
+def list_archived(sessions: List[dict]) -> None:
+    for s in sessions:
+        name = s["sessionName"].replace("\n", " ")
+        archived_at = time.strftime("%Y-%m-%d", time.localtime(s.get("archivedAt", 0)))
+        print(f"{archived_at}  {s.get('size', 0) / 1024 ** 2:8.1f}MB  {s['projectPath']}  {name}")
+
+
+def pick(sessions: List[dict], header: str) -> List[dict]:
+    """Multi-select sessions with gum."""
+    session_map, display_names = csi.build_session_map(sessions)
+    selected = cds.gum_multi_select(display_names, header)
+    return [session_map[name] for name in selected if name in session_map]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Claude session archiver")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--restore", action="store_true", help="Pick archived sessions to restore")
+    mode.add_argument("--list", action="store_true", help="List archived sessions")
+    cds.add_policy_args(parser, "Archive")
+    args = parser.parse_args()
+    if not (args.list or args.restore):
+        cds.check_policy_args(parser, args)
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+
+    if args.list or args.restore:
+        archived = csi.load_archived_sessions()
+        csi.sort_sessions(archived)
+        if not archived:
+            print("No archived Claude sessions")
+            sys.exit(1)
+        if args.list:
+            list_archived(archived)
+            return
+
+        to_restore = pick(archived, "Restore Claude Sessions (tab to select, enter to confirm)")
+        restored = sum(restore_session(s) for s in to_restore)
+        print(f"{restored}/{len(to_restore)} sessions restored")
+        return
+
+    sessions = csi.load_sessions()
+    if not sessions:
+        print("No Claude sessions found")
+        sys.exit(1)
+
+    if cds.has_policy(args):
+        cds.prune(args, sessions, verb="Archive", apply=archive_sessions)
+        return
+
+    candidates = pick(sessions, "Archive Claude Sessions (tab to select, enter to confirm)")
+    if not candidates:
+        sys.exit(0)
+
+    names = [s["sessionName"].replace("\n", " ") for s in candidates]
+    if not cds.confirm_delete(len(candidates), names, verb="Archive"):
+        print("Cancelled")
+        sys.exit(0)
+
+    archived_count = archive_sessions(candidates)
+    print(f"{archived_count}/{len(candidates)} sessions archived")
+
+
+if __name__ == "__main__":
+    main()
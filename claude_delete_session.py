@@ -2,122 +2,29 @@
 """
 Claude session deleter - lists all Claude Code sessions with multi-select
 and deletes selected sessions after confirmation.
+
+Prune mode deletes every session matching an age and/or size policy,
+optionally limited to one project (--project, --dry-run and --yes are
+rejected without a policy):
+  claude_delete_session.py --older-than 30d --larger-than 50MB --project foo --dry-run
 """
 
+import argparse
 import json
 import os
+import shutil
 import subprocess as sp
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
-
-
-CLAUDE_PROJECTS_DIR = Path.home() / ".claude" / "projects"
-
-
-def parse_session_jsonl(jsonl_path: Path) -> Optional[dict]:
-    """Parse a session .jsonl file to extract session info."""
-    custom_title = ""
-    first_prompt = ""
-    project_path = ""
-    session_id = jsonl_path.stem
-
-    try:
-        with open(jsonl_path, "r") as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-
-                if entry.get("type") == "custom-title":
-                    custom_title = entry.get("customTitle", "")
-
-                if entry.get("type") == "user" and not project_path:
-                    project_path = entry.get("cwd", "")
-
-                if entry.get("type") == "user" and not first_prompt:
-                    msg = entry.get("message", {})
-                    content = msg.get("content", [])
-                    for item in content:
-                        if isinstance(item, dict) and item.get("type") == "text":
-                            first_prompt = item.get("text", "")[:60]
-                            break
-                        elif isinstance(item, str):
-                            first_prompt = item[:60]
-                            break
-
-        modified = jsonl_path.stat().st_mtime
-        session_name = custom_title or first_prompt or session_id
-        if project_path and session_id:
-            return {
-                "sessionId": session_id,
-                "projectPath": project_path,
-                "sessionName": session_name,
-                "modified": modified,
-                "jsonlPath": str(jsonl_path),
-                "projectDir": str(jsonl_path.parent),
-            }
-    except (IOError, OSError):
-        pass
-    return None
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
+import claude_session_index as csi
 
-def get_sessions() -> List[dict]:
-    """Find and parse all sessions from index files and individual .jsonl files."""
-    sessions = []
-    indexed_sessions = set()
 
-    if not CLAUDE_PROJECTS_DIR.exists():
-        return sessions
-
-    for project_dir in CLAUDE_PROJECTS_DIR.iterdir():
-        if not project_dir.is_dir():
-            continue
-
-        index_file = project_dir / "sessions-index.json"
-
-        if index_file.exists():
-            try:
-                with open(index_file, "r") as f:
-                    data = json.load(f)
-
-                for entry in data.get("entries", []):
-                    session_id = entry.get("sessionId", "")
-                    project_path = entry.get("projectPath", "")
-                    custom_title = entry.get("customTitle", "")
-                    summary = entry.get("summary", "")
-                    first_prompt = entry.get("firstPrompt", "")[:60]
-                    modified = entry.get("modified", "")
-                    full_path = entry.get("fullPath", "")
-
-                    session_name = custom_title or summary or first_prompt
-
-                    if project_path and session_id:
-                        indexed_sessions.add(session_id)
-                        sessions.append({
-                            "sessionId": session_id,
-                            "projectPath": project_path,
-                            "sessionName": session_name,
-                            "modified": modified,
-                            "fullPath": full_path,
-                            "indexFile": str(index_file),
-                            "projectDir": str(project_dir),
-                        })
-            except (json.JSONDecodeError, IOError):
-                pass
-
-        for jsonl_file in project_dir.glob("*.jsonl"):
-            session_id = jsonl_file.stem
-            if session_id.startswith("agent-") or session_id in indexed_sessions:
-                continue
-
-            session = parse_session_jsonl(jsonl_file)
-            if session and len(session.get("sessionName", "")) >= 3:
-                sessions.append(session)
-
-    sessions.sort(key=lambda x: x.get("modified", 0) if isinstance(x.get("modified"), (int, float)) else 0, reverse=True)
-    return sessions
+# Worker threads used to remove session files concurrently
+DELETE_JOBS = 8
 
 
 def gum_multi_select(items: List[str], header: str = "Delete Claude Sessions (tab to select, enter to confirm)") -> List[str]:
@@ -142,7 +49,7 @@ def gum_multi_select(items: List[str], header: str = "Delete Claude Sessions (ta
     return [line for line in output.strip().split("\n") if line]
 
 
-def confirm_delete(count: int, names: List[str]) -> bool:
+def confirm_delete(count: int, names: List[str], verb: str = "Delete") -> bool:
     """Ask for confirmation using gum."""
     preview = "\n".join(f"  - {n}" for n in names[:10])
     if count > 10:
@@ -151,73 +58,266 @@ def confirm_delete(count: int, names: List[str]) -> bool:
     result = sp.run(
         [
             "gum", "confirm",
-            f"Delete {count} session(s)?\n{preview}",
-            "--affirmative", "Delete",
+            f"{verb} {count} session(s)?\n{preview}",
+            "--affirmative", verb,
             "--negative", "Cancel",
         ],
     )
     return result.returncode == 0
 
 
-def delete_session(session: dict) -> bool:
-    """Delete the session file and remove from index."""
+def remove_session_files(session: dict) -> bool:
+    """Delete a session's .jsonl and its agent subdirectory. Returns True on success."""
     session_id = session["sessionId"]
     project_dir = session.get("projectDir", "")
 
-    # Delete the session .jsonl file
-    full_path = session.get("fullPath", "")
-    if full_path and os.path.exists(full_path):
-        os.remove(full_path)
-    else:
-        # Try finding the .jsonl directly
-        jsonl_path = session.get("jsonlPath", "")
-        if jsonl_path and os.path.exists(jsonl_path):
-            os.remove(jsonl_path)
-        elif project_dir:
-            candidate = Path(project_dir) / f"{session_id}.jsonl"
-            if candidate.exists():
-                os.remove(candidate)
-
-    # Also delete any agent subdirectory for this session
-    if project_dir:
-        session_dir = Path(project_dir) / session_id
-        if session_dir.is_dir():
-            import shutil
-            shutil.rmtree(session_dir)
-
-    # Update the index file if this session was indexed
-    index_file = session.get("indexFile", "")
-    if index_file and os.path.exists(index_file):
-        try:
-            with open(index_file, "r") as f:
-                data = json.load(f)
-
-            data["entries"] = [e for e in data.get("entries", []) if e.get("sessionId") != session_id]
-
-            with open(index_file, "w") as f:
-                json.dump(data, f, indent=2)
-        except (json.JSONDecodeError, IOError):
-            pass
+    try:
+        # Delete the session .jsonl file
+        full_path = session.get("fullPath", "")
+        if full_path and os.path.exists(full_path):
+            os.remove(full_path)
+        else:
+            # Try finding the .jsonl directly
+            jsonl_path = session.get("jsonlPath", "")
+            if jsonl_path and os.path.exists(jsonl_path):
+                os.remove(jsonl_path)
+            elif project_dir:
+                candidate = Path(project_dir) / f"{session_id}.jsonl"
+                if candidate.exists():
+                    os.remove(candidate)
+
+        # Also delete any agent subdirectory for this session
+        if project_dir:
+            session_dir = Path(project_dir) / session_id
+            if session_dir.is_dir():
+                shutil.rmtree(session_dir)
+    except OSError:
+        return False
 
     return True
 
 
+def rewrite_index(index_file: str, session_ids: Set[str]) -> None:
+    """Drop session_ids from a sessions-index.json in a single atomic rewrite."""
+    try:
+        with open(index_file, "r") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return
+
+    entries = data.get("entries", [])
+    data["entries"] = [e for e in entries if e.get("sessionId") not in session_ids]
+    if len(data["entries"]) == len(entries):
+        return
+
+    try:
+        csi.write_json_atomic(index_file, data)
+    except OSError:
+        pass
+
+
+def delete_sessions(sessions: List[dict], jobs: int = DELETE_JOBS) -> List[bool]:
+    """Delete sessions in bulk. Returns a success flag per session, in order.
+
+    Files are removed concurrently. Each project's sessions-index.json is
+    then rewritten once, dropping only the sessions whose files are gone.
+    """
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(remove_session_files, sessions))
+
+    by_index: Dict[str, Set[str]] = {}
+    for session, ok in zip(sessions, results):
+        index_file = session.get("indexFile", "")
+        if ok and index_file and os.path.exists(index_file):
+            by_index.setdefault(index_file, set()).add(session["sessionId"])
+
+    for index_file, session_ids in by_index.items():
+        rewrite_index(index_file, session_ids)
+
+    return results
+
+
+def parse_age(value: str) -> float:
+    """Parse an age like 90m, 12h, 30d or 2w into seconds."""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    value = value.strip().lower()
+    try:
+        if value and value[-1] in units:
+            return float(value[:-1]) * units[value[-1]]
+        return float(value) * units["d"]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid age: {value!r} (e.g. 30d, 12h)")
+
+
+def parse_size(value: str) -> int:
+    """Parse a size like 500K, 50MB or 1G into bytes."""
+    units = {"": 1, "b": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+    value = value.strip().lower()
+    number = value.rstrip("kmgb")
+    unit = value[len(number):].rstrip("b") or ""
+    if unit not in units:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r} (e.g. 50MB)")
+    try:
+        return int(float(number) * units[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r} (e.g. 50MB)")
+
+
+def transcript_size(session: dict) -> int:
+    try:
+        return os.path.getsize(csi.transcript_path(session))
+    except OSError:
+        return 0
+
+
+def session_mtime(session: dict) -> Optional[float]:
+    """Last modification time of a session, or None if it cannot be known.
+
+    Falls back to the transcript's mtime when the catalog has no usable
+    modified value, so such sessions are never taken as infinitely old.
+    """
+    modified = csi.modified_timestamp(session.get("modified"))
+    if modified > 0:
+        return modified
+    try:
+        return os.path.getmtime(csi.transcript_path(session))
+    except OSError:
+        return None
+
+
+def select_prune_candidates(
+    sessions: List[dict],
+    older_than: Optional[float],
+    larger_than: Optional[int],
+    project: Optional[str],
+) -> List[Tuple[dict, int]]:
+    """Return (session, size) for sessions matching every given policy."""
+    now = time.time()
+    candidates = []
+    for session in sessions:
+        project_dir_name = os.path.basename(session.get("projectDir", ""))
+        if project and project not in session.get("projectPath", "") and project not in project_dir_name:
+            continue
+        if older_than is not None:
+            modified = session_mtime(session)
+            if modified is None or now - modified < older_than:
+                continue
+        size = transcript_size(session)
+        if larger_than is not None and size < larger_than:
+            continue
+        candidates.append((session, size))
+    return candidates
+
+
+def has_policy(args: argparse.Namespace) -> bool:
+    return args.older_than is not None or args.larger_than is not None
+
+
+def add_policy_args(parser: argparse.ArgumentParser, verb: str) -> None:
+    """Add the --older-than/--larger-than/--project/-n/-y policy flags."""
+    parser.add_argument(
+        "--older-than",
+        type=parse_age,
+        metavar="AGE",
+        help=f"{verb} sessions not modified for AGE (e.g. 30d, 12h)",
+    )
+    parser.add_argument(
+        "--larger-than",
+        type=parse_size,
+        metavar="SIZE",
+        help=f"{verb} sessions whose transcript is at least SIZE (e.g. 50MB)",
+    )
+    parser.add_argument(
+        "--project",
+        help="With --older-than/--larger-than: only sessions whose project path "
+             "(or ~/.claude/projects dir) contains PROJECT",
+    )
+    parser.add_argument(
+        "-n", "--dry-run",
+        action="store_true",
+        help=f"List what a policy run would {verb.lower()} without changing anything",
+    )
+    parser.add_argument(
+        "-y", "--yes",
+        action="store_true",
+        help="Skip the confirmation prompt of a policy run",
+    )
+
+
+def check_policy_args(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Reject policy modifiers without a policy.
+
+    Without one the tools fall through to the interactive picker, which
+    would silently ignore --dry-run and really change things.
+    """
+    if has_policy(args):
+        return
+    for flag, value in (("--project", args.project), ("--dry-run", args.dry_run), ("--yes", args.yes)):
+        if value:
+            parser.error(f"{flag} requires --older-than or --larger-than")
+
+
+def prune(
+    args: argparse.Namespace,
+    sessions: List[dict],
+    verb: str = "Delete",
+    apply: Optional[Callable[[List[dict]], int]] = None,
+) -> None:
+    """Apply verb to every session matching the --older-than/--larger-than/--project policy.
+
+    apply takes the matching sessions and returns how many it handled;
+    it defaults to deleting them.
+    """
+    done_verb = f"{verb.lower()}d"
+    candidates = select_prune_candidates(sessions, args.older_than, args.larger_than, args.project)
+    if not candidates:
+        print(f"No sessions match the {verb.lower()} policy")
+        return
+
+    total = sum(size for _, size in candidates)
+    if args.dry_run:
+        now = time.time()
+        for session, size in candidates:
+            modified = session_mtime(session)
+            age = f"{(now - modified) / 86400:6.0f}d" if modified is not None else "     ?d"
+            name = session["sessionName"].replace("\n", " ")
+            print(f"{size / 1024 ** 2:8.1f}MB {age}  {session['projectPath']}  {name}")
+        print(f"\n{len(candidates)} session(s), {total / 1024 ** 2:.1f}MB would be {done_verb}")
+        return
+
+    names = [s["sessionName"].replace("\n", " ") for s, _ in candidates]
+    if not args.yes and not confirm_delete(len(candidates), names, verb=verb):
+        print("Cancelled")
+        sys.exit(0)
+
+    if apply is None:
+        count = sum(delete_sessions([s for s, _ in candidates]))
+    else:
+        count = apply([s for s, _ in candidates])
+    print(f"{count}/{len(candidates)} sessions {done_verb} ({total / 1024 ** 2:.1f}MB)")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Claude session deleter")
+    add_policy_args(parser, "Prune")
+    args = parser.parse_args()
+    check_policy_args(parser, args)
+    return args
+
+
 def main() -> None:
-    sessions = get_sessions()
+    args = parse_args()
+    sessions = csi.load_sessions()
 
     if not sessions:
         print("No Claude sessions found")
         sys.exit(1)
 
-    session_map = {}
-    display_names = []
-    for i, s in enumerate(sessions):
-        name = s["sessionName"].replace("\n", " ")
-        display_name = name
-        if name in session_map:
-            display_name = f"{name} ({i})"
-        session_map[display_name] = s
-        display_names.append(display_name)
+    if has_policy(args):
+        prune(args, sessions)
+        return
+
+    session_map, display_names = csi.build_session_map(sessions)
 
     selected = gum_multi_select(display_names)
 
@@ -238,9 +338,10 @@ def main() -> None:
         print("Cancelled")
         sys.exit(0)
 
+    results = delete_sessions([session for _, session in to_delete])
     deleted = 0
-    for name, session in to_delete:
-        if delete_session(session):
+    for (name, _), ok in zip(to_delete, results):
+        if ok:
             print(f"Deleted: {name}")
             deleted += 1
         else:
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Claude session benchmark - times session discovery against a synthetic
+~/.claude/projects tree.
+
+Generates a reproducible corpus (projects, sessions per project,
+transcript sizes, share of sessions listed in sessions-index.json) under
+a scratch HOME, then measures, each in a fresh interpreter:
+
+  discovery_cold   get_sessions() with no catalog cache
+  discovery_warm   get_sessions() with the catalog from the previous run
+  parse            parse_session_jsonl() over every transcript (MB/s)
+  picker startup   claude_sessions.py, claude_sessions_floater.py and
+                   claude_delete_session.py until they hand the list to
+                   gum (a stub gum on PATH records the time and cancels)
+
+Results are written as JSON; --compare prints the change against an
+earlier result file. Set CLAUDE_SESSION_DECODER to compare JSON backends.
+
+  claude_session_bench.py --projects 50 --sessions 100 --size-kb 300
+  claude_session_bench.py --root /tmp/corpus --compare old.json
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess as sp
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import claude_session_index as csi
+import claude_session_json as csj
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PICKER_SCRIPTS = {
+    "claude_sessions": ["claude_sessions.py", "--picker", "gum"],
+    "claude_sessions_floater": ["claude_sessions_floater.py", "--picker", "gum"],
+    "claude_delete_session": ["claude_delete_session.py"],
+}
+CORPUS_FILE = "corpus.json"
+WORDS = [
+    "fix", "parser", "daemon", "refactor", "tests", "cache", "index", "layout",
+    "session", "deploy", "config", "review", "build", "schema", "migration", "tab",
+]
+
+# Stub gum: note when the picker was reached, then cancel like Esc would
+FAKE_GUM = """#!/bin/sh
+date +%s.%N >> "$BENCH_GUM_LOG"
+cat > /dev/null
+exit 1
+"""
+
+DISCOVERY_SNIPPET = """
+import sys, time
+import claude_session_index as csi
+start = time.perf_counter()
+sessions = csi.get_sessions(int(sys.argv[1]))
+print(time.perf_counter() - start, len(sessions))
+"""
+
+PARSE_SNIPPET = """
+import time
+import claude_session_index as csi
+paths = [
+    p for d in csi.CLAUDE_PROJECTS_DIR.iterdir() for p in d.glob("*.jsonl")
+    if not p.stem.startswith("agent-")
+]
+total = sum(p.stat().st_size for p in paths)
+start = time.perf_counter()
+for p in paths:
+    csi.parse_session_jsonl(p)
+print(time.perf_counter() - start, total)
+"""
+
+
+# -- corpus --
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def timestamp(base: datetime, seconds: float) -> str:
+    return (base + timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def write_transcript(path: Path, cwd: str, session_id: str, target_bytes: int, rng: random.Random) -> dict:
+    """Write one transcript of roughly target_bytes. Returns its index entry."""
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(days=rng.randrange(365))
+    first_prompt = sentence(rng, 8)
+    custom_title = sentence(rng, 3) if rng.random() < 0.2 else ""
+    written = 0
+    turn = 0
+
+    with open(path, "w") as f:
+        while written < target_bytes or turn == 0:
+            prompt = first_prompt if turn == 0 else sentence(rng, rng.randint(5, 40))
+            user = {
+                "type": "user",
+                "cwd": cwd,
+                "sessionId": session_id,
+                "timestamp": timestamp(base, turn * 60),
+                "message": {"role": "user", "content": [{"type": "text", "text": prompt}]},
+            }
+            assistant = {
+                "type": "assistant",
+                "sessionId": session_id,
+                "timestamp": timestamp(base, turn * 60 + 30),
+                "message": {
+                    "role": "assistant",
+                    "content": [
+                        {"type": "text", "text": sentence(rng, rng.randint(20, 400))},
+                        {"type": "tool_use", "name": "Bash", "input": {"command": sentence(rng, 4)}},
+                    ],
+                    "usage": {"input_tokens": rng.randint(100, 5000), "output_tokens": rng.randint(10, 2000)},
+                },
+            }
+            for entry in (user, assistant):
+                line = json.dumps(entry) + "\n"
+                f.write(line)
+                written += len(line)
+            turn += 1
+
+        if custom_title:
+            f.write(json.dumps({"type": "custom-title", "customTitle": custom_title, "sessionId": session_id}) + "\n")
+
+    return {
+        "sessionId": session_id,
+        "fullPath": str(path),
+        "projectPath": cwd,
+        "firstPrompt": first_prompt,
+        "customTitle": custom_title,
+        "summary": "",
+        "messageCount": turn * 2,
+        "modified": timestamp(base, turn * 60),
+    }
+
+
+def generate_corpus(home: Path, projects: int, sessions: int, size_kb: float, index_coverage: float, seed: int) -> dict:
+    """Create HOME/.claude/projects with a synthetic session tree. Returns its parameters."""
+    rng = random.Random(seed)
+    projects_dir = home / ".claude" / "projects"
+    total_bytes = 0
+
+    for p in range(projects):
+        cwd = f"/home/bench/project-{p:04d}"
+        project_dir = projects_dir / cwd.replace("/", "-")
+        project_dir.mkdir(parents=True, exist_ok=True)
+        entries = []
+
+        for s in range(sessions):
+            session_id = f"{rng.getrandbits(128):032x}"
+            # Log-normal sizes: mostly small transcripts, a long tail of big ones
+            target = int(rng.lognormvariate(math.log(size_kb * 1024), 1.0) / math.exp(0.5))
+            path = project_dir / f"{session_id}.jsonl"
+            entry = write_transcript(path, cwd, session_id, target, rng)
+            total_bytes += path.stat().st_size
+            if s < round(sessions * index_coverage):
+                entries.append(entry)
+
+        if entries:
+            with open(project_dir / "sessions-index.json", "w") as f:
+                json.dump({"version": 1, "entries": entries}, f)
+
+    corpus = {
+        "projects": projects,
+        "sessions": sessions,
+        "sizeKb": size_kb,
+        "indexCoverage": index_coverage,
+        "seed": seed,
+        "totalBytes": total_bytes,
+    }
+    with open(home / CORPUS_FILE, "w") as f:
+        json.dump(corpus, f, indent=2)
+    return corpus
+
+
+# -- measurements --
+
+def bench_env(home: Path) -> Dict[str, str]:
+    """Environment pointing the session tools at the corpus (and away from any daemon)."""
+    env = dict(os.environ)
+    env.update({
+        "HOME": str(home),
+        "XDG_CACHE_HOME": str(home / ".cache"),
+        "XDG_RUNTIME_DIR": str(home / "run"),
+        "PATH": f"{home / 'bin'}{os.pathsep}{os.environ.get('PATH', '')}",
+        "PYTHONPATH": str(SCRIPT_DIR),
+        "BENCH_GUM_LOG": str(home / "gum.log"),
+    })
+    return env
+
+
+def run_snippet(snippet: str, args: List[str], env: Dict[str, str]) -> List[float]:
+    output = sp.run(
+        [sys.executable, "-c", snippet, *args],
+        env=env, stdout=sp.PIPE, text=True, check=True,
+    ).stdout
+    return [float(value) for value in output.split()]
+
+
+def clear_cache(home: Path) -> None:
+    shutil.rmtree(home / ".cache", ignore_errors=True)
+
+
+def picker_startup(home: Path, argv: List[str], env: Dict[str, str]) -> float:
+    """Seconds from launching a picker script until it invokes gum."""
+    log = home / "gum.log"
+    if log.exists():
+        log.unlink()
+
+    start = time.time()
+    sp.run(
+        [sys.executable, str(SCRIPT_DIR / argv[0]), *argv[1:]],
+        env=env, stdin=sp.DEVNULL, stdout=sp.DEVNULL, stderr=sp.DEVNULL,
+    )
+    try:
+        return float(log.read_text().split()[0]) - start
+    except (OSError, IndexError, ValueError):
+        return float("nan")
+
+
+def summarize(samples: List[float]) -> dict:
+    return {"min": min(samples), "median": statistics.median(samples), "samples": samples}
+
+
+def run_benchmarks(home: Path, repeat: int, jobs: int) -> dict:
+    env = bench_env(home)
+    (home / "run").mkdir(exist_ok=True)
+    (home / "bin").mkdir(exist_ok=True)
+    gum = home / "bin" / "gum"
+    gum.write_text(FAKE_GUM)
+    gum.chmod(0o755)
+
+    cold, warm, parse_rates = [], [], []
+    found = 0
+    for _ in range(repeat):
+        clear_cache(home)
+        seconds, found = run_snippet(DISCOVERY_SNIPPET, [str(jobs)], env)
+        cold.append(seconds)
+        warm.append(run_snippet(DISCOVERY_SNIPPET, [str(jobs)], env)[0])
+        seconds, total = run_snippet(PARSE_SNIPPET, [], env)
+        parse_rates.append(total / 1024 ** 2 / seconds)
+
+    # Pickers run against a warm catalog, as they would day to day
+    pickers = {
+        name: summarize([picker_startup(home, argv, env) for _ in range(repeat)])
+        for name, argv in PICKER_SCRIPTS.items()
+    }
+
+    return {
+        "sessionsFound": int(found),
+        "jobs": jobs,
+        "discoveryCold": summarize(cold),
+        "discoveryWarm": summarize(warm),
+        "parseMBps": summarize(parse_rates),
+        "pickerStartup": pickers,
+    }
+
+
+# -- reporting --
+
+def flatten(results: dict) -> Dict[str, float]:
+    """Map metric name -> median for printing and comparison."""
+    metrics = {
+        "discovery cold (s)": results["discoveryCold"]["median"],
+        "discovery warm (s)": results["discoveryWarm"]["median"],
+        "parse (MB/s)": results["parseMBps"]["median"],
+    }
+    for name, summary in results["pickerStartup"].items():
+        metrics[f"{name} startup (s)"] = summary["median"]
+    return metrics
+
+
+def print_report(results: dict, previous: Optional[dict]) -> None:
+    current = flatten(results)
+    before = flatten(previous) if previous else {}
+    for name, value in current.items():
+        line = f"{name:<40} {value:10.4f}"
+        if name in before and before[name]:
+            line += f"  ({value / before[name]:.2f}x previous)"
+        print(line)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Claude session discovery benchmark")
+    parser.add_argument("--root", type=Path, help="Corpus HOME to reuse or create (default: temporary)")
+    parser.add_argument("--projects", type=int, default=20, help="Project directories to generate")
+    parser.add_argument("--sessions", type=int, default=50, help="Sessions per project")
+    parser.add_argument("--size-kb", type=float, default=100, help="Mean transcript size in KiB")
+    parser.add_argument(
+        "--index-coverage",
+        type=float,
+        default=0.5,
+        help="Share of each project's sessions listed in sessions-index.json (0-1)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Worker processes for get_sessions")
+    parser.add_argument("--generate-only", action="store_true", help="Create the corpus and exit")
+    parser.add_argument("-o", "--output", type=Path, help="Result file (default: under the cache dir)")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to compare against")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    home = args.root or Path(tempfile.mkdtemp(prefix="claude-bench-"))
+
+    try:
+        corpus_file = home / CORPUS_FILE
+        if corpus_file.exists():
+            with open(corpus_file) as f:
+                corpus = json.load(f)
+            print(f"Reusing corpus in {home}")
+        else:
+            print(f"Generating corpus in {home}")
+            corpus = generate_corpus(
+                home, args.projects, args.sessions, args.size_kb, args.index_coverage, args.seed
+            )
+        print(
+            f"{corpus['projects']} projects x {corpus['sessions']} sessions,"
+            f" {corpus['totalBytes'] / 1024 ** 2:.1f}MB"
+        )
+        if args.generate_only:
+            return
+
+        results = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "decoder": csj.BACKEND,
+            "platform": platform.platform(),
+            "corpus": corpus,
+            "results": run_benchmarks(home, args.repeat, args.jobs),
+        }
+    finally:
+        if args.root is None and not args.generate_only:
+            shutil.rmtree(home, ignore_errors=True)
+
+    output = args.output or csi.CACHE_DIR / "bench" / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)["results"]
+    print_report(results["results"], previous)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Claude session index daemon - keeps the session list in memory and serves
+it over a Unix socket so the pickers start without touching the disk.
+
+Watches ~/.claude/projects and every project directory with inotify.
+Events only mark a project dirty; dirty projects are rescanned against
+the in-memory catalog once the tree has been quiet for a moment, or
+immediately when a query arrives.
+
+Protocol: connect to claude_session_index.DAEMON_SOCKET, send
+"sessions\\n", read the JSON session list until EOF.
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import selectors
+import signal
+import socket
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Set
+
+import claude_session_index as csi
+
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+ROOT_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+PROJECT_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_CREATE | IN_DELETE
+    | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_ONLYDIR
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+# Seconds without events before dirty projects are rescanned
+DEBOUNCE_SECONDS = 0.25
+
+
+class Inotify:
+    """Minimal ctypes binding for the Linux inotify API."""
+
+    def __init__(self) -> None:
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {path}")
+        return wd
+
+    def read_events(self) -> List[tuple]:
+        """Drain pending events as (wd, mask, name) tuples."""
+        events = []
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return events
+
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(buf, offset)
+            offset += EVENT_HEADER.size
+            name = buf[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class SessionIndexDaemon:
+    """In-memory session list kept current from inotify events."""
+
+    def __init__(self) -> None:
+        self.inotify = Inotify()
+        self.watches: Dict[int, str] = {}  # wd -> project dir ("" for the root)
+        self.sessions: Dict[str, List[dict]] = {}  # project dir -> sessions
+        self.seen: Dict[str, Dict[str, csi.CatalogEntry]] = {}  # project dir -> catalog rows
+        self.dirty: Set[str] = set()
+        self.last_event = 0.0
+        self.response = b"[]"
+
+    # -- indexing --
+
+    def watch_project(self, project_dir: str) -> None:
+        try:
+            wd = self.inotify.add_watch(project_dir, PROJECT_MASK)
+        except OSError:
+            return
+        self.watches[wd] = project_dir
+        self.dirty.add(project_dir)
+
+    def initial_scan(self) -> None:
+        """Watch the tree and index every project, seeding from the on-disk catalog."""
+        self.watches[self.inotify.add_watch(str(csi.CLAUDE_PROJECTS_DIR), ROOT_MASK)] = ""
+
+        conn = csi.open_catalog()
+        if conn:
+            self.seen = csi.split_catalog(csi.load_catalog(conn))
+            conn.close()
+
+        for project_dir in sorted(csi.CLAUDE_PROJECTS_DIR.iterdir()):
+            if project_dir.is_dir():
+                self.watch_project(str(project_dir))
+        self.rescan()
+
+    def rescan(self) -> None:
+        """Rescan dirty projects, rebuild the cached response and persist the catalog."""
+        if not self.dirty:
+            return
+
+        old: Dict[str, csi.CatalogEntry] = {}
+        new: Dict[str, csi.CatalogEntry] = {}
+        for project_dir in self.dirty:
+            project_catalog = self.seen.pop(project_dir, {})
+            old.update(project_catalog)
+            if not os.path.isdir(project_dir):
+                self.sessions.pop(project_dir, None)
+                continue
+
+            sessions, seen = csi.scan_project_dir(Path(project_dir), project_catalog)
+            self.sessions[project_dir] = sessions
+            self.seen[project_dir] = seen
+            new.update(seen)
+        self.dirty.clear()
+
+        merged = []
+        for project_dir in sorted(self.sessions):
+            merged.extend(self.sessions[project_dir])
+        csi.sort_sessions(merged)
+        self.response = json.dumps(merged).encode()
+
+        conn = csi.open_catalog()
+        if conn:
+            csi.save_catalog(conn, old, new)
+            conn.close()
+
+    def handle_events(self) -> None:
+        for wd, mask, name in self.inotify.read_events():
+            self.last_event = time.monotonic()
+
+            if mask & IN_Q_OVERFLOW:
+                self.dirty.update(self.sessions)
+                continue
+
+            project_dir = self.watches.get(wd)
+            if project_dir is None:
+                continue
+
+            if mask & IN_IGNORED:
+                del self.watches[wd]
+                if project_dir:
+                    self.dirty.add(project_dir)
+                continue
+
+            if project_dir == "":
+                # A project directory appeared or went away
+                path = str(csi.CLAUDE_PROJECTS_DIR / name)
+                if mask & (IN_CREATE | IN_MOVED_TO) and mask & IN_ISDIR:
+                    self.watch_project(path)
+                elif path in self.sessions:
+                    self.dirty.add(path)
+                continue
+
+            if name.endswith(".jsonl") or name == "sessions-index.json" or mask & IN_DELETE_SELF:
+                self.dirty.add(project_dir)
+
+    # -- serving --
+
+    def handle_client(self, server: socket.socket) -> None:
+        try:
+            conn, _ = server.accept()
+        except BlockingIOError:
+            return
+
+        with conn:
+            conn.settimeout(1.0)
+            try:
+                request = conn.recv(64).strip()
+                if request == b"sessions":
+                    # Never serve a list that is known to be stale
+                    self.handle_events()
+                    self.rescan()
+                    conn.sendall(self.response)
+            except OSError:
+                pass
+
+    def serve(self) -> None:
+        socket_path = str(csi.DAEMON_SOCKET)
+        if csi.query_daemon() is not None:
+            print(f"Daemon already running on {socket_path}")
+            sys.exit(1)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+        csi.DAEMON_SOCKET.parent.mkdir(parents=True, exist_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(socket_path)
+        os.chmod(socket_path, 0o600)
+        server.listen(16)
+        server.setblocking(False)
+
+        sel = selectors.DefaultSelector()
+        sel.register(self.inotify.fd, selectors.EVENT_READ, "inotify")
+        sel.register(server, selectors.EVENT_READ, "client")
+
+        try:
+            while True:
+                timeout = DEBOUNCE_SECONDS if self.dirty else None
+                for key, _ in sel.select(timeout):
+                    if key.data == "inotify":
+                        self.handle_events()
+                    else:
+                        self.handle_client(server)
+
+                if self.dirty and time.monotonic() - self.last_event >= DEBOUNCE_SECONDS:
+                    self.rescan()
+        finally:
+            sel.close()
+            server.close()
+            self.inotify.close()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+
+def main() -> None:
+    if not csi.CLAUDE_PROJECTS_DIR.exists():
+        print(f"Projects directory not found: {csi.CLAUDE_PROJECTS_DIR}")
+        sys.exit(1)
+
+    # Turn SIGTERM into a normal exit so the socket gets cleaned up
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    daemon = SessionIndexDaemon()
+    daemon.initial_scan()
+    try:
+        daemon.serve()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
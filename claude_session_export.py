@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Claude session export - moves session catalogs between machines so one
+picker can list the sessions of several dev boxes.
+
+An export is a small columnar binary file: a fixed header (magic,
+version, row count, export time), the host name, then a zlib-compressed
+body holding one column after another. String columns are NUL-joined
+UTF-8 and numeric columns are little-endian arrays, so reading a file is
+a decompress, one split per string column and one frombytes per numeric
+column, with no per-row decoding.
+
+Exports are copied with rsync or any file copy into
+~/.cache/claude_sessions/hosts/<host>.clsx, for example:
+
+  claude_sessions.py --export /tmp/$(hostname).clsx
+  rsync devbox:/tmp/devbox.clsx ~/.cache/claude_sessions/hosts/
+  claude_sessions.py --import /tmp/*.clsx        (validates and copies)
+  claude_sessions.py --all-hosts                 (merged picker)
+"""
+
+import os
+import shlex
+import shutil
+import socket
+import struct
+import sys
+import time
+import zlib
+from array import array
+from typing import Dict, List, Tuple
+
+import claude_session_index as csi
+
+
+EXPORT_MAGIC = b"CLSX"
+EXPORT_VERSION = 1
+EXPORT_SUFFIX = ".clsx"
+HOSTS_DIR = csi.CACHE_DIR / "hosts"
+
+# magic, version, rows, exported at, host name length
+HEADER = struct.Struct("<4sHIdH")
+
+STRING_COLUMNS = [
+    "sessionId", "projectPath", "sessionName", "projectDir", "jsonlPath",
+    "firstActivity", "lastActivity",
+]
+FLOAT_COLUMNS = ["modified"]
+INT_COLUMNS = ["size", "messages", "toolUses", "inputTokens", "outputTokens"]
+STATS_COLUMNS = ["messages", "toolUses", "inputTokens", "outputTokens", "firstActivity", "lastActivity"]
+
+
+class ExportError(Exception):
+    """Raised for files that are not readable session exports."""
+
+
+def local_host() -> str:
+    return socket.gethostname().split(".")[0]
+
+
+def export_rows(sessions: List[dict]) -> List[dict]:
+    """Flatten sessions plus their cached stats into export rows (nothing is parsed)."""
+    conn = csi.open_catalog()
+    stats = csi.load_stats(conn) if conn else {}
+    if conn:
+        conn.close()
+
+    rows = []
+    for s in sessions:
+        if s.get("archived"):
+            continue
+        path = csi.transcript_path(s)
+        cached = stats.get(path)
+        session_stats = cached[3] if cached else {}
+        if cached:
+            size = cached[1]
+        else:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                size = 0
+
+        row = {
+            "sessionId": s["sessionId"],
+            "projectPath": s["projectPath"],
+            "sessionName": s["sessionName"],
+            "projectDir": s.get("projectDir", ""),
+            "jsonlPath": path,
+            "modified": csi.modified_timestamp(s.get("modified")),
+            "size": size,
+        }
+        for key in STATS_COLUMNS:
+            row[key] = session_stats.get(key, "" if key.endswith("Activity") else 0)
+        rows.append(row)
+    return rows
+
+
+def encode_catalog(rows: List[dict], host: str) -> bytes:
+    """Serialize rows into the columnar export format."""
+    body = []
+    for column in STRING_COLUMNS:
+        blob = "\0".join(row[column].replace("\0", " ") for row in rows).encode()
+        body.append(struct.pack("<I", len(blob)))
+        body.append(blob)
+    for typecode, columns in (("d", FLOAT_COLUMNS), ("q", INT_COLUMNS)):
+        for column in columns:
+            values = array(typecode, (row[column] for row in rows))
+            if sys.byteorder == "big":
+                values.byteswap()
+            body.append(values.tobytes())
+
+    host_bytes = host.encode()
+    header = HEADER.pack(EXPORT_MAGIC, EXPORT_VERSION, len(rows), time.time(), len(host_bytes))
+    return header + host_bytes + zlib.compress(b"".join(body), 6)
+
+
+def decode_catalog(data: bytes, **extra) -> Tuple[str, float, List[dict]]:
+    """Parse an export into (host, exported_at, rows).
+
+    extra is added to every row (e.g. host=...).
+    """
+    try:
+        magic, version, count, exported_at, host_len = HEADER.unpack_from(data)
+    except struct.error:
+        raise ExportError("truncated header")
+    if magic != EXPORT_MAGIC or version != EXPORT_VERSION:
+        raise ExportError("not a session export (or unsupported version)")
+
+    offset = HEADER.size
+    try:
+        host = data[offset:offset + host_len].decode()
+    except UnicodeDecodeError:
+        raise ExportError("host name is not valid UTF-8")
+    # The host names the file it is imported to and is passed to ssh
+    if not host or host.startswith("-") or "/" in host or "\0" in host or ".." in host:
+        raise ExportError(f"invalid host name: {host!r}")
+    try:
+        body = zlib.decompress(data[offset + host_len:])
+    except zlib.error as e:
+        raise ExportError(f"corrupt body: {e}")
+
+    columns: Dict[str, list] = {}
+    pos = 0
+    try:
+        for column in STRING_COLUMNS:
+            (length,) = struct.unpack_from("<I", body, pos)
+            pos += 4
+            columns[column] = body[pos:pos + length].decode().split("\0") if count else []
+            pos += length
+        for typecode, names in (("d", FLOAT_COLUMNS), ("q", INT_COLUMNS)):
+            for column in names:
+                values = array(typecode)
+                values.frombytes(body[pos:pos + count * values.itemsize])
+                if sys.byteorder == "big":
+                    values.byteswap()
+                columns[column] = values.tolist()
+                pos += count * values.itemsize
+    except (struct.error, ValueError, UnicodeDecodeError) as e:
+        raise ExportError(f"corrupt body: {e}")
+
+    if any(len(values) != count for values in columns.values()):
+        raise ExportError("column lengths do not match the row count")
+
+    names = list(columns)
+    rows = [dict(zip(names, values), **extra) for values in zip(*columns.values())]
+    return host, exported_at, rows
+
+
+def write_export(path: str, sessions: List[dict]) -> int:
+    """Export this host's sessions to path. Returns the number of rows."""
+    rows = export_rows(sessions)
+    data = encode_catalog(rows, local_host())
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(rows)
+
+
+def import_exports(paths: List[str]) -> List[Tuple[str, int]]:
+    """Validate exports and copy them into HOSTS_DIR as <host>.clsx.
+
+    Returns (host, rows) for each file imported.
+    """
+    imported = []
+    HOSTS_DIR.mkdir(parents=True, exist_ok=True)
+    for path in paths:
+        with open(path, "rb") as f:
+            host, _, rows = decode_catalog(f.read())
+        target = HOSTS_DIR / f"{host}{EXPORT_SUFFIX}"
+        if os.path.abspath(path) != str(target):
+            tmp_path = target.with_suffix(".tmp")
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, target)
+        imported.append((host, len(rows)))
+    return imported
+
+
+def load_host_sessions() -> List[dict]:
+    """Return the sessions of every imported host (this host excluded).
+
+    Each session carries a "host" key. If a host has several export files,
+    only the most recent export is used.
+    """
+    if not HOSTS_DIR.exists():
+        return []
+
+    own = local_host()
+    latest: Dict[str, Tuple[float, List[dict]]] = {}
+    for export_file in sorted(HOSTS_DIR.glob(f"*{EXPORT_SUFFIX}")):
+        try:
+            data = export_file.read_bytes()
+            # The host name comes from the header; peek at it before decoding
+            host = data[HEADER.size:HEADER.size + HEADER.unpack_from(data)[4]].decode()
+            if host == own:
+                continue
+            host, exported_at, rows = decode_catalog(data, host=host)
+        except (OSError, struct.error, UnicodeDecodeError, ExportError):
+            continue
+        if host not in latest or exported_at > latest[host][0]:
+            latest[host] = (exported_at, rows)
+
+    sessions = []
+    for _, rows in latest.values():
+        sessions.extend(rows)
+    return sessions
+
+
+def ssh_resume_command(session: dict) -> List[str]:
+    """Command resuming a remote session over ssh in its project directory."""
+    remote = (
+        f"cd {shlex.quote(session['projectPath'])} &&"
+        f" exec claude --resume {shlex.quote(session['sessionId'])} --dangerously-skip-permissions"
+    )
+    return ["ssh", "-t", session["host"], remote]
@@ -0,0 +1,778 @@
+#!/usr/bin/env python3
+"""
+Claude session index - shared session discovery for the Claude session
+tools (claude_sessions.py, claude_sessions_floater.py and
+claude_delete_session.py).
+
+Sessions come from each project's sessions-index.json plus any .jsonl
+transcripts the index does not cover. Parsed transcripts are cached in a
+SQLite catalog keyed by (path, mtime, size).
+"""
+
+import copy
+import json
+import mmap
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import claude_session_json as csj
+
+
+CLAUDE_PROJECTS_DIR = Path.home() / ".claude" / "projects"
+TAIL_CHUNK_SIZE = 64 * 1024
+# Bytes of a mapped transcript scanned before its pages are released
+SCAN_WINDOW = 8 * 1024 * 1024
+CUSTOM_TITLE_MARKER = b'"custom-title"'
+USER_MARKER = b'"user"'
+MESSAGE_MARKERS = (USER_MARKER, b'"assistant"')
+ARCHIVE_DIR = Path.home() / ".claude" / "session-archive"
+MANIFEST_NAME = "manifest.json"
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "claude_sessions"
+CATALOG_PATH = CACHE_DIR / "catalog.sqlite"
+DAEMON_SOCKET = Path(os.environ.get("XDG_RUNTIME_DIR", CACHE_DIR)) / "claude-sessions.sock"
+
+# Bump when the shape of the per-transcript stats changes so cached
+# stats are rebuilt from byte zero
+STATS_VERSION = 2
+
+# Last exchanges shown in session previews, each trimmed to PREVIEW_CHARS
+PREVIEW_MESSAGES = 6
+PREVIEW_CHARS = 500
+
+# path -> (mtime, size, parsed session or None)
+CatalogEntry = Tuple[float, int, Optional[dict]]
+# path -> (inode, size, parsed offset, stats)
+StatsEntry = Tuple[int, int, int, dict]
+
+
+def release_pages(buf, start: int, end: int) -> None:
+    """Drop the mapped pages of buf[start:end] from this process's RSS.
+
+    The pages stay in the page cache and fault back in if touched again.
+    """
+    if isinstance(buf, mmap.mmap) and end > start:
+        start -= start % mmap.PAGESIZE
+        buf.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+
+def iter_marked_lines(buf, marker: bytes) -> Iterator[bytes]:
+    """Yield every line of buf that contains marker, first to last.
+
+    Lines are located with find() one SCAN_WINDOW at a time and scanned
+    pages are released, so only matching lines are ever copied and peak
+    RSS does not grow with the transcript size.
+    """
+    size = len(buf)
+    pos = 0
+    while pos < size:
+        window_end = min(pos + SCAN_WINDOW, size)
+        hit = buf.find(marker, pos, min(size, window_end + len(marker) - 1))
+        if hit == -1:
+            release_pages(buf, pos, window_end)
+            pos = window_end
+            continue
+
+        start = buf.rfind(b"\n", 0, hit) + 1
+        end = buf.find(b"\n", hit)
+        if end == -1:
+            end = size
+        yield buf[start:end]
+        release_pages(buf, min(start, pos), end)
+        pos = end
+
+
+def find_custom_title(buf) -> str:
+    """Return the last customTitle in a transcript buffer by searching back from EOF.
+
+    Only lines containing the literal "custom-title" are decoded, so the
+    rest of the transcript is never run through the JSON decoder.
+    """
+    size = len(buf)
+    end = size
+    while end > 0:
+        window_start = max(0, end - SCAN_WINDOW)
+        idx = buf.rfind(CUSTOM_TITLE_MARKER, window_start, min(size, end + len(CUSTOM_TITLE_MARKER) - 1))
+        if idx == -1:
+            release_pages(buf, window_start, end)
+            end = window_start
+            continue
+
+        start = buf.rfind(b"\n", 0, idx) + 1
+        line_end = buf.find(b"\n", idx)
+        if line_end == -1:
+            line_end = size
+        try:
+            entry = csj.decode_header(buf[start:line_end])
+        except ValueError:
+            entry = {}
+        if entry.get("type") == "custom-title":
+            return entry.get("customTitle", "")
+        release_pages(buf, start, max(end, line_end))
+        end = start
+
+    return ""
+
+
+def message_text(entry: dict) -> str:
+    """Join the text parts of a user or assistant message."""
+    message = entry.get("message")
+    content = message.get("content", "") if isinstance(message, dict) else ""
+    if isinstance(content, str):
+        return content
+
+    parts = []
+    for item in content:
+        if isinstance(item, dict) and item.get("type") == "text":
+            parts.append(item.get("text", ""))
+        elif isinstance(item, str):
+            parts.append(item)
+    return "\n".join(parts)
+
+
+def read_tail_messages(path: str, limit: int = 6) -> List[Tuple[str, str]]:
+    """Return the last `limit` user/assistant (role, text) pairs, oldest first.
+
+    Reads backwards from EOF in TAIL_CHUNK_SIZE steps and stops as soon as
+    enough messages are found, so long transcripts cost only their tail.
+    """
+    messages: List[Tuple[str, str]] = []
+    try:
+        with open(path, "rb") as f:
+            pos = os.fstat(f.fileno()).st_size
+            carry = b""
+            while pos > 0 and len(messages) < limit:
+                step = min(TAIL_CHUNK_SIZE, pos)
+                pos -= step
+                f.seek(pos)
+                lines = (f.read(step) + carry).split(b"\n")
+                # The first piece may continue in the previous chunk
+                carry = lines.pop(0) if pos > 0 else b""
+
+                for line in reversed(lines):
+                    if not any(marker in line for marker in MESSAGE_MARKERS):
+                        continue
+                    try:
+                        entry = csj.loads(line)
+                    except ValueError:
+                        continue
+                    role = entry.get("type")
+                    text = message_text(entry) if role in ("user", "assistant") else ""
+                    if text:
+                        messages.append((role, text))
+                        if len(messages) >= limit:
+                            break
+    except OSError:
+        pass
+
+    messages.reverse()
+    return messages
+
+
+def parse_session_jsonl(jsonl_path: Path) -> Optional[dict]:
+    """Parse a session .jsonl file to extract session info.
+
+    Reads user entries from the top only until cwd and the first prompt
+    are known, then looks up the custom title from the end of the file.
+    The file is memory-mapped and scanned for markers, so lines that are
+    not needed are never copied or decoded.
+    """
+    custom_title = ""
+    first_prompt = ""
+    project_path = ""
+    session_id = jsonl_path.stem
+
+    try:
+        with open(jsonl_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # Map the file instead of iterating lines: only lines holding a
+            # marker are copied out, so memory stays flat for huge transcripts
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        try:
+            for line in iter_marked_lines(buf, USER_MARKER):
+                try:
+                    entry = csj.decode_header(line)
+                except ValueError:
+                    continue
+
+                if entry.get("type") != "user":
+                    continue
+
+                if not project_path:
+                    project_path = entry.get("cwd", "")
+
+                if not first_prompt:
+                    msg = entry.get("message", {})
+                    content = msg.get("content", [])
+                    for item in content:
+                        if isinstance(item, dict) and item.get("type") == "text":
+                            first_prompt = item.get("text", "")[:60]
+                            break
+                        elif isinstance(item, str):
+                            first_prompt = item[:60]
+                            break
+
+                if project_path and first_prompt:
+                    break
+
+            custom_title = find_custom_title(buf)
+        finally:
+            if size:
+                buf.close()
+
+        # Get modified time from file
+        modified = jsonl_path.stat().st_mtime
+
+        session_name = custom_title or first_prompt or session_id
+        if project_path and session_id:
+            return {
+                "sessionId": session_id,
+                "projectPath": project_path,
+                "sessionName": session_name,
+                "modified": modified,
+                "jsonlPath": str(jsonl_path),
+                "projectDir": str(jsonl_path.parent),
+            }
+    except (IOError, OSError):
+        pass
+    return None
+
+
+def open_catalog() -> Optional[sqlite3.Connection]:
+    """Open the persistent session catalog, creating it on first use."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(CATALOG_PATH)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " path TEXT PRIMARY KEY, mtime REAL, size INTEGER,"
+            " session_id TEXT, project_path TEXT, session_name TEXT)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS stats ("
+            " path TEXT PRIMARY KEY, inode INTEGER, size INTEGER, offset INTEGER, data TEXT)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS previews (path TEXT PRIMARY KEY, size INTEGER, text TEXT)"
+        )
+        return conn
+    except (sqlite3.Error, OSError):
+        return None
+
+
+def load_catalog(conn: sqlite3.Connection) -> Dict[str, CatalogEntry]:
+    """Load every cataloged transcript as {path: (mtime, size, session)}.
+
+    Transcripts that did not yield a session are stored with an empty
+    project_path so they are not reparsed either.
+    """
+    catalog: Dict[str, CatalogEntry] = {}
+    try:
+        rows = conn.execute(
+            "SELECT path, mtime, size, session_id, project_path, session_name FROM sessions"
+        )
+        for path, mtime, size, session_id, project_path, session_name in rows:
+            session = None
+            if project_path:
+                session = {
+                    "sessionId": session_id,
+                    "projectPath": project_path,
+                    "sessionName": session_name,
+                    "modified": mtime,
+                    "jsonlPath": path,
+                    "projectDir": os.path.dirname(path),
+                }
+            catalog[path] = (mtime, size, session)
+    except sqlite3.Error:
+        pass
+    return catalog
+
+
+def save_catalog(conn: sqlite3.Connection, old: Dict[str, CatalogEntry], seen: Dict[str, CatalogEntry]) -> None:
+    """Write changed entries back and drop transcripts that no longer exist."""
+    changed = []
+    for path, entry in seen.items():
+        if old.get(path) == entry:
+            continue
+        mtime, size, session = entry
+        session = session or {}
+        changed.append((
+            path, mtime, size,
+            session.get("sessionId", ""),
+            session.get("projectPath", ""),
+            session.get("sessionName", ""),
+        ))
+    stale = [(path,) for path in old if path not in seen]
+
+    if not changed and not stale:
+        return
+
+    try:
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)", changed)
+            conn.executemany("DELETE FROM sessions WHERE path = ?", stale)
+            conn.executemany("DELETE FROM previews WHERE path = ?", stale)
+    except sqlite3.Error:
+        pass
+
+
+def scan_project_dir(project_dir: Path, catalog: Dict[str, CatalogEntry]) -> Tuple[List[dict], Dict[str, CatalogEntry]]:
+    """Collect sessions for one project directory.
+
+    Returns the sessions plus a catalog entry for every transcript that was
+    looked at. Transcripts whose mtime and size match the catalog are only
+    stat'ed, never opened.
+    """
+    sessions = []
+    seen: Dict[str, CatalogEntry] = {}
+    indexed_sessions = set()  # Track sessions found in index files
+
+    index_file = project_dir / "sessions-index.json"
+
+    # Try to read from sessions-index.json first
+    if index_file.exists():
+        try:
+            with open(index_file, "r") as f:
+                data = json.load(f)
+
+            for entry in data.get("entries", []):
+                session_id = entry.get("sessionId", "")
+                project_path = entry.get("projectPath", "")
+                custom_title = entry.get("customTitle", "")
+                summary = entry.get("summary", "")
+                first_prompt = entry.get("firstPrompt", "")[:60]
+                modified = entry.get("modified", "")
+                full_path = entry.get("fullPath", "")
+
+                # Use customTitle, then summary, then firstPrompt as session name
+                session_name = custom_title or summary or first_prompt
+
+                if project_path and session_id:
+                    indexed_sessions.add(session_id)
+                    sessions.append({
+                        "sessionId": session_id,
+                        "projectPath": project_path,
+                        "sessionName": session_name,
+                        "modified": modified,
+                        "fullPath": full_path,
+                        "indexFile": str(index_file),
+                        "projectDir": str(project_dir),
+                    })
+        except (json.JSONDecodeError, IOError):
+            pass
+
+    # Scan individual .jsonl files for sessions not in index
+    for jsonl_file in project_dir.glob("*.jsonl"):
+        session_id = jsonl_file.stem
+        # Skip subagent sessions and already indexed sessions
+        if session_id.startswith("agent-") or session_id in indexed_sessions:
+            continue
+
+        try:
+            st = jsonl_file.stat()
+        except OSError:
+            continue
+
+        path = str(jsonl_file)
+        cached = catalog.get(path)
+        if cached and cached[0] == st.st_mtime and cached[1] == st.st_size:
+            session = cached[2]
+        else:
+            session = parse_session_jsonl(jsonl_file)
+        seen[path] = (st.st_mtime, st.st_size, session)
+
+        # Skip sessions with very short names (likely typos/tests)
+        if session and len(session.get("sessionName", "")) >= 3:
+            sessions.append(session)
+
+    return sessions, seen
+
+
+def iter_lines(f: BinaryIO, offset: int) -> Iterator[Tuple[bytes, int]]:
+    """Yield (line, end_offset) for every complete line after offset.
+
+    A trailing line without a newline is still being written and is left
+    for the next pass.
+    """
+    f.seek(offset)
+    for line in f:
+        if not line.endswith(b"\n"):
+            break
+        offset += len(line)
+        yield line, offset
+
+
+def new_stats() -> dict:
+    """Return empty per-transcript stats."""
+    return {
+        "version": STATS_VERSION,
+        "bytes": 0,
+        "messages": 0,
+        "types": {},
+        "toolUses": 0,
+        "firstActivity": "",
+        "lastActivity": "",
+        "inputTokens": 0,
+        "outputTokens": 0,
+        "cacheReadTokens": 0,
+        "cacheCreationTokens": 0,
+    }
+
+
+def fold_entry(stats: dict, entry: dict) -> None:
+    """Add one transcript entry to the running stats."""
+    entry_type = entry.get("type")
+    if not isinstance(entry_type, str):
+        entry_type = "unknown"
+    stats["types"][entry_type] = stats["types"].get(entry_type, 0) + 1
+
+    if entry_type not in ("user", "assistant"):
+        return
+
+    stats["messages"] += 1
+    timestamp = entry.get("timestamp")
+    if isinstance(timestamp, str) and timestamp:
+        if not stats["firstActivity"] or timestamp < stats["firstActivity"]:
+            stats["firstActivity"] = timestamp
+        if timestamp > stats["lastActivity"]:
+            stats["lastActivity"] = timestamp
+
+    message = entry.get("message")
+    content = message.get("content") if isinstance(message, dict) else None
+    if isinstance(content, list):
+        stats["toolUses"] += sum(
+            1 for item in content if isinstance(item, dict) and item.get("type") == "tool_use"
+        )
+
+    usage = message.get("usage") if isinstance(message, dict) else None
+    if isinstance(usage, dict):
+        stats["inputTokens"] += usage.get("input_tokens") or 0
+        stats["outputTokens"] += usage.get("output_tokens") or 0
+        stats["cacheReadTokens"] += usage.get("cache_read_input_tokens") or 0
+        stats["cacheCreationTokens"] += usage.get("cache_creation_input_tokens") or 0
+
+
+def update_transcript_stats(path: str, cached: Optional[StatsEntry]) -> Optional[StatsEntry]:
+    """Bring one transcript's stats up to date.
+
+    Only lines appended since the cached offset are parsed. A changed
+    inode (file replaced) or a file shorter than the offset (truncated)
+    starts over from byte zero.
+    """
+    try:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if (
+                cached
+                and cached[0] == st.st_ino
+                and cached[2] <= st.st_size
+                and cached[3].get("version") == STATS_VERSION
+            ):
+                if cached[1] == st.st_size:
+                    return cached
+                offset, stats = cached[2], copy.deepcopy(cached[3])
+            else:
+                offset, stats = 0, new_stats()
+
+            for line, offset in iter_lines(f, offset):
+                try:
+                    entry = csj.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict):
+                    fold_entry(stats, entry)
+    except OSError:
+        return None
+
+    stats["bytes"] = st.st_size
+
+    return (st.st_ino, st.st_size, offset, stats)
+
+
+def load_stats(conn: sqlite3.Connection) -> Dict[str, StatsEntry]:
+    """Load cached transcript stats as {path: (inode, size, offset, stats)}."""
+    cached: Dict[str, StatsEntry] = {}
+    try:
+        for path, inode, size, offset, data in conn.execute(
+            "SELECT path, inode, size, offset, data FROM stats"
+        ):
+            cached[path] = (inode, size, offset, csj.loads(data))
+    except (sqlite3.Error, ValueError):
+        pass
+    return cached
+
+
+def save_stats(conn: sqlite3.Connection, old: Dict[str, StatsEntry], seen: Dict[str, StatsEntry]) -> None:
+    """Write changed stats back and drop rows for transcripts that no longer exist."""
+    changed = [
+        (path, inode, size, offset, json.dumps(stats))
+        for path, (inode, size, offset, stats) in seen.items()
+        if old.get(path) != seen[path]
+    ]
+    stale = [(path,) for path in old if path not in seen and not os.path.exists(path)]
+
+    if not changed and not stale:
+        return
+
+    try:
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO stats VALUES (?, ?, ?, ?, ?)", changed)
+            conn.executemany("DELETE FROM stats WHERE path = ?", stale)
+    except sqlite3.Error:
+        pass
+
+
+def transcript_path(session: dict) -> str:
+    """Return the .jsonl transcript path for a session."""
+    path = session.get("jsonlPath") or session.get("fullPath")
+    if path:
+        return path
+    return os.path.join(session.get("projectDir", ""), f"{session['sessionId']}.jsonl")
+
+
+def iter_session_stats(sessions: List[dict]) -> Iterator[Tuple[dict, dict]]:
+    """Yield (session, stats) for each session whose transcript is readable.
+
+    Transcripts are streamed one at a time through the stats cache in the
+    catalog, so repeat runs only parse what they gained since the last run.
+    The cache is written back once the generator is exhausted or closed.
+    """
+    conn = open_catalog()
+    old = load_stats(conn) if conn else {}
+    seen: Dict[str, StatsEntry] = {}
+
+    try:
+        for session in sessions:
+            path = transcript_path(session)
+            entry = update_transcript_stats(path, old.get(path))
+            if entry:
+                seen[path] = entry
+                yield session, entry[3]
+    finally:
+        if conn:
+            save_stats(conn, old, seen)
+            conn.close()
+
+
+def get_session_stats(sessions: List[dict]) -> Dict[str, dict]:
+    """Return {sessionId: stats} for the given sessions."""
+    return {session["sessionId"]: stats for session, stats in iter_session_stats(sessions)}
+
+
+def render_preview(messages: List[Tuple[str, str]]) -> str:
+    """Format (role, text) pairs for the preview pane."""
+    return "\n\n".join(f"{role.upper()}: {text[:PREVIEW_CHARS]}" for role, text in messages)
+
+
+def session_preview(session: dict, conn: Optional[sqlite3.Connection] = None) -> str:
+    """Return the rendered last exchanges of a session.
+
+    Only the transcript tail is read. With a catalog connection the
+    rendering is cached per (path, size), so a transcript is only read
+    again once it has grown. Archived sessions use their manifest preview.
+    """
+    if session.get("archived"):
+        return render_preview(session.get("preview", []))
+    if session.get("host"):
+        # Imported from another machine; the transcript is not here
+        return f"On {session['host']}: {session['projectPath']}"
+
+    path = transcript_path(session)
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return ""
+
+    if conn:
+        try:
+            row = conn.execute("SELECT size, text FROM previews WHERE path = ?", (path,)).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row and row[0] == size:
+            return row[1]
+
+    text = render_preview(read_tail_messages(path, PREVIEW_MESSAGES))
+    if conn:
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO previews VALUES (?, ?, ?)", (path, size, text))
+        except sqlite3.Error:
+            pass
+    return text
+
+
+def split_catalog(catalog: Dict[str, CatalogEntry]) -> Dict[str, Dict[str, CatalogEntry]]:
+    """Group catalog entries by the project directory that holds them."""
+    project_catalogs: Dict[str, Dict[str, CatalogEntry]] = {}
+    for path, entry in catalog.items():
+        project_catalogs.setdefault(os.path.dirname(path), {})[path] = entry
+    return project_catalogs
+
+
+def get_sessions(jobs: int = 1) -> List[dict]:
+    """Find and parse all sessions from index files and individual .jsonl files.
+
+    With jobs > 1 the project directories are scanned by a process pool.
+    Results are merged in project order, so the output matches a serial run.
+    """
+    sessions = []
+
+    if not CLAUDE_PROJECTS_DIR.exists():
+        return sessions
+
+    conn = open_catalog()
+    catalog = load_catalog(conn) if conn else {}
+    seen: Dict[str, CatalogEntry] = {}
+
+    project_dirs = [d for d in sorted(CLAUDE_PROJECTS_DIR.iterdir()) if d.is_dir()]
+
+    # Hand each worker only the catalog rows for its own project
+    project_catalogs = split_catalog(catalog)
+    catalogs = [project_catalogs.get(str(d), {}) for d in project_dirs]
+
+    if jobs > 1 and len(project_dirs) > 1:
+        # Imported here: multiprocessing is a large share of this module's
+        # import time, and fzf previews import it once per highlighted row
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunksize = max(1, len(project_dirs) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(scan_project_dir, project_dirs, catalogs, chunksize=chunksize))
+    else:
+        results = [scan_project_dir(d, c) for d, c in zip(project_dirs, catalogs)]
+
+    for project_sessions, project_seen in results:
+        sessions.extend(project_sessions)
+        seen.update(project_seen)
+
+    if conn:
+        save_catalog(conn, catalog, seen)
+        conn.close()
+
+    sort_sessions(sessions)
+    return sessions
+
+
+def query_daemon(timeout: float = 0.5) -> Optional[List[dict]]:
+    """Ask a running claude_session_daemon.py for the session list.
+
+    Returns None when no daemon is listening so callers can fall back
+    to scanning directly.
+    """
+    if not DAEMON_SOCKET.exists():
+        return None
+
+    import socket
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(DAEMON_SOCKET))
+            sock.sendall(b"sessions\n")
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        return csj.loads(b"".join(chunks))
+    except (OSError, ValueError):
+        return None
+
+
+def write_json_atomic(path: str, data: dict) -> None:
+    """Write JSON next to path and rename it into place so readers never see a partial file."""
+    import tempfile
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_manifest(archive_project_dir: Path) -> dict:
+    """Load a project's archive manifest ({"entries": [...]})."""
+    try:
+        with open(archive_project_dir / MANIFEST_NAME, "r") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {"entries": []}
+
+
+def load_archived_sessions() -> List[dict]:
+    """Return archived sessions from every project manifest without decompressing anything."""
+    sessions = []
+    if not ARCHIVE_DIR.exists():
+        return sessions
+
+    for archive_project_dir in sorted(ARCHIVE_DIR.iterdir()):
+        if archive_project_dir.is_dir():
+            sessions.extend(load_manifest(archive_project_dir).get("entries", []))
+    return sessions
+
+
+def load_sessions(jobs: int = 1, include_archived: bool = False) -> List[dict]:
+    """Return sessions from the daemon if it is running, else scan directly.
+
+    With include_archived, sessions from the archive manifests are merged in
+    (marked "archived": True).
+    """
+    sessions = query_daemon()
+    if sessions is None:
+        sessions = get_sessions(jobs)
+
+    if include_archived:
+        live = {s["sessionId"] for s in sessions}
+        sessions.extend(s for s in load_archived_sessions() if s["sessionId"] not in live)
+        sort_sessions(sessions)
+    return sessions
+
+
+def modified_timestamp(modified) -> float:
+    """Normalize a session's modified value to a Unix timestamp.
+
+    Transcripts carry a float mtime while sessions-index.json stores ISO
+    strings such as "2025-01-31T12:00:00.000Z".
+    """
+    if isinstance(modified, (int, float)):
+        return float(modified)
+    if isinstance(modified, str) and modified:
+        try:
+            return datetime.fromisoformat(modified.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    return 0.0
+
+
+def sort_sessions(sessions: List[dict]) -> None:
+    """Sort sessions in place by modified date (most recent first)."""
+    sessions.sort(key=lambda x: modified_timestamp(x.get("modified")), reverse=True)
+
+
+def build_session_map(sessions: List[dict]) -> Tuple[Dict[str, dict], List[str]]:
+    """Build picker display names and a display name -> session mapping.
+
+    Duplicate names get an index suffix so every line stays unique.
+    """
+    session_map = {}
+    display_names = []
+    for i, s in enumerate(sessions):
+        name = s["sessionName"].replace("\n", " ")
+        if s.get("archived"):
+            name = f"[archived] {name}"
+        if s.get("host"):
+            name = f"[{s['host']}] {name}"
+        display_name = name
+        if name in session_map:
+            display_name = f"{name} ({i})"
+        session_map[display_name] = s
+        display_names.append(display_name)
+    return session_map, display_names
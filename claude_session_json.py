@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Claude session JSON - transcript line decoding for the Claude session tools.
+
+Uses msgspec or orjson when installed and falls back to the stdlib json
+module. The backend can be forced with CLAUDE_SESSION_DECODER=json,
+orjson or msgspec (handy for benchmarking).
+
+loads() decodes a whole transcript line. decode_header() is for session
+discovery: with msgspec it decodes against a partial schema, so only
+type, cwd, customTitle and the first text part of the message content
+are materialized; everything else in the line is skipped by the parser.
+Both raise ValueError on malformed input, like json.loads.
+"""
+
+import importlib.util
+import json
+import os
+from typing import Any, List, Optional, Union
+
+
+BACKENDS = [name for name in ("msgspec", "orjson") if importlib.util.find_spec(name)] + ["json"]
+BACKEND = os.environ.get("CLAUDE_SESSION_DECODER", BACKENDS[0])
+if BACKEND not in BACKENDS:
+    BACKEND = BACKENDS[0]
+
+# Set by _load_backend() on the first decode
+msgspec: Any = None
+orjson: Any = None
+_any_decoder: Any = None
+_header_decoder: Any = None
+_part_decoder: Any = None
+
+
+def _load_backend() -> None:
+    """Import the active backend and build its decoders.
+
+    Deferred to the first decode: importing msgspec takes longer than an
+    fzf preview served from the catalog, which never decodes anything.
+    """
+    global msgspec, orjson, _any_decoder, _header_decoder, _part_decoder
+
+    if BACKEND == "orjson":
+        import orjson
+        return
+    if BACKEND != "msgspec":
+        return
+
+    import msgspec
+
+    class ContentPart(msgspec.Struct):
+        type: str = ""
+        text: str = ""
+
+    class HeaderMessage(msgspec.Struct):
+        # Parts stay raw until needed; decoding stops at the first text part
+        content: Union[str, List[msgspec.Raw]] = []
+
+    class HeaderEntry(msgspec.Struct):
+        type: str = ""
+        cwd: str = ""
+        customTitle: str = ""
+        message: Optional[HeaderMessage] = None
+
+    _header_decoder = msgspec.json.Decoder(HeaderEntry)
+    _part_decoder = msgspec.json.Decoder(Union[ContentPart, str])
+    _any_decoder = msgspec.json.Decoder()
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode one JSON document with the active backend."""
+    if BACKEND == "msgspec":
+        if _any_decoder is None:
+            _load_backend()
+        try:
+            return _any_decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    if BACKEND == "orjson":
+        if orjson is None:
+            _load_backend()
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _header_content(content: Union[str, List["msgspec.Raw"]]) -> Union[str, list]:
+    if isinstance(content, str):
+        return content
+
+    parts: list = []
+    for raw in content:
+        try:
+            part = _part_decoder.decode(raw)
+        except msgspec.DecodeError:
+            # Not a text part shape (e.g. a tool_result); keep it opaque
+            parts.append({})
+            continue
+        if isinstance(part, str):
+            parts.append(part)
+            break
+        parts.append({"type": part.type, "text": part.text})
+        if part.type == "text":
+            break
+    return parts
+
+
+def decode_header(line: bytes) -> dict:
+    """Decode the fields session discovery needs from a transcript line.
+
+    Returns a dict shaped like the full entry, restricted to type, cwd,
+    customTitle and message.content up to its first text part. Other
+    backends return the full entry.
+    """
+    if BACKEND != "msgspec":
+        return loads(line)
+    if _header_decoder is None:
+        _load_backend()
+
+    try:
+        entry = _header_decoder.decode(line)
+    except msgspec.ValidationError:
+        # Valid JSON of an unexpected shape: let the caller see all of it
+        return loads(line)
+    except msgspec.DecodeError as e:
+        raise ValueError(str(e)) from e
+
+    header = {"type": entry.type, "cwd": entry.cwd, "customTitle": entry.customTitle}
+    if entry.message is not None:
+        header["message"] = {"content": _header_content(entry.message.content)}
+    return header
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Claude session picker - in-process fuzzy finder for the session tools.
+
+Avoids spawning gum and re-piping the whole list on every launch. The
+candidate list is lowercased once, character and bigram postings are
+built on first use and kept, and each keystroke only narrows the
+previous result set, so latency stays flat with tens of thousands of
+sessions.
+
+Query syntax (like fzf): space-separated terms must all match; a plain
+term matches as a subsequence, a term starting with ' must appear
+verbatim.
+
+With a preview callback the native picker shows the highlighted item's
+preview beside the list; fzf gets an equivalent --preview command.
+gum filter remains the fallback when curses cannot take over the
+terminal.
+"""
+
+import curses
+import subprocess as sp
+import sys
+import textwrap
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+
+PICKERS = ["native", "gum", "fzf"]
+MAX_CACHED_QUERIES = 256
+# Narrower terminals get the list only
+MIN_PREVIEW_WIDTH = 100
+
+
+class PickerUnavailable(Exception):
+    """Raised when the native picker cannot use the terminal."""
+
+
+class FuzzyIndex:
+    """Incremental fuzzy matcher over a fixed list of strings."""
+
+    def __init__(self, items: List[str]) -> None:
+        self.items = items
+        self.lowered = [item.lower() for item in items]
+        # Character/bigram -> indices of items containing it, built on first use
+        self.postings: Dict[str, Set[int]] = {}
+        # query -> ranked matches; a longer query only rescores its prefix's matches
+        self.cache: Dict[str, List[int]] = {"": list(range(len(items)))}
+
+    def posting(self, gram: str) -> Set[int]:
+        if gram not in self.postings:
+            self.postings[gram] = {idx for idx, text in enumerate(self.lowered) if gram in text}
+        return self.postings[gram]
+
+    def candidates(self, terms: List[str]) -> Set[int]:
+        """Items that can possibly match: intersection of their postings, smallest first."""
+        grams: Set[str] = set()
+        for term in terms:
+            if term.startswith("'") and len(term) > 2:
+                # Verbatim terms need every bigram
+                grams.update(term[i:i + 2] for i in range(1, len(term) - 1))
+            else:
+                # Subsequence terms only need every character
+                grams.update(term.lstrip("'"))
+
+        postings = sorted((self.posting(gram) for gram in grams), key=len)
+        if not postings:
+            return set(range(len(self.items)))
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+    def score(self, idx: int, terms: List[str]) -> Optional[int]:
+        """Score one item against all terms, or None if any term fails to match."""
+        text = self.lowered[idx]
+        total = 0
+        for term in terms:
+            if term.startswith("'"):
+                pos = text.find(term[1:])
+                if pos < 0:
+                    return None
+                total += 100 + (20 if pos == 0 or not text[pos - 1].isalnum() else 0)
+                continue
+
+            pos = text.find(term)
+            if pos >= 0:
+                # Contiguous match, best at a word boundary
+                total += 100 + (20 if pos == 0 or not text[pos - 1].isalnum() else 0)
+                continue
+
+            # Subsequence match: fewer gaps score higher
+            start = last = -1
+            for ch in term:
+                last = text.find(ch, last + 1)
+                if last < 0:
+                    return None
+                if start < 0:
+                    start = last
+            total += max(1, 60 - (last - start + 1 - len(term)))
+        return total - len(text) // 20
+
+    def match(self, query: str) -> List[int]:
+        """Return indices of matching items, best first."""
+        terms = query.lower().split()
+        key = " ".join(terms)
+        if key in self.cache:
+            return self.cache[key]
+
+        # Every match of the query must also match any prefix of it, so
+        # narrow the longest cached prefix instead of the whole list
+        base: List[int] = []
+        for end in range(len(key) - 1, 0, -1):
+            if key[:end] in self.cache:
+                base = self.cache[key[:end]]
+                break
+        candidates = self.candidates(terms)
+        pool = [idx for idx in base if idx in candidates] if base else sorted(candidates)
+
+        scored: List[Tuple[int, int]] = []
+        for idx in pool:
+            score = self.score(idx, terms)
+            if score is not None:
+                scored.append((-score, idx))
+        scored.sort()
+
+        if len(self.cache) >= MAX_CACHED_QUERIES:
+            self.cache = {"": self.cache[""]}
+        self.cache[key] = [idx for _, idx in scored]
+        return self.cache[key]
+
+
+def _draw_preview(stdscr, lines: List[str], x: int, height: int, width: int) -> None:
+    for row in range(1, height - 1):
+        stdscr.addstr(row, x - 2, "│", curses.A_DIM)
+    for row, line in enumerate(lines[:height - 2]):
+        stdscr.addnstr(row + 1, x, line, width)
+
+
+def _run_curses(
+    stdscr,
+    index: FuzzyIndex,
+    header: str,
+    preview: Optional[Callable[[str], str]],
+) -> Optional[str]:
+    curses.curs_set(1)
+    curses.set_escdelay(25)
+    curses.use_default_colors()
+    curses.init_pair(1, curses.COLOR_MAGENTA, -1)
+    stdscr.keypad(True)
+
+    query = ""
+    cursor = 0
+    top = 0
+    matches = index.match(query)
+    # (item index, pane width) -> wrapped preview lines
+    previews: Dict[Tuple[int, int], List[str]] = {}
+
+    while True:
+        height, width = stdscr.getmaxyx()
+        rows = max(1, height - 3)
+        list_width = width // 2 if preview and width >= MIN_PREVIEW_WIDTH else width
+        cursor = max(0, min(cursor, len(matches) - 1))
+        if cursor < top:
+            top = cursor
+        elif cursor >= top + rows:
+            top = cursor - rows + 1
+
+        stdscr.erase()
+        stdscr.addnstr(0, 0, header, list_width - 1, curses.color_pair(1) | curses.A_BOLD)
+        stdscr.addnstr(1, 0, f"{len(matches)}/{len(index.items)}", list_width - 1, curses.A_DIM)
+        for row, idx in enumerate(matches[top:top + rows]):
+            attr = curses.A_REVERSE if top + row == cursor else curses.A_NORMAL
+            stdscr.addnstr(row + 2, 0, index.items[idx], list_width - 1, attr)
+
+        if list_width < width and matches:
+            pane_width = width - list_width - 3
+            preview_key = (matches[cursor], pane_width)
+            if preview_key not in previews:
+                text = preview(index.items[matches[cursor]])
+                previews[preview_key] = [
+                    wrapped
+                    for line in text.splitlines()
+                    for wrapped in (textwrap.wrap(line, pane_width) or [""])
+                ]
+            _draw_preview(stdscr, previews[preview_key], list_width + 2, height, pane_width)
+        prompt = f"> {query}"
+        stdscr.addnstr(height - 1, 0, prompt, width - 1)
+        stdscr.move(height - 1, min(len(prompt), width - 1))
+        stdscr.refresh()
+
+        try:
+            key = stdscr.get_wch()
+        except KeyboardInterrupt:
+            return None
+
+        if key in ("\n", "\r", curses.KEY_ENTER):
+            return index.items[matches[cursor]] if matches else None
+        if key in ("\x1b", "\x03", "\x07"):  # Esc, Ctrl-C, Ctrl-G
+            return None
+        if key in (curses.KEY_UP, "\x10", "\x0b"):  # Up, Ctrl-P, Ctrl-K
+            cursor -= 1
+        elif key in (curses.KEY_DOWN, "\x0e"):  # Down, Ctrl-N
+            cursor += 1
+        elif key == curses.KEY_PPAGE:
+            cursor -= rows
+        elif key == curses.KEY_NPAGE:
+            cursor += rows
+        elif key in (curses.KEY_BACKSPACE, "\x7f", "\x08"):
+            query = query[:-1]
+            matches, cursor, top = index.match(query), 0, 0
+        elif key == "\x15":  # Ctrl-U
+            query = ""
+            matches, cursor, top = index.match(query), 0, 0
+        elif isinstance(key, str) and key.isprintable():
+            query += key
+            matches, cursor, top = index.match(query), 0, 0
+
+
+def native_select(
+    items: List[str],
+    header: str = "Claude Sessions",
+    preview: Optional[Callable[[str], str]] = None,
+) -> Optional[str]:
+    """Run the in-process fuzzy picker and return the selected line."""
+    if not sys.stdin.isatty() or not sys.stdout.isatty():
+        raise PickerUnavailable("not a terminal")
+
+    index = FuzzyIndex(items)
+    try:
+        return curses.wrapper(_run_curses, index, header, preview)
+    except curses.error as e:
+        raise PickerUnavailable(str(e))
+
+
+def gum_select(items: List[str], header: str = "Claude Sessions") -> Optional[str]:
+    """Run gum filter with the given items and return the selected line."""
+    input_text = "\n".join(items)
+
+    proc = sp.Popen(
+        ["gum", "filter", "--header", header],
+        stdin=sp.PIPE,
+        stdout=sp.PIPE,
+        text=True
+    )
+    output, _ = proc.communicate(input=input_text)
+
+    if proc.returncode != 0:
+        return None
+
+    return output.strip()
+
+
+def fzf_select(
+    items: List[str],
+    header: str = "Claude Sessions",
+    keys: Optional[List[str]] = None,
+    preview_command: Optional[str] = None,
+) -> Optional[str]:
+    """Run fzf with the given items and return the selected one.
+
+    keys are passed to fzf as a hidden second field, so preview_command
+    can refer to the highlighted item's key as {2}. The selection is
+    mapped back through a hidden row index, so items containing tabs
+    (fzf's field delimiter) are still returned verbatim.
+    """
+    shown = [item.replace("\t", " ") for item in items]
+    keys = keys if keys is not None else [""] * len(items)
+    lines = [f"{item}\t{key}\t{i}" for i, (item, key) in enumerate(zip(shown, keys))]
+    cmd = ["fzf", "--header", header, "--delimiter", "\t", "--with-nth", "1"]
+    if preview_command:
+        cmd += ["--preview", preview_command, "--preview-window", "right,50%,wrap"]
+
+    proc = sp.Popen(cmd, stdin=sp.PIPE, stdout=sp.PIPE, text=True)
+    output, _ = proc.communicate(input="\n".join(lines))
+
+    if proc.returncode != 0:
+        return None
+
+    try:
+        return items[int(output.rstrip("\n").rsplit("\t", 1)[-1])]
+    except (ValueError, IndexError):
+        return None
+
+
+def select(
+    items: List[str],
+    header: str = "Claude Sessions",
+    picker: str = "native",
+    preview: Optional[Callable[[str], str]] = None,
+    keys: Optional[List[str]] = None,
+    preview_command: Optional[str] = None,
+) -> Optional[str]:
+    """Pick one line with the chosen picker; the native picker falls back to gum.
+
+    preview renders an item for the native picker; keys/preview_command
+    are the fzf equivalent (see fzf_select). gum shows no preview.
+    """
+    if not items:
+        print("No Claude sessions found")
+        return None
+
+    if picker == "fzf":
+        return fzf_select(items, header, keys, preview_command)
+    if picker == "native":
+        try:
+            return native_select(items, header, preview)
+        except PickerUnavailable:
+            pass
+    return gum_select(items, header)
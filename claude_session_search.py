@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Claude session search - full-text index over Claude Code transcripts.
+
+User and assistant message text is stored in a SQLite FTS5 table under
+~/.cache/claude_sessions. Each transcript's last indexed byte offset and
+inode are remembered, so an update only reads what was appended since the
+previous run. Replaced or truncated transcripts are reindexed from zero.
+
+The session_id column of the FTS table is UNINDEXED, so filtering on it
+scans every message. Each batch of inserted messages therefore records
+its rowid range per session, and a session's messages are deleted by
+rowid range instead.
+"""
+
+import os
+import sqlite3
+import sys
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+import claude_session_index as csi
+import claude_session_json as csj
+
+
+SEARCH_DB_PATH = csi.CACHE_DIR / "search.sqlite"
+
+# Bump when the tables change; an index built by another version is
+# dropped and rebuilt from the transcripts
+SEARCH_SCHEMA_VERSION = 2
+
+
+def open_search_index() -> Optional[sqlite3.Connection]:
+    """Open the search index, creating its tables on first use."""
+    try:
+        csi.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(SEARCH_DB_PATH)
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SEARCH_SCHEMA_VERSION:
+            with conn:
+                for table in ("files", "messages", "batches"):
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"PRAGMA user_version = {SEARCH_SCHEMA_VERSION}")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, session_id TEXT, inode INTEGER, offset INTEGER)"
+        )
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS messages USING fts5("
+            " session_id UNINDEXED, role UNINDEXED, text, tokenize='porter unicode61')"
+        )
+        # session_id -> rowid ranges of its messages, one row per inserted batch
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS batches (session_id TEXT, first INTEGER, last INTEGER)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS batches_session ON batches (session_id)")
+        return conn
+    except (sqlite3.Error, OSError):
+        return None
+
+
+def iter_messages(f: BinaryIO, offset: int) -> Iterator[Tuple[str, str, int]]:
+    """Yield (role, text, end_offset) for complete lines after offset.
+
+    A trailing line without a newline is still being written and is left
+    for the next update. The last item is always ("", "", offset) carrying
+    the offset to resume from.
+    """
+    for line, offset in csi.iter_lines(f, offset):
+        if not any(marker in line for marker in csi.MESSAGE_MARKERS):
+            continue
+        try:
+            entry = csj.loads(line)
+        except ValueError:
+            continue
+
+        role = entry.get("type")
+        if role not in ("user", "assistant"):
+            continue
+        text = csi.message_text(entry)
+        if text:
+            yield role, text, offset
+
+    yield "", "", offset
+
+
+def iter_transcripts() -> Iterator[Path]:
+    """Yield every top-level session transcript (subagent sessions excluded)."""
+    if not csi.CLAUDE_PROJECTS_DIR.exists():
+        return
+    for project_dir in sorted(csi.CLAUDE_PROJECTS_DIR.iterdir()):
+        if not project_dir.is_dir():
+            continue
+        for jsonl_file in project_dir.glob("*.jsonl"):
+            if not jsonl_file.stem.startswith("agent-"):
+                yield jsonl_file
+
+
+def delete_session_messages(conn: sqlite3.Connection, session_id: str) -> None:
+    """Remove a session's messages through their recorded rowid ranges."""
+    ranges = conn.execute(
+        "SELECT first, last FROM batches WHERE session_id = ?", (session_id,)
+    ).fetchall()
+    conn.executemany("DELETE FROM messages WHERE rowid BETWEEN ? AND ?", ranges)
+    conn.execute("DELETE FROM batches WHERE session_id = ?", (session_id,))
+
+
+def update_search_index(conn: sqlite3.Connection) -> int:
+    """Index text appended to transcripts since the last update.
+
+    Returns the number of messages added.
+    """
+    known = {
+        path: (session_id, inode, offset)
+        for path, session_id, inode, offset in conn.execute(
+            "SELECT path, session_id, inode, offset FROM files"
+        )
+    }
+    added = 0
+    # Rowids are assigned here so each batch's range is known up front
+    last_row = conn.execute("SELECT rowid FROM messages ORDER BY rowid DESC LIMIT 1").fetchone()
+    next_rowid = last_row[0] + 1 if last_row else 1
+
+    with conn:
+        for jsonl_file in iter_transcripts():
+            path = str(jsonl_file)
+            session_id = jsonl_file.stem
+            try:
+                st = jsonl_file.stat()
+            except OSError:
+                continue
+
+            start = 0
+            previous = known.pop(path, None)
+            if previous:
+                _, inode, offset = previous
+                if inode == st.st_ino and offset <= st.st_size:
+                    if offset == st.st_size:
+                        continue
+                    start = offset
+                else:
+                    # Replaced or truncated: drop what we had and start over
+                    delete_session_messages(conn, session_id)
+
+            rows = []
+            end = start
+            try:
+                with open(jsonl_file, "rb") as f:
+                    for role, text, end in iter_messages(f, start):
+                        if text:
+                            rows.append((next_rowid + len(rows), session_id, role, text))
+            except OSError:
+                continue
+
+            if rows:
+                conn.executemany(
+                    "INSERT INTO messages (rowid, session_id, role, text) VALUES (?, ?, ?, ?)", rows
+                )
+                conn.execute(
+                    "INSERT INTO batches VALUES (?, ?, ?)", (session_id, next_rowid, rows[-1][0])
+                )
+                next_rowid += len(rows)
+            conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                (path, session_id, st.st_ino, end),
+            )
+            added += len(rows)
+
+        # Transcripts that are gone take their messages with them, unless
+        # they were archived. Their file row stays, so a restored transcript
+        # (new inode) is reindexed cleanly.
+        archived = {session["sessionId"] for session in csi.load_archived_sessions()}
+        for path, (session_id, _, _) in known.items():
+            if session_id in archived:
+                continue
+            delete_session_messages(conn, session_id)
+            conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    return added
+
+
+def fts_query(query: str) -> str:
+    """Quote each word so user input is matched literally (all words must match)."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+
+def search(conn: sqlite3.Connection, query: str, limit: int = 50) -> List[Tuple[str, float, int]]:
+    """Return (session_id, score, hits) for the best matching sessions.
+
+    Sessions are ranked by their best-scoring message (bm25, lower is better).
+    """
+    match = fts_query(query)
+    if not match:
+        return []
+
+    try:
+        return conn.execute(
+            # bm25() cannot be used inside an aggregate, so materialize the hits first
+            "WITH hits AS MATERIALIZED ("
+            "  SELECT session_id, bm25(messages) AS score FROM messages WHERE messages MATCH ?"
+            ") SELECT session_id, MIN(score), COUNT(*) FROM hits"
+            " GROUP BY session_id ORDER BY MIN(score) LIMIT ?",
+            (match, limit),
+        ).fetchall()
+    except sqlite3.Error:
+        return []
+
+
+def search_sessions(query: str, sessions: List[dict], limit: int = 50) -> List[dict]:
+    """Update the index, then return the given sessions that match query, best first."""
+    conn = open_search_index()
+    if conn is None:
+        return []
+
+    try:
+        update_search_index(conn)
+        ranked = search(conn, query, limit)
+    finally:
+        conn.close()
+
+    by_id = {s["sessionId"]: s for s in sessions}
+    return [by_id[session_id] for session_id, _, _ in ranked if session_id in by_id]
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print(f"Usage: {os.path.basename(sys.argv[0])} QUERY")
+        sys.exit(1)
+
+    query = " ".join(sys.argv[1:])
+    conn = open_search_index()
+    if conn is None:
+        print(f"Cannot open search index: {SEARCH_DB_PATH}")
+        sys.exit(1)
+
+    try:
+        update_search_index(conn)
+        for session_id, score, hits in search(conn, query):
+            print(f"{score:8.2f}  {hits:4d}  {session_id}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Claude session stats - per-session and per-project usage report.
+
+Streams every transcript once through the incremental stats cache in
+claude_session_index, so a repeat run only parses what the transcripts
+gained since the previous one. Only one transcript is read at a time and
+per-session rows are written as they are computed; what stays in memory
+is the per-project totals plus the cache's small per-session stats
+records, which are written back once the run finishes.
+"""
+
+import argparse
+import csv
+import sys
+from typing import Dict, Iterator, List, Tuple
+
+import claude_session_index as csi
+
+
+TYPE_COLUMNS = ["user", "assistant", "system", "summary"]
+TOKEN_COLUMNS = ["inputTokens", "outputTokens", "cacheReadTokens", "cacheCreationTokens"]
+CSV_HEADER = [
+    "scope", "project", "session_id", "session_name", "sessions", "bytes",
+    "messages", *TYPE_COLUMNS, "other", "tool_uses", "first", "last",
+    "input_tokens", "output_tokens", "cache_read_tokens", "cache_creation_tokens",
+]
+TABLE_FORMAT = "{:<50} {:>9} {:>7} {:>6} {:>6} {:>6} {:<16} {:<16} {:>10} {:>10}"
+TABLE_HEADER = ["NAME", "SIZE", "MSGS", "USER", "ASSIST", "TOOLS", "FIRST", "LAST", "IN TOK", "OUT TOK"]
+
+
+def new_totals() -> dict:
+    """Return empty per-project totals."""
+    totals = csi.new_stats()
+    totals["sessions"] = 0
+    return totals
+
+
+def add_totals(totals: dict, stats: dict) -> None:
+    """Fold one session's stats into its project totals."""
+    totals["sessions"] += 1
+    for key in ["bytes", "messages", "toolUses", *TOKEN_COLUMNS]:
+        totals[key] += stats.get(key, 0)
+    for entry_type, count in stats.get("types", {}).items():
+        totals["types"][entry_type] = totals["types"].get(entry_type, 0) + count
+
+    first = stats.get("firstActivity", "")
+    if first and (not totals["firstActivity"] or first < totals["firstActivity"]):
+        totals["firstActivity"] = first
+    if stats.get("lastActivity", "") > totals["lastActivity"]:
+        totals["lastActivity"] = stats["lastActivity"]
+
+
+def aggregate(sessions: List[dict]) -> Iterator[Tuple[str, dict, dict]]:
+    """Yield ("session", session, stats) rows, then ("project", {...}, totals) rows."""
+    projects: Dict[str, dict] = {}
+    for session, stats in csi.iter_session_stats(sessions):
+        add_totals(projects.setdefault(session["projectPath"], new_totals()), stats)
+        yield "session", session, stats
+
+    for project_path in sorted(projects):
+        yield "project", {"projectPath": project_path}, projects[project_path]
+
+
+def format_bytes(size: float) -> str:
+    """Human-readable byte count (e.g. 12.3M)."""
+    for unit in ["B", "K", "M"]:
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}G"
+
+
+def format_time(timestamp: str) -> str:
+    """Trim an ISO timestamp to minutes for the table."""
+    return timestamp[:16].replace("T", " ")
+
+
+def csv_row(scope: str, item: dict, stats: dict) -> list:
+    types = stats.get("types", {})
+    other = sum(count for entry_type, count in types.items() if entry_type not in TYPE_COLUMNS)
+    return [
+        scope,
+        item.get("projectPath", ""),
+        item.get("sessionId", ""),
+        item.get("sessionName", "").replace("\n", " "),
+        stats.get("sessions", 1),
+        stats["bytes"],
+        stats["messages"],
+        *[types.get(entry_type, 0) for entry_type in TYPE_COLUMNS],
+        other,
+        stats["toolUses"],
+        stats["firstActivity"],
+        stats["lastActivity"],
+        *[stats[key] for key in TOKEN_COLUMNS],
+    ]
+
+
+def table_row(name: str, stats: dict) -> str:
+    types = stats.get("types", {})
+    if len(name) > 50:
+        name = name[:47] + "..."
+    return TABLE_FORMAT.format(
+        name,
+        format_bytes(stats["bytes"]),
+        stats["messages"],
+        types.get("user", 0),
+        types.get("assistant", 0),
+        stats["toolUses"],
+        format_time(stats["firstActivity"]),
+        format_time(stats["lastActivity"]),
+        stats["inputTokens"],
+        stats["outputTokens"],
+    )
+
+
+def print_stats_report(sessions: List[dict], csv_output: bool = False) -> None:
+    """Print per-session rows followed by per-project totals."""
+    if csv_output:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(CSV_HEADER)
+        for scope, item, stats in aggregate(sessions):
+            writer.writerow(csv_row(scope, item, stats))
+        return
+
+    print(TABLE_FORMAT.format(*TABLE_HEADER))
+    printed_projects = False
+    for scope, item, stats in aggregate(sessions):
+        if scope == "session":
+            print(table_row(item["sessionName"].replace("\n", " "), stats))
+            continue
+
+        if not printed_projects:
+            print()
+            print(TABLE_FORMAT.format("PROJECT", *TABLE_HEADER[1:]))
+            printed_projects = True
+        print(table_row(f"{item['projectPath']} ({stats['sessions']})", stats))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Claude session usage report")
+    parser.add_argument("--csv", action="store_true", help="Write CSV instead of a table")
+    args = parser.parse_args()
+
+    print_stats_report(csi.load_sessions(), args.csv)
+
+
+if __name__ == "__main__":
+    main()
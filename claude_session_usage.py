@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Claude session usage - frecency ranking for the session pickers.
+
+Every resume appends "<time>\\t<sessionId>\\t<weight>" to an append-only
+log under ~/.cache/claude_sessions. A session's score is the sum of its
+weights, each halved every HALF_LIFE_DAYS, so sessions reopened often and
+recently float to the top of the picker. Once the log passes
+COMPACT_BYTES it is rewritten with one pre-decayed line per session, so
+loading it at startup is always a single small read with no stat or
+parse work per session.
+"""
+
+import fcntl
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import claude_session_index as csi
+
+
+USAGE_LOG = csi.CACHE_DIR / "usage.log"
+HALF_LIFE_DAYS = 7
+COMPACT_BYTES = 64 * 1024
+# Decayed weights below this are dropped on compaction
+MIN_WEIGHT = 0.01
+
+
+def decay(weight: float, age: float) -> float:
+    return weight * 0.5 ** (age / (HALF_LIFE_DAYS * 86400))
+
+
+def read_scores(data: str, now: float) -> Dict[str, float]:
+    """Sum decayed weights per session from log text."""
+    scores: Dict[str, float] = {}
+    for line in data.splitlines():
+        try:
+            used_at, session_id, weight = line.split("\t")
+            score = decay(float(weight), now - float(used_at))
+        except ValueError:
+            continue
+        scores[session_id] = scores.get(session_id, 0.0) + score
+    return scores
+
+
+def load_scores(now: Optional[float] = None) -> Dict[str, float]:
+    """Return {sessionId: frecency score} from the usage log."""
+    try:
+        with open(USAGE_LOG, "r") as f:
+            data = f.read()
+    except OSError:
+        return {}
+    return read_scores(data, time.time() if now is None else now)
+
+
+def compact(f) -> None:
+    """Rewrite the (locked) log as one decayed line per session."""
+    now = time.time()
+    f.seek(0)
+    scores = read_scores(f.read(), now)
+    lines = [
+        f"{now:.0f}\t{session_id}\t{score:.4f}\n"
+        for session_id, score in sorted(scores.items(), key=lambda item: -item[1])
+        if score >= MIN_WEIGHT
+    ]
+
+    fd, tmp_path = tempfile.mkstemp(dir=USAGE_LOG.parent, prefix=".usage.")
+    try:
+        with os.fdopen(fd, "w") as tmp:
+            tmp.writelines(lines)
+        os.replace(tmp_path, USAGE_LOG)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def open_locked_log():
+    """Open the usage log for appending with an exclusive lock held.
+
+    Retries if a concurrent compaction replaced the file while we waited.
+    """
+    while True:
+        f = open(USAGE_LOG, "a+")
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            if os.fstat(f.fileno()).st_ino == os.stat(USAGE_LOG).st_ino:
+                return f
+        except OSError:
+            pass
+        f.close()
+
+
+def record_use(session_id: str) -> None:
+    """Append a resume of session_id to the usage log, compacting it when large."""
+    try:
+        USAGE_LOG.parent.mkdir(parents=True, exist_ok=True)
+        with open_locked_log() as f:
+            f.write(f"{time.time():.0f}\t{session_id}\t1\n")
+            f.flush()
+            if f.tell() > COMPACT_BYTES:
+                compact(f)
+    except OSError:
+        pass
+
+
+def rank_sessions(sessions: List[dict], scores: Optional[Dict[str, float]] = None) -> None:
+    """Sort sessions in place: used sessions by frecency, then the rest by modified date.
+
+    Expects sessions already sorted by modified date (csi.sort_sessions);
+    the sort is stable, so ties and unused sessions keep that order.
+    """
+    if scores is None:
+        scores = load_scores()
+    if scores:
+        sessions.sort(key=lambda s: -scores.get(s["sessionId"], 0.0))
@@ -2,151 +2,17 @@
 """
 Claude session navigator - lists all Claude Code sessions and opens
 a new zellij pane in the selected project directory.
+
+fzf runs this script with --preview once per highlighted row, so that
+path is answered before argparse and the other session modules are
+imported. Modules behind an option (search, stats, export, archive) are
+imported by the branch that uses them.
 """
 
-import argparse
-import json
 import os
-import subprocess as sp
 import sys
-from pathlib import Path
-from typing import List, Optional
-
-
-CLAUDE_PROJECTS_DIR = Path.home() / ".claude" / "projects"
-
-
-def parse_session_jsonl(jsonl_path: Path) -> Optional[dict]:
-    """Parse a session .jsonl file to extract session info."""
-    custom_title = ""
-    first_prompt = ""
-    project_path = ""
-    session_id = jsonl_path.stem
-    modified = ""
-
-    try:
-        with open(jsonl_path, "r") as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-
-                # Get custom title if present
-                if entry.get("type") == "custom-title":
-                    custom_title = entry.get("customTitle", "")
-
-                # Get project path from user messages
-                if entry.get("type") == "user" and not project_path:
-                    project_path = entry.get("cwd", "")
-
-                # Get first prompt from user messages
-                if entry.get("type") == "user" and not first_prompt:
-                    msg = entry.get("message", {})
-                    content = msg.get("content", [])
-                    for item in content:
-                        if isinstance(item, dict) and item.get("type") == "text":
-                            first_prompt = item.get("text", "")[:60]
-                            break
-                        elif isinstance(item, str):
-                            first_prompt = item[:60]
-                            break
-
-        # Get modified time from file
-        modified = jsonl_path.stat().st_mtime
-
-        session_name = custom_title or first_prompt or session_id
-        if project_path and session_id:
-            return {
-                "sessionId": session_id,
-                "projectPath": project_path,
-                "sessionName": session_name,
-                "modified": modified,
-            }
-    except (IOError, OSError):
-        pass
-    return None
-
-
-def get_sessions() -> List[dict]:
-    """Find and parse all sessions from index files and individual .jsonl files."""
-    sessions = []
-    indexed_sessions = set()  # Track sessions found in index files
-
-    if not CLAUDE_PROJECTS_DIR.exists():
-        return sessions
-
-    for project_dir in CLAUDE_PROJECTS_DIR.iterdir():
-        if not project_dir.is_dir():
-            continue
-
-        index_file = project_dir / "sessions-index.json"
-
-        # Try to read from sessions-index.json first
-        if index_file.exists():
-            try:
-                with open(index_file, "r") as f:
-                    data = json.load(f)
-
-                for entry in data.get("entries", []):
-                    session_id = entry.get("sessionId", "")
-                    project_path = entry.get("projectPath", "")
-                    custom_title = entry.get("customTitle", "")
-                    summary = entry.get("summary", "")
-                    first_prompt = entry.get("firstPrompt", "")[:60]
-                    modified = entry.get("modified", "")
-
-                    # Use customTitle, then summary, then firstPrompt as session name
-                    session_name = custom_title or summary or first_prompt
-
-                    if project_path and session_id:
-                        indexed_sessions.add(session_id)
-                        sessions.append({
-                            "sessionId": session_id,
-                            "projectPath": project_path,
-                            "sessionName": session_name,
-                            "modified": modified,
-                        })
-            except (json.JSONDecodeError, IOError):
-                pass
-
-        # Scan individual .jsonl files for sessions not in index
-        for jsonl_file in project_dir.glob("*.jsonl"):
-            session_id = jsonl_file.stem
-            # Skip subagent sessions and already indexed sessions
-            if session_id.startswith("agent-") or session_id in indexed_sessions:
-                continue
-
-            session = parse_session_jsonl(jsonl_file)
-            # Skip sessions with very short names (likely typos/tests)
-            if session and len(session.get("sessionName", "")) >= 3:
-                sessions.append(session)
-
-    # Sort by modified date (most recent first)
-    sessions.sort(key=lambda x: x.get("modified", 0) if isinstance(x.get("modified"), (int, float)) else 0, reverse=True)
-    return sessions
-
-
-def gum_select(items: List[str], header: str = "Claude Sessions") -> Optional[str]:
-    """Run gum filter with the given items and return the selected line."""
-    if not items:
-        print("No Claude sessions found")
-        return None
-
-    input_text = "\n".join(items)
-
-    proc = sp.Popen(
-        ["gum", "filter", "--header", header],
-        stdin=sp.PIPE,
-        stdout=sp.PIPE,
-        text=True
-    )
-    output, _ = proc.communicate(input=input_text)
 
-    if proc.returncode != 0:
-        return None
-
-    return output.strip()
+import claude_session_index as csi
 
 
 def resume_session(cwd: str, session_id: str) -> None:
@@ -161,36 +27,163 @@ def launch_sidecar(cwd: str) -> None:
     os.execvp("sidecar", ["sidecar", "-project", cwd])
 
 
+def print_preview(path: str) -> None:
+    """Print the preview for the session whose transcript is at path (fzf --preview)."""
+    session = {"sessionId": os.path.splitext(os.path.basename(path))[0], "jsonlPath": path}
+    if not os.path.exists(path):
+        for archived in csi.load_archived_sessions():
+            if archived["sessionId"] == session["sessionId"]:
+                session = archived
+                break
+
+    conn = csi.open_catalog()
+    try:
+        print(csi.session_preview(session, conn))
+    finally:
+        if conn:
+            conn.close()
+
+
 def main() -> None:
+    if len(sys.argv) == 3 and sys.argv[1] == "--preview":
+        print_preview(sys.argv[2])
+        return
+
+    import argparse
+    import shlex
+
+    import claude_session_picker as csp
+    import claude_session_usage as csu
+
     parser = argparse.ArgumentParser(description="Claude session navigator")
     parser.add_argument(
         "--sidecar",
         action="store_true",
         help="Launch sidecar TUI in the selected session's project directory",
     )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="Scan project directories with N worker processes (0 = one per core)",
+    )
+    parser.add_argument(
+        "-s", "--search",
+        metavar="QUERY",
+        help="Only list sessions whose transcript text matches QUERY, best match first",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print per-session and per-project usage stats instead of opening the picker",
+    )
+    parser.add_argument(
+        "--csv",
+        action="store_true",
+        help="With --stats, write CSV instead of a table",
+    )
+    parser.add_argument(
+        "--picker",
+        choices=csp.PICKERS,
+        default="native",
+        help="Session picker: built-in fuzzy finder (default), gum filter or fzf",
+    )
+    parser.add_argument(
+        "--sort",
+        choices=["frecency", "modified"],
+        default="frecency",
+        help="List sessions you resume often first (default) or strictly by modified date",
+    )
+    parser.add_argument(
+        "--preview",
+        metavar="TRANSCRIPT",
+        help="Print the last exchanges of the session at TRANSCRIPT and exit (used by fzf)",
+    )
+    parser.add_argument(
+        "--export",
+        metavar="FILE",
+        help="Write this host's session catalog to FILE for other machines and exit",
+    )
+    parser.add_argument(
+        "--import",
+        dest="import_files",
+        nargs="+",
+        metavar="FILE",
+        help="Add other hosts' catalog exports to the local host list and exit",
+    )
+    parser.add_argument(
+        "--all-hosts",
+        action="store_true",
+        help="Also list sessions from imported host catalogs (resumed over ssh)",
+    )
     args = parser.parse_args()
 
-    sessions = get_sessions()
+    if args.preview:
+        print_preview(args.preview)
+        return
+
+    if args.import_files:
+        import claude_session_export as cse
+        try:
+            for host, count in cse.import_exports(args.import_files):
+                print(f"Imported {count} sessions from {host}")
+        except (OSError, cse.ExportError) as e:
+            print(f"Import failed: {e}")
+            sys.exit(1)
+        return
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    sessions = csi.load_sessions(jobs, include_archived=True)
+
+    if args.export or args.all_hosts:
+        import claude_session_export as cse
+
+    if args.export:
+        count = cse.write_export(args.export, sessions)
+        print(f"Exported {count} sessions to {args.export}")
+        return
+
+    if args.all_hosts:
+        sessions.extend(cse.load_host_sessions())
+        csi.sort_sessions(sessions)
 
     if not sessions:
         print("No Claude sessions found")
         sys.exit(1)
 
+    if args.stats:
+        import claude_session_stats as cst
+        cst.print_stats_report(sessions, args.csv)
+        return
+
+    if args.search:
+        import claude_session_search as css
+        sessions = css.search_sessions(args.search, sessions)
+        if not sessions:
+            print(f"No Claude sessions matching: {args.search}")
+            sys.exit(1)
+
+    # Search results keep their relevance order
+    if args.sort == "frecency" and not args.search:
+        csu.rank_sessions(sessions)
+
     # Build mapping of display name -> session data
-    # Use index to handle duplicate names
-    session_map = {}
-    display_names = []
-    for i, s in enumerate(sessions):
-        name = s["sessionName"].replace("\n", " ")
-        # Add index suffix if name already exists
-        display_name = name
-        if name in session_map:
-            display_name = f"{name} ({i})"
-        session_map[display_name] = s
-        display_names.append(display_name)
-
-    # Run gum selection
-    selected = gum_select(display_names)
+    session_map, display_names = csi.build_session_map(sessions)
+
+    # Previews are rendered lazily as rows are highlighted
+    conn = csi.open_catalog()
+    preview_command = f"{shlex.quote(sys.executable)} {shlex.quote(os.path.abspath(__file__))} --preview {{2}}"
+    try:
+        selected = csp.select(
+            display_names,
+            picker=args.picker,
+            preview=lambda name: csi.session_preview(session_map[name], conn),
+            keys=[csi.transcript_path(session_map[name]) for name in display_names],
+            preview_command=preview_command,
+        )
+    finally:
+        if conn:
+            conn.close()
 
     if not selected:
         sys.exit(0)
@@ -204,6 +197,18 @@ def main() -> None:
     project_path = session["projectPath"]
     session_id = session["sessionId"]
 
+    if session.get("host"):
+        import claude_session_export as cse
+        csu.record_use(session_id)
+        command = cse.ssh_resume_command(session)
+        os.execvp(command[0], command)
+
+    # Archived sessions are restored into ~/.claude/projects before resuming
+    if session.get("archived"):
+        import claude_archive_session as cas
+        if not cas.restore_session(session):
+            sys.exit(1)
+
     if not os.path.isdir(project_path):
         print(f"Directory not found: {project_path}")
         sys.exit(1)
@@ -212,6 +217,7 @@ def main() -> None:
     if args.sidecar:
         launch_sidecar(project_path)
     else:
+        csu.record_use(session_id)
         resume_session(project_path, session_id)
 
 
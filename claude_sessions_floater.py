@@ -2,110 +2,318 @@
 """
 Claude session navigator (floater mode) - lists all Claude Code sessions
 and opens the selected one in a new zellij split pane.
+
+A session that is already open in this zellij session (its pane or tab
+is named claude:<id>) is focused instead of being resumed a second time.
+Panes opened here run claude through a helper (--run-session) that holds
+a lock on open-sessions/<id>.lock while it runs, so a pane whose claude
+has exited is not mistaken for an open session.
+
+With --pool N the floater keeps N warm tabs (claude-pool-<slot>), each
+running a helper (--warm-pane) that waits on a FIFO for a project dir
+and session id and then execs claude in place. A waiting helper holds a
+lock on <slot>.lock, so liveness is checked without waking it. Opening a
+session claims a warm tab and renames it after the session, so no pane
+has to be created on the critical path. The pool is then refilled by a
+detached process (--refill-pool), after the floater has exited; creating
+the tabs briefly switches to them before focus returns.
 """
 
-import json
+import argparse
+import fcntl
 import os
+import re
 import subprocess as sp
 import sys
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import Optional
+
+import claude_archive_session as cas
+import claude_session_index as csi
+import claude_session_picker as csp
+import claude_session_usage as csu
+
+
+POOL_DIR = csi.CACHE_DIR / "pane-pool"
+SESSION_LOCK_DIR = csi.CACHE_DIR / "open-sessions"
+POOL_TAB_PREFIX = "claude-pool-"
+PANE_PREFIX = "claude:"
+# Seconds to wait for a warm helper to accept a session
+CLAIM_TIMEOUT = 2.0
+
+POOL_LAYOUT = """layout {{
+    pane name="{tab}" command="{python}" {{
+        args "{script}" "--warm-pane" "{slot}"
+    }}
+}}
+"""
 
 
-CLAUDE_PROJECTS_DIR = Path.home() / ".claude" / "projects"
+def kdl_string(value: str) -> str:
+    """Escape value for use inside a double-quoted KDL string."""
+    return value.replace("\\", "\\\\").replace('"', '\\"')
 
 
-def get_sessions() -> List[dict]:
-    """Find and parse all sessions-index.json files."""
-    sessions = []
+def session_pane_name(session_id: str) -> str:
+    return f"{PANE_PREFIX}{session_id[:8]}"
 
-    if not CLAUDE_PROJECTS_DIR.exists():
-        return sessions
 
-    for project_dir in CLAUDE_PROJECTS_DIR.iterdir():
-        if not project_dir.is_dir():
-            continue
+def claude_command(session_id: str) -> list:
+    return ["claude", "--resume", session_id, "--dangerously-skip-permissions"]
 
-        index_file = project_dir / "sessions-index.json"
-        if not index_file.exists():
-            continue
 
-        try:
-            with open(index_file, "r") as f:
-                data = json.load(f)
-
-            for entry in data.get("entries", []):
-                session_id = entry.get("sessionId", "")
-                project_path = entry.get("projectPath", "")
-                custom_title = entry.get("customTitle", "")
-                summary = entry.get("summary", "")
-                first_prompt = entry.get("firstPrompt", "")[:60]
-                modified = entry.get("modified", "")
-
-                session_name = custom_title or summary or first_prompt
-
-                if project_path and session_id:
-                    sessions.append({
-                        "sessionId": session_id,
-                        "projectPath": project_path,
-                        "sessionName": session_name,
-                        "modified": modified,
-                    })
-        except (json.JSONDecodeError, IOError):
-            continue
+def zellij_action(*args: str) -> str:
+    """Run a zellij action and return its stdout ("" on failure)."""
+    proc = sp.run(["zellij", "action", *args], stdout=sp.PIPE, stderr=sp.DEVNULL, text=True)
+    return proc.stdout if proc.returncode == 0 else ""
+
 
-    sessions.sort(key=lambda x: x.get("modified", ""), reverse=True)
-    return sessions
+def open_zellij_pane(cwd: str, session_id: str) -> None:
+    """Open a new zellij split pane and resume the Claude session."""
+    sp.run([
+        "zellij", "run", "--name", session_pane_name(session_id), "--cwd", cwd, "--",
+        sys.executable, os.path.abspath(__file__), "--run-session", session_id,
+    ])
 
 
-def gum_select(items: List[str], header: str = "Claude Sessions") -> Optional[str]:
-    """Run gum filter with the given items and return the selected line."""
-    if not items:
-        print("No Claude sessions found")
+# -- reuse --
+
+def lock_held(path: Path) -> bool:
+    """True if another process holds a flock on path."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        return False
+    except BlockingIOError:
+        return True
+    finally:
+        os.close(fd)
+
+
+def session_lock(session_id: str) -> Path:
+    return SESSION_LOCK_DIR / f"{session_id}.lock"
+
+
+def run_session(session_id: str) -> None:
+    """Exec claude for the session, holding its lock for as long as claude runs."""
+    SESSION_LOCK_DIR.mkdir(parents=True, exist_ok=True)
+    fd = os.open(session_lock(session_id), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        pass  # Already open in another pane, which keeps it marked open
+    # Inherited across exec, so the lock lives exactly as long as claude
+    os.set_inheritable(fd, True)
+    os.execvp("claude", claude_command(session_id))
+
+
+def find_session_tab(layout: str, session_id: str) -> Optional[str]:
+    """Return the tab holding the session's pane (or named after it), if open."""
+    name = session_pane_name(session_id)
+    tabs = [(m.start(), m.group(1)) for m in re.finditer(r'\btab name="([^"]*)"', layout)]
+    if any(tab == name for _, tab in tabs):
+        return name
+
+    idx = layout.find(f'name="{name}"')
+    if idx == -1:
         return None
+    owners = [tab for start, tab in tabs if start < idx]
+    return owners[-1] if owners else None
 
-    input_text = "\n".join(items)
 
-    proc = sp.Popen(
-        ["gum", "filter", "--header", header],
-        stdin=sp.PIPE,
-        stdout=sp.PIPE,
-        text=True
-    )
-    output, _ = proc.communicate(input=input_text)
+def current_tab(layout: str) -> Optional[str]:
+    m = re.search(r'\btab name="([^"]*)"[^{\n]*\bfocus=true', layout)
+    return m.group(1) if m else None
+
+
+# -- warm pane pool --
+
+def pool_fifo(slot: int) -> Path:
+    return POOL_DIR / f"{slot}.fifo"
+
+
+def pool_lock(slot: int) -> Path:
+    return POOL_DIR / f"{slot}.lock"
+
+
+def warm_slot_alive(slot: int) -> bool:
+    """True if a warm helper is waiting in the slot.
 
-    if proc.returncode != 0:
+    A waiting helper holds an exclusive lock on the slot's lock file, so
+    this never touches the FIFO (opening it would wake the helper).
+    """
+    return lock_held(pool_lock(slot))
+
+
+def claim_warm_pane(pool_size: int, cwd: str, session_id: str) -> Optional[int]:
+    """Hand the session to the first live warm helper. Returns its slot.
+
+    The helper drops its slot lock once it has accepted the request, which
+    serves as the acknowledgement; a helper that does not answer within
+    CLAIM_TIMEOUT seconds is skipped.
+    """
+    # The helper ignores requests it cannot exec; never send one
+    if not os.path.isdir(cwd) or not session_id or "\n" in cwd:
         return None
 
-    return output.strip()
+    for slot in range(pool_size):
+        if not warm_slot_alive(slot):
+            continue
+        try:
+            fd = os.open(pool_fifo(slot), os.O_WRONLY | os.O_NONBLOCK)
+        except OSError:
+            continue
+        try:
+            os.write(fd, f"{cwd}\n{session_id}\n".encode())
+        except OSError:
+            continue
+        finally:
+            os.close(fd)
+
+        deadline = time.monotonic() + CLAIM_TIMEOUT
+        while time.monotonic() < deadline:
+            if not warm_slot_alive(slot):
+                return slot
+            time.sleep(0.01)
+    return None
+
+
+def refill_pool(pool_size: int, layout: str) -> None:
+    """Spawn warm tabs for empty slots, then return focus to the current tab."""
+    missing = [slot for slot in range(pool_size) if not warm_slot_alive(slot)]
+    if not missing:
+        return
+
+    return_tab = current_tab(layout)
+    POOL_DIR.mkdir(parents=True, exist_ok=True)
+    for slot in missing:
+        tab = f"{POOL_TAB_PREFIX}{slot}"
+        layout_file = POOL_DIR / f"{slot}.kdl"
+        layout_file.write_text(POOL_LAYOUT.format(
+            tab=tab,
+            python=kdl_string(sys.executable),
+            script=kdl_string(os.path.abspath(__file__)),
+            slot=slot,
+        ))
+        zellij_action("new-tab", "--layout", str(layout_file), "--name", tab)
+    if return_tab:
+        zellij_action("go-to-tab-name", return_tab)
+
+
+def spawn_refill(pool_size: int) -> None:
+    """Refill the pool from a detached process so the floater can exit now."""
+    sp.Popen(
+        [sys.executable, os.path.abspath(__file__), "--refill-pool", str(pool_size)],
+        stdin=sp.DEVNULL, stdout=sp.DEVNULL, stderr=sp.DEVNULL,
+        start_new_session=True,
+    )
 
 
-def open_zellij_pane(cwd: str, session_id: str) -> None:
-    """Open a new zellij split pane and resume the Claude session."""
-    sp.run([
-        "zellij", "run", "--cwd", cwd, "--",
-        "claude", "--resume", session_id, "--dangerously-skip-permissions"
-    ])
+def warm_pane(slot: int) -> None:
+    """Pool helper: wait for a session on the slot's FIFO, then exec claude in place."""
+    fifo = pool_fifo(slot)
+    POOL_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Held while waiting: marks the slot alive. The fd is not inherited,
+    # so exec would release it anyway, but it is dropped explicitly once
+    # a request is accepted to acknowledge the claim.
+    lock_fd = os.open(pool_lock(slot), os.O_RDWR | os.O_CREAT, 0o600)
+    fcntl.flock(lock_fd, fcntl.LOCK_EX)
+    try:
+        os.mkfifo(fifo, 0o600)
+    except FileExistsError:
+        pass
+
+    print(f"Warm Claude pane (pool slot {slot}), waiting for a session...")
+    while True:
+        # Blocks until the floater opens the FIFO for writing
+        with open(fifo, "r") as f:
+            request = f.read().split("\n")
+        if len(request) >= 2 and os.path.isdir(request[0]) and request[1]:
+            break
+
+    cwd, session_id = request[0], request[1]
+    os.unlink(fifo)
+    os.close(lock_fd)
+    os.chdir(cwd)
+    run_session(session_id)
+
+
+def open_session(cwd: str, session_id: str, pool_size: int) -> None:
+    """Focus the session if it is open, else resume it in a warm or new pane."""
+    layout = zellij_action("dump-layout")
+
+    # A pane whose claude has exited keeps its name; only reuse live ones
+    tab = find_session_tab(layout, session_id)
+    if tab and lock_held(session_lock(session_id)):
+        zellij_action("go-to-tab-name", tab)
+        return
+
+    if pool_size > 0:
+        slot = claim_warm_pane(pool_size, cwd, session_id)
+        if slot is not None:
+            zellij_action("go-to-tab-name", f"{POOL_TAB_PREFIX}{slot}")
+            zellij_action("rename-tab", session_pane_name(session_id))
+            spawn_refill(pool_size)
+            return
+
+    open_zellij_pane(cwd, session_id)
+    if pool_size > 0:
+        spawn_refill(pool_size)
 
 
 def main() -> None:
-    sessions = get_sessions()
+    parser = argparse.ArgumentParser(description="Claude session navigator (floater mode)")
+    parser.add_argument(
+        "--picker",
+        choices=csp.PICKERS,
+        default="native",
+        help="Session picker: built-in fuzzy finder (default), gum filter or fzf",
+    )
+    parser.add_argument(
+        "--sort",
+        choices=["frecency", "modified"],
+        default="frecency",
+        help="List sessions you resume often first (default) or strictly by modified date",
+    )
+    parser.add_argument(
+        "--pool",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Keep N warm zellij tabs ready to resume sessions into",
+    )
+    parser.add_argument("--warm-pane", type=int, metavar="SLOT", help=argparse.SUPPRESS)
+    parser.add_argument("--refill-pool", type=int, metavar="N", help=argparse.SUPPRESS)
+    parser.add_argument("--run-session", metavar="SESSION_ID", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.warm_pane is not None:
+        warm_pane(args.warm_pane)
+        return
+    if args.refill_pool is not None:
+        refill_pool(args.refill_pool, zellij_action("dump-layout"))
+        return
+    if args.run_session:
+        run_session(args.run_session)
+        return
+
+    sessions = csi.load_sessions(include_archived=True)
 
     if not sessions:
         print("No Claude sessions found")
         sys.exit(1)
 
-    session_map = {}
-    display_names = []
-    for i, s in enumerate(sessions):
-        name = s["sessionName"].replace("\n", " ")
-        display_name = name
-        if name in session_map:
-            display_name = f"{name} ({i})"
-        session_map[display_name] = s
-        display_names.append(display_name)
+    if args.sort == "frecency":
+        csu.rank_sessions(sessions)
+
+    session_map, display_names = csi.build_session_map(sessions)
 
-    selected = gum_select(display_names)
+    selected = csp.select(display_names, picker=args.picker)
 
     if not selected:
         sys.exit(0)
@@ -118,11 +326,16 @@ def main() -> None:
     project_path = session["projectPath"]
     session_id = session["sessionId"]
 
+    # Archived sessions are restored into ~/.claude/projects before resuming
+    if session.get("archived") and not cas.restore_session(session):
+        sys.exit(1)
+
     if not os.path.isdir(project_path):
         print(f"Directory not found: {project_path}")
         sys.exit(1)
 
-    open_zellij_pane(project_path, session_id)
+    csu.record_use(session_id)
+    open_session(project_path, session_id, args.pool)
 
 
 if __name__ == "__main__":
@@ -20,13 +20,13 @@ CDP setup: ~/.config/vivaldi-stable.conf must contain:
   --remote-debugging-port=9222
 """
 import argparse
+import hashlib
 import json
 import os
 import shlex
 import subprocess as sp
 import sys
 import tempfile
-import time
 import uuid
 from typing import Any, Dict, List, Optional
 
@@ -69,84 +69,380 @@ def respawn_in_wezterm() -> None:
 # -- CDP tab queries --
 
 
-def get_chrome_tabs(ws_url: str) -> Optional[List[Dict[str, Any]]]:
+def get_chrome_tabs(conn: vb.CDPConnection) -> Optional[List[Dict[str, Any]]]:
     """Query chrome.tabs.query({}) via the Vivaldi UI WebSocket.
 
     Returns a list of {id, index, windowId, title, url, vivExtData} dicts,
     or None on failure.  vivExtData is parsed from JSON into a dict.
+    Served by the tab daemon when it is running.
     """
-    expr: str = (
-        "chrome.tabs.query({}).then(function(tabs) {"
-        "  return tabs.map(function(t) {"
-        "    var ext = {};"
-        "    try { ext = JSON.parse(t.vivExtData || '{}'); } catch(e) {}"
-        "    return {id: t.id, index: t.index, windowId: t.windowId,"
-        "            title: t.title, url: t.url, vivExtData: ext};"
-        "  });"
-        "})"
-    )
-    result: Any = vb.cdp_ws_evaluate(ws_url, expr)
+    snapshot: Optional[Dict[str, Any]] = vb.query_tab_daemon()
+    if snapshot is not None:
+        return snapshot["chromeTabs"]
+
+    result: Any = conn.evaluate(vb.CHROME_TABS_QUERY)
     if isinstance(result, list):
         return result
     return None
 
 
-def get_tiled_tabs(ws_url: str) -> List[Dict[str, Any]]:
+def get_tiled_tabs(conn: vb.CDPConnection) -> List[Dict[str, Any]]:
     """Return currently tiled tabs with their tiling metadata.
 
     Reads the TilingToggle React component state for the active tileId,
     then finds all pages whose vivExtData.tiling.id matches.
     Returns list of {id, title, url, tiling: {id, index, layout, type}}.
     """
-    result: Any = vb.cdp_ws_evaluate(ws_url, '''
-    (function() {
+    result: Any = tiler_call(conn, "tiledTabs()")
+
+    if isinstance(result, dict) and "tiledTabs" in result:
+        return result["tiledTabs"]
+    return []
+
+
+# -- Vivaldi UI program --
+#
+# Every operation below is one call into this JS library, installed once
+# in the Vivaldi UI as window.__tabTiler (see tiler_call). Component
+# handles found by walking React fibers are cached there and only
+# re-resolved when they go stale. Each step resolves its promise only
+# once Vivaldi's state reflects the change (a React commit, the stack
+# showing up in the tab strip, the tileId appearing), so steps can be
+# chained in a single round trip without fixed sleeps in between.
+
+# How long each step waits for the UI to reflect its change. One call
+# chains at most four waits (stack, untile, popup button, tileId), so
+# TILER_TIMEOUT leaves room for all of them plus the work in between.
+STEP_TIMEOUT_MS: int = 2000
+TILER_TIMEOUT: float = 4 * STEP_TIMEOUT_MS / 1000 + 5
+
+TILER_JS: str = f"var STEP_TIMEOUT_MS = {STEP_TIMEOUT_MS};\n" + """
+function reactFiber(el) {
+    var key = Object.keys(el).find(function(k) {
+        return k.startsWith("__reactFiber");
+    });
+    return key ? el[key] : null;
+}
+
+function isMounted(component) {
+    var updater = component.updater;
+    return !updater || !updater.isMounted || updater.isMounted(component);
+}
+
+// Resolved component handles, keyed by name: {el, component}. Reused
+// until the element leaves the DOM or React unmounts the component.
+var handles = {};
+function cached(name, resolve) {
+    var entry = handles[name];
+    if (!entry || !entry.el.isConnected || !isMounted(entry.component)) {
+        entry = handles[name] = resolve();
+    }
+    return entry ? entry.component : null;
+}
+
+// TilingToggle component: state.tileId, untile(), drawerOpen
+function tilingToggle() {
+    return cached("tilingToggle", function() {
         var btn = document.querySelector("button[name=TilingToggle]");
-        if (!btn) return {error: "no TilingToggle"};
-        var fiberKey = Object.keys(btn).find(function(k) {
-            return k.startsWith("__reactFiber");
+        if (!btn) return null;
+        var f = reactFiber(btn);
+        for (var i = 0; f && i < 5; i++) f = f.return;
+        return f && f.stateNode ? {el: btn, component: f.stateNode} : null;
+    });
+}
+
+// Tab strip component: handleClick(page, modifiers), props.pages
+function tabStrip() {
+    return cached("tabStrip", function() {
+        var el = document.querySelector(".tab-strip");
+        if (!el) return null;
+        var f = reactFiber(el);
+        for (var depth = 0; f && depth < 10; depth++) {
+            if (f.stateNode && f.stateNode.handleClick) {
+                return {el: el, component: f.stateNode};
+            }
+            f = f.return;
+        }
+        return null;
+    });
+}
+
+function stripPages(strip) {
+    var pages = strip.props.pages;
+    var size = pages ? (pages.size || pages.length || 0) : 0;
+    var out = [];
+    for (var i = 0; i < size; i++) out.push(pages.get ? pages.get(i) : pages[i]);
+    return out;
+}
+
+function extData(page) {
+    var ext = page.vivExtData || {};
+    if (typeof ext === "string") {
+        try { ext = JSON.parse(ext); } catch (e) { ext = {}; }
+    }
+    return ext;
+}
+
+// Poll test() until it returns something truthy; resolves with that
+// value, or null after timeoutMs.
+function waitFor(test, timeoutMs) {
+    return new Promise(function(resolve) {
+        var start = Date.now();
+        (function poll() {
+            var value = null;
+            try { value = test(); } catch (e) {}
+            if (value || Date.now() - start > timeoutMs) {
+                resolve(value || null);
+                return;
+            }
+            setTimeout(poll, 16);
+        })();
+    });
+}
+
+// Resolves after React has committed pending updates of component
+function setStateAsync(component, state) {
+    return new Promise(function(resolve) {
+        component.setState(state, resolve);
+    });
+}
+
+function tiledTabs() {
+    var toggle = tilingToggle();
+    if (!toggle) return {error: "no TilingToggle"};
+    var tileId = toggle.state.tileId;
+    if (!tileId) return {tiledTabs: [], tileId: null};
+
+    var strip = tabStrip();
+    if (!strip) return {error: "no tab-strip"};
+    var tiled = [];
+    stripPages(strip).forEach(function(page) {
+        var ext = extData(page);
+        if (ext.tiling && ext.tiling.id === tileId) {
+            tiled.push({
+                id: page.id, title: page.title || "",
+                url: page.url || "", tiling: ext.tiling
+            });
+        }
+    });
+    return {tiledTabs: tiled, tileId: tileId};
+}
+
+// Set vivExtData.group on every tab, move them next to the first one,
+// then wait for the tab strip to show the new stack.
+function stackTabs(tabIds, groupId) {
+    var errors = [];
+    function update(tabId) {
+        return new Promise(function(resolve) {
+            chrome.tabs.get(tabId, function(tab) {
+                if (chrome.runtime.lastError) {
+                    errors.push({id: tabId, error: chrome.runtime.lastError.message});
+                    resolve(false);
+                    return;
+                }
+                var ext = {};
+                try { ext = JSON.parse(tab.vivExtData || "{}"); } catch (e) {}
+                ext.group = groupId;
+                chrome.tabs.update(tabId, {vivExtData: JSON.stringify(ext)}, function() {
+                    if (chrome.runtime.lastError) {
+                        errors.push({id: tabId, error: chrome.runtime.lastError.message});
+                        resolve(false);
+                    } else {
+                        resolve(true);
+                    }
+                });
+            });
         });
-        var f = btn[fiberKey];
-        for (var i = 0; i < 5; i++) f = f.return;
-        var tileId = f.stateNode.state.tileId;
-        if (!tileId) return {tiledTabs: [], tileId: null};
-
-        var tabStrip = document.querySelector(".tab-strip");
-        if (!tabStrip) return {error: "no tab-strip"};
-        var fk2 = Object.keys(tabStrip).find(function(k) {
-            return k.startsWith("__reactFiber");
+    }
+    function moveAdjacent() {
+        return new Promise(function(resolve) {
+            chrome.tabs.get(tabIds[0], function(first) {
+                if (chrome.runtime.lastError || !first) { resolve(); return; }
+                var moves = tabIds.slice(1).map(function(tabId, i) {
+                    return new Promise(function(done) {
+                        chrome.tabs.move(tabId, {index: first.index + i + 1}, function() {
+                            void chrome.runtime.lastError;
+                            done();
+                        });
+                    });
+                });
+                Promise.all(moves).then(function() { resolve(); });
+            });
         });
-        var f2 = tabStrip[fk2];
-        for (var d = 0; d < 10; d++) {
-            if (f2.stateNode && f2.stateNode.handleClick) break;
-            f2 = f2.return;
-            if (!f2) return {error: "no handleClick"};
-        }
-        var pages = f2.stateNode.props.pages;
-        var pagesSize = pages.size || pages.length || 0;
-        var tiled = [];
-        for (var i = 0; i < pagesSize; i++) {
-            var page = pages.get ? pages.get(i) : pages[i];
-            var ext = page.vivExtData || {};
-            if (ext.tiling && ext.tiling.id === tileId) {
-                tiled.push({
-                    id: page.id, title: page.title || "",
-                    url: page.url || "", tiling: ext.tiling
+    }
+
+    return Promise.all(tabIds.map(update)).then(function(updated) {
+        var grouped = updated.filter(Boolean).length;
+        var result = {errors: errors, grouped: grouped, groupId: groupId};
+        return moveAdjacent().then(function() {
+            return waitFor(function() {
+                var strip = tabStrip();
+                if (!strip) return false;
+                var inStack = stripPages(strip).filter(function(page) {
+                    return extData(page).group === groupId;
                 });
+                return inStack.length >= grouped;
+            }, STEP_TIMEOUT_MS);
+        }).then(function(shown) {
+            result.shown = !!shown;
+            return result;
+        });
+    });
+}
+
+// Select pages by URL through the tab strip's handleClick (plain click on
+// the first, ctrl+click on the rest), which Vivaldi's tiling recognizes.
+function selectPages(urls) {
+    var strip = tabStrip();
+    if (!strip) return Promise.resolve({error: "no tab-strip handleClick"});
+    var pages = stripPages(strip);
+    if (!pages.length) return Promise.resolve({error: "no pages prop"});
+
+    var matched = [];
+    var used = {};
+    urls.forEach(function(url) {
+        for (var i = 0; i < pages.length; i++) {
+            if (!used[i] && pages[i] && pages[i].url === url) {
+                matched.push(pages[i]);
+                used[i] = true;
+                break;
             }
         }
-        return {tiledTabs: tiled, tileId: tileId};
-    })()
-    ''')
+    });
+    if (matched.length < 2) {
+        return Promise.resolve({
+            error: "matched " + matched.length + "/" + urls.length,
+            pagesSize: pages.length,
+            sampleKeys: Object.keys(pages[0]).slice(0, 10),
+            firstTargetUrl: urls[0]
+        });
+    }
+
+    matched.forEach(function(page, i) {
+        strip.handleClick(page, {ctrlKey: i > 0, shiftKey: false, metaKey: false});
+    });
+    return setStateAsync(strip, {}).then(function() {
+        return {selected: matched.length};
+    });
+}
 
-    if isinstance(result, dict) and "tiledTabs" in result:
-        return result["tiledTabs"]
-    return []
+function untile() {
+    var toggle = tilingToggle();
+    if (!toggle) return Promise.resolve({untiled: false, reason: "no button"});
+    if (!toggle.state.tileId) {
+        return Promise.resolve({untiled: false, reason: "no active tiling"});
+    }
+    toggle.untile();
+    return waitFor(function() {
+        return !tilingToggle().state.tileId;
+    }, STEP_TIMEOUT_MS).then(function() {
+        return {untiled: true};
+    });
+}
+
+// Untile, open the Page Tiling popup, call the layout button's onMouseUp
+// and wait for the new tileId. Resolves true, or an error string.
+function tile(title) {
+    function popup(open) {
+        var toggle = tilingToggle();
+        return toggle ? setStateAsync(toggle, {drawerOpen: open}) : Promise.resolve();
+    }
+
+    return untile().then(function() {
+        if (!tilingToggle()) return "no TilingToggle";
+        return popup(true).then(function() {
+            return waitFor(function() {
+                var buttons = document.querySelectorAll(".PageTiling-Button");
+                for (var i = 0; i < buttons.length; i++) {
+                    if (buttons[i].getAttribute("title") === title) return buttons[i];
+                }
+                return null;
+            }, STEP_TIMEOUT_MS);
+        }).then(function(target) {
+            if (!target) return "no button: " + title;
+            var propsKey = Object.keys(target).find(function(k) {
+                return k.startsWith("__reactProps");
+            });
+            var props = target[propsKey];
+            if (!props || !props.onMouseUp) return "no onMouseUp";
+            props.onMouseUp({
+                type: "mouseup", button: 0,
+                target: target, currentTarget: target,
+                preventDefault: function() {},
+                stopPropagation: function() {}
+            });
+            // The tileId appearing means the layout is applied
+            return waitFor(function() {
+                return tilingToggle().state.tileId;
+            }, STEP_TIMEOUT_MS).then(function(tileId) {
+                return tileId ? true : "tiling did not take effect";
+            });
+        }).then(function(result) {
+            return popup(false).then(function() { return result; });
+        });
+    });
+}
+
+// Composite: stack (optional) -> select -> tile (optional), one round trip.
+function stackSelectTile(opts) {
+    var report = {};
+    var stacked = opts.groupId
+        ? stackTabs(opts.tabIds, opts.groupId).then(function(r) { report.stack = r; })
+        : Promise.resolve();
+    return stacked.then(function() {
+        return selectPages(opts.urls);
+    }).then(function(selected) {
+        report.select = selected;
+        if (selected.error || !opts.tileTitle) return report;
+        return tile(opts.tileTitle).then(function(tiled) {
+            report.tile = tiled;
+            return report;
+        });
+    });
+}
+"""
+
+
+TILER_VERSION: str = hashlib.md5(TILER_JS.encode()).hexdigest()[:8]
+
+# Installs the library as window.__tabTiler. Tagged with a hash of the
+# source so a changed TILER_JS replaces an older copy in a running UI.
+TILER_INSTALL: str = f"""(function() {{
+{TILER_JS}
+window.__tabTiler = {{
+    version: {json.dumps(TILER_VERSION)},
+    tiledTabs: tiledTabs, stackTabs: stackTabs, selectPages: selectPages,
+    untile: untile, tile: tile, stackSelectTile: stackSelectTile
+}};
+return true;
+}})()"""
+
+
+def tiler_call(conn: vb.CDPConnection, call: str) -> Any:
+    """Call an entry point of the injected window.__tabTiler helper.
+
+    The helper is installed once per UI page and keeps its resolved React
+    component handles between calls, so each call only sends the short
+    call expression. Installs (or upgrades) it first if it is missing.
+    Waits up to TILER_TIMEOUT for the call's promise to settle.
+    """
+    expr: str = (
+        f"window.__tabTiler && window.__tabTiler.version === {json.dumps(TILER_VERSION)}"
+        f" ? window.__tabTiler.{call} : {{tabTilerMissing: true}}"
+    )
+    result: Any = conn.evaluate(expr, timeout=TILER_TIMEOUT)
+    if isinstance(result, dict) and result.get("tabTilerMissing"):
+        _log(f"installing window.__tabTiler {TILER_VERSION}")
+        if conn.evaluate(TILER_INSTALL) is not True:
+            return None
+        result = conn.evaluate(expr, timeout=TILER_TIMEOUT)
+    return result
 
 
 # -- Vivaldi tab selection via React --
 
 
-def select_tabs_vivaldi(ws_url: str, tab_urls: List[str]) -> bool:
+def select_tabs_vivaldi(conn: vb.CDPConnection, tab_urls: List[str]) -> bool:
     """Select tabs using Vivaldi's internal React tab selection API.
 
     chrome.tabs.highlight() doesn't update Vivaldi's internal selection
@@ -154,77 +450,7 @@ def select_tabs_vivaldi(ws_url: str, tab_urls: List[str]) -> bool:
     strip React component and call handleClick to simulate ctrl+click
     multi-selection that Vivaldi's tiling system recognizes.
     """
-    urls_json: str = json.dumps(tab_urls)
-    expr: str = f'''
-    (function() {{
-        var tabStrip = document.querySelector('.tab-strip');
-        if (!tabStrip) return {{error: 'no tab-strip element'}};
-
-        var fiberKey = Object.keys(tabStrip).find(function(k) {{
-            return k.startsWith('__reactFiber');
-        }});
-        if (!fiberKey) return {{error: 'no react fiber'}};
-
-        // Walk up the fiber tree to find the component with handleClick
-        var f = tabStrip[fiberKey];
-        for (var depth = 0; depth < 10; depth++) {{
-            if (f.stateNode && f.stateNode.handleClick) break;
-            f = f.return;
-            if (!f) return {{error: 'no handleClick found within 10 levels'}};
-        }}
-        var component = f.stateNode;
-        if (!component || !component.handleClick) {{
-            return {{error: 'component missing handleClick'}};
-        }}
-
-        var pages = component.props.pages;
-        if (!pages) return {{error: 'no pages prop'}};
-
-        var targetUrls = {urls_json};
-        var matched = [];
-        var usedIndices = {{}};
-
-        // Match pages by URL, preserving selection order
-        for (var u = 0; u < targetUrls.length; u++) {{
-            var pagesSize = pages.size || pages.length || 0;
-            for (var idx = 0; idx < pagesSize; idx++) {{
-                if (usedIndices[idx]) continue;
-                var page = pages.get ? pages.get(idx) : pages[idx];
-                if (page && page.url === targetUrls[u]) {{
-                    matched.push(page);
-                    usedIndices[idx] = true;
-                    break;
-                }}
-            }}
-        }}
-
-        if (matched.length < 2) {{
-            var samplePage = pages.get ? pages.get(0) : pages[0];
-            var pageKeys = samplePage ? Object.keys(samplePage).slice(0, 10) : [];
-            return {{
-                error: 'matched ' + matched.length + '/' + targetUrls.length,
-                pagesSize: pages.size || pages.length || 0,
-                sampleKeys: pageKeys,
-                firstTargetUrl: targetUrls[0]
-            }};
-        }}
-
-        // First tab: plain click (replaces current selection)
-        component.handleClick(matched[0], {{
-            ctrlKey: false, shiftKey: false, metaKey: false
-        }});
-
-        // Remaining tabs: ctrl+click to add to selection
-        for (var i = 1; i < matched.length; i++) {{
-            component.handleClick(matched[i], {{
-                ctrlKey: true, shiftKey: false, metaKey: false
-            }});
-        }}
-
-        return {{selected: matched.length}};
-    }})()
-    '''
-    result: Any = vb.cdp_ws_evaluate(ws_url, expr)
+    result: Any = tiler_call(conn, f"selectPages({json.dumps(tab_urls)})")
     _log(f"select_tabs_vivaldi result: {result}")
 
     if isinstance(result, dict):
@@ -238,107 +464,61 @@ def select_tabs_vivaldi(ws_url: str, tab_urls: List[str]) -> bool:
 # -- Tiling via CDP --
 
 
-def untile_via_cdp(ws_url: str) -> bool:
+def untile_via_cdp(conn: vb.CDPConnection) -> bool:
     """Untile any currently tiled tabs. Returns True if something was untiled."""
     _log("untiling existing tiles")
-    result: Any = vb.cdp_ws_evaluate(ws_url, '''
-    (function() {
-        var btn = document.querySelector("button[name=TilingToggle]");
-        if (!btn) return {untiled: false, reason: "no button"};
-        var fiberKey = Object.keys(btn).find(function(k) {
-            return k.startsWith("__reactFiber");
-        });
-        var f = btn[fiberKey];
-        for (var i = 0; i < 5; i++) f = f.return;
-        var component = f.stateNode;
-        if (component.state.tileId) {
-            component.untile();
-            return {untiled: true};
-        }
-        return {untiled: false, reason: "no active tiling"};
-    })()
-    ''')
+    result: Any = tiler_call(conn, "untile()")
     if isinstance(result, dict):
         return result.get("untiled", False)
     return False
 
 
-def send_tile_via_cdp(ws_url: str, mode: str = DEFAULT_TILE_MODE) -> bool:
+def send_tile_via_cdp(conn: vb.CDPConnection, mode: str = DEFAULT_TILE_MODE) -> bool:
     """Tile tabs by calling Vivaldi's React tile button handler via CDP.
 
     Keyboard shortcuts and synthetic events don't reach Vivaldi's tiling
     system. Instead, we open the Page Tiling popup in the status bar,
     find the matching button, and call its onMouseUp React handler directly.
+    Any existing tiling is removed first.
     """
     btn_title: str = TILE_MODES.get(mode, TILE_MODES[DEFAULT_TILE_MODE])
     _log(f"tile via CDP: mode={mode} btn_title={btn_title}")
 
-    # Untile any existing tiling first
-    untile_via_cdp(ws_url)
-    time.sleep(0.15)
-
-    # Open the tiling popup by setting React component state
-    vb.cdp_ws_evaluate(ws_url, '''
-    (function() {
-        var btn = document.querySelector("button[name=TilingToggle]");
-        if (!btn) return;
-        var fiberKey = Object.keys(btn).find(function(k) {
-            return k.startsWith("__reactFiber");
-        });
-        var f = btn[fiberKey];
-        for (var i = 0; i < 5; i++) f = f.return;
-        f.stateNode.setState({drawerOpen: true});
-    })()
-    ''')
-    time.sleep(0.1)  # let popup render
-
-    # Call the matching tile button's onMouseUp handler
-    expr: str = f'''
-    (function() {{
-        var buttons = document.querySelectorAll(".PageTiling-Button");
-        var target = null;
-        buttons.forEach(function(btn) {{
-            if (btn.getAttribute("title") === "{btn_title}") target = btn;
-        }});
-        if (!target) return "no button: {btn_title}";
-        var propsKey = Object.keys(target).find(function(k) {{
-            return k.startsWith("__reactProps");
-        }});
-        var props = target[propsKey];
-        if (!props || !props.onMouseUp) return "no onMouseUp";
-        props.onMouseUp({{
-            type: "mouseup", button: 0,
-            target: target, currentTarget: target,
-            preventDefault: function(){{}},
-            stopPropagation: function(){{}}
-        }});
-        return true;
-    }})()
-    '''
-    result: Any = vb.cdp_ws_evaluate(ws_url, expr)
+    result: Any = tiler_call(conn, f"tile({json.dumps(btn_title)})")
     _log(f"tile result: {result}")
+    return result is True
 
-    # Close the popup
-    vb.cdp_ws_evaluate(ws_url, '''
-    (function() {
-        var btn = document.querySelector("button[name=TilingToggle]");
-        if (!btn) return;
-        var fiberKey = Object.keys(btn).find(function(k) {
-            return k.startsWith("__reactFiber");
-        });
-        var f = btn[fiberKey];
-        for (var i = 0; i < 5; i++) f = f.return;
-        f.stateNode.setState({drawerOpen: false});
-    })()
-    ''')
 
-    return result is True
+def stack_select_tile(
+    conn: vb.CDPConnection,
+    tabs: List[Dict[str, Any]],
+    mode: Optional[str] = None,
+    stack: bool = True,
+) -> Dict[str, Any]:
+    """Stack, select and tile tabs in one evaluation.
+
+    Optionally stacks the tabs first, then selects them and, if mode is
+    given, tiles them. Returns {"stack": ..., "select": ..., "tile": ...}
+    with the result of each step that ran (same shapes as
+    create_tab_stack, select_tabs_vivaldi and send_tile_via_cdp report),
+    or {} on failure.
+    """
+    opts: Dict[str, Any] = {
+        "tabIds": [t["id"] for t in tabs],
+        "groupId": str(uuid.uuid4()) if stack else None,
+        "urls": [t["url"] for t in tabs],
+        "tileTitle": TILE_MODES.get(mode, TILE_MODES[DEFAULT_TILE_MODE]) if mode else None,
+    }
+    _log(f"stack_select_tile: {opts}")
+    result: Any = tiler_call(conn, f"stackSelectTile({json.dumps(opts)})")
+    _log(f"stack_select_tile result: {result}")
+    return result if isinstance(result, dict) else {}
 
 
 # -- Tab stacking via vivExtData.group --
 
 
-def create_tab_stack(ws_url: str, tab_ids: List[int]) -> Optional[str]:
+def create_tab_stack(conn: vb.CDPConnection, tab_ids: List[int]) -> Optional[str]:
     """Create a Vivaldi tab stack from the given tab IDs.
 
     Sets vivExtData.group to a shared UUID on each tab via chrome.tabs.update,
@@ -350,65 +530,11 @@ def create_tab_stack(ws_url: str, tab_ids: List[int]) -> Optional[str]:
         return None
 
     group_id: str = str(uuid.uuid4())
-    tab_ids_json: str = json.dumps(tab_ids)
     _log(f"creating tab stack: group={group_id} tabs={tab_ids}")
 
-    expr: str = f'''
-    (function() {{
-        var tabIds = {tab_ids_json};
-        var groupId = "{group_id}";
-        var errors = [];
-        var done = 0;
-
-        return new Promise(function(resolve) {{
-            // First, get current vivExtData for each tab and set group
-            tabIds.forEach(function(tabId) {{
-                chrome.tabs.get(tabId, function(tab) {{
-                    if (chrome.runtime.lastError) {{
-                        errors.push({{id: tabId, error: chrome.runtime.lastError.message}});
-                        done++;
-                        if (done === tabIds.length) resolve({{errors: errors, grouped: done - errors.length}});
-                        return;
-                    }}
-                    var extData = {{}};
-                    try {{ extData = JSON.parse(tab.vivExtData || "{{}}"); }} catch(e) {{}}
-                    extData.group = groupId;
-                    chrome.tabs.update(tabId, {{vivExtData: JSON.stringify(extData)}}, function() {{
-                        if (chrome.runtime.lastError) {{
-                            errors.push({{id: tabId, error: chrome.runtime.lastError.message}});
-                        }}
-                        done++;
-                        if (done === tabIds.length) {{
-                            // After grouping, move tabs to be adjacent
-                            // Get the index of the first tab to anchor the stack
-                            chrome.tabs.get(tabIds[0], function(firstTab) {{
-                                if (chrome.runtime.lastError || !firstTab) {{
-                                    resolve({{errors: errors, grouped: done - errors.length, groupId: groupId}});
-                                    return;
-                                }}
-                                var baseIndex = firstTab.index;
-                                var movesDone = 0;
-                                // Move remaining tabs next to the first one
-                                for (var i = 1; i < tabIds.length; i++) {{
-                                    chrome.tabs.move(tabIds[i], {{index: baseIndex + i}}, function() {{
-                                        movesDone++;
-                                        if (movesDone === tabIds.length - 1) {{
-                                            resolve({{errors: errors, grouped: done - errors.length, groupId: groupId}});
-                                        }}
-                                    }});
-                                }}
-                                if (tabIds.length === 1) {{
-                                    resolve({{errors: errors, grouped: done - errors.length, groupId: groupId}});
-                                }}
-                            }});
-                        }}
-                    }});
-                }});
-            }});
-        }});
-    }})()
-    '''
-    result: Any = vb.cdp_ws_evaluate(ws_url, expr)
+    result: Any = tiler_call(
+        conn, f"stackTabs({json.dumps(tab_ids)}, {json.dumps(group_id)})"
+    )
     _log(f"create_tab_stack result: {result}")
 
     if isinstance(result, dict):
@@ -605,29 +731,36 @@ def resolve_selections(selected_lines: List[str], tabs: List[Dict[str, Any]]) ->
 # -- preflight --
 
 
-def preflight() -> str:
-    """Run common startup checks. Returns the Vivaldi UI WebSocket URL or exits."""
-    if not vb.cdp_available():
-        h.notify_send(
-            "CDP not available -- restart Vivaldi with debug port (9222)",
-            "critical",
-        )
-        sys.exit(1)
+def preflight() -> vb.CDPConnection:
+    """Run common startup checks. Returns a connection to the Vivaldi UI or exits.
 
+    The connection stays open for the whole command, so every evaluation
+    after this reuses one socket.
+    """
     ws_url: Optional[str] = vb.find_vivaldi_ui_ws()
     if not ws_url:
-        h.notify_send("Cannot find Vivaldi UI WebSocket target", "critical")
+        if not vb.cdp_available():
+            h.notify_send(
+                "CDP not available -- restart Vivaldi with debug port (9222)",
+                "critical",
+            )
+        else:
+            h.notify_send("Cannot find Vivaldi UI WebSocket target", "critical")
         sys.exit(1)
 
-    return ws_url
+    try:
+        return vb.CDPConnection(ws_url)
+    except OSError as e:
+        h.notify_send(f"Cannot connect to Vivaldi UI WebSocket: {e}", "critical")
+        sys.exit(1)
 
 
 # -- mode handlers --
 
 
-def cmd_list(ws_url: str) -> None:
+def cmd_list(conn: vb.CDPConnection) -> None:
     """--list: show currently tiled tabs; optionally re-tile a subset."""
-    tiled: List[Dict[str, Any]] = get_tiled_tabs(ws_url)
+    tiled: List[Dict[str, Any]] = get_tiled_tabs(conn)
 
     if not tiled:
         h.notify_send("No tabs currently tiled", "low")
@@ -656,32 +789,32 @@ def cmd_list(ws_url: str) -> None:
     # Resolve which tabs to re-tile
     if len(selected_lines) == len(tiled):
         # All selected or none selected -> re-tile all
-        target_urls: List[str] = [t["url"] for t in tiled]
+        targets: List[Dict[str, Any]] = tiled
     else:
-        targets: List[Dict[str, Any]] = resolve_selections(selected_lines, tiled)
+        targets = resolve_selections(selected_lines, tiled)
         if len(targets) < 2:
             h.notify_send("Select at least 2 tabs to tile", "low")
             return
-        target_urls = [t["url"] for t in targets]
 
-    # Untile current, select new set, tile
-    sel_ok: bool = select_tabs_vivaldi(ws_url, target_urls)
-    if not sel_ok:
+    # Select new set, untile current and tile, in one round trip
+    report: Dict[str, Any] = stack_select_tile(conn, targets, tile_mode, stack=False)
+    if not report:
+        h.notify_send("No response from Vivaldi while tiling", "critical")
+        sys.exit(1)
+    if report.get("select", {}).get("selected", 0) < 2:
         h.notify_send("Failed to select tabs in Vivaldi", "critical")
         sys.exit(1)
 
-    time.sleep(0.2)
-    tile_ok: bool = send_tile_via_cdp(ws_url, tile_mode)
-    if tile_ok:
-        h.notify_send(f"Re-tiled {len(target_urls)} tabs ({tile_mode})", "low")
+    if report.get("tile") is True:
+        h.notify_send(f"Re-tiled {len(targets)} tabs ({tile_mode})", "low")
     else:
         h.notify_send("Failed to tile", "critical")
         sys.exit(1)
 
 
-def cmd_untile(ws_url: str) -> None:
+def cmd_untile(conn: vb.CDPConnection) -> None:
     """--untile: remove current tiling."""
-    untiled: bool = untile_via_cdp(ws_url)
+    untiled: bool = untile_via_cdp(conn)
     if untiled:
         h.notify_send("Untiled tabs", "low")
         _log("--untile: SUCCESS")
@@ -690,9 +823,9 @@ def cmd_untile(ws_url: str) -> None:
         _log("--untile: nothing to untile")
 
 
-def cmd_stack(ws_url: str) -> None:
+def cmd_stack(conn: vb.CDPConnection) -> None:
     """--stack: pick tabs and create a new Vivaldi tab stack."""
-    chrome_tabs: Optional[List[Dict[str, Any]]] = get_chrome_tabs(ws_url)
+    chrome_tabs: Optional[List[Dict[str, Any]]] = get_chrome_tabs(conn)
     if not chrome_tabs:
         h.notify_send("No tabs found via chrome.tabs", "critical")
         sys.exit(1)
@@ -719,7 +852,7 @@ def cmd_stack(ws_url: str) -> None:
         return
 
     tab_ids: List[int] = [t["id"] for t in selected_tabs]
-    group_id: Optional[str] = create_tab_stack(ws_url, tab_ids)
+    group_id: Optional[str] = create_tab_stack(conn, tab_ids)
 
     if group_id:
         h.notify_send(f"Created tab stack with {len(selected_tabs)} tabs", "low")
@@ -730,9 +863,9 @@ def cmd_stack(ws_url: str) -> None:
         sys.exit(1)
 
 
-def cmd_switch(ws_url: str) -> None:
+def cmd_switch(conn: vb.CDPConnection) -> None:
     """--switch: list existing tab stacks and activate the selected one."""
-    chrome_tabs: Optional[List[Dict[str, Any]]] = get_chrome_tabs(ws_url)
+    chrome_tabs: Optional[List[Dict[str, Any]]] = get_chrome_tabs(conn)
     if not chrome_tabs:
         h.notify_send("No tabs found via chrome.tabs", "critical")
         sys.exit(1)
@@ -834,7 +967,7 @@ def cmd_switch(ws_url: str) -> None:
         }});
     }})()
     '''
-    activate_result: Any = vb.cdp_ws_evaluate(ws_url, activate_expr)
+    activate_result: Any = conn.evaluate(activate_expr)
     _log(f"--switch: activate result: {activate_result}")
 
     if isinstance(activate_result, dict) and "activated" in activate_result:
@@ -850,9 +983,9 @@ def cmd_switch(ws_url: str) -> None:
         sys.exit(1)
 
 
-def cmd_tile(ws_url: str) -> None:
+def cmd_tile(conn: vb.CDPConnection) -> None:
     """Default: pick tabs -> pick layout -> stack -> tile."""
-    chrome_tabs: Optional[List[Dict[str, Any]]] = get_chrome_tabs(ws_url)
+    chrome_tabs: Optional[List[Dict[str, Any]]] = get_chrome_tabs(conn)
     if not chrome_tabs:
         h.notify_send("No tabs found via chrome.tabs", "critical")
         sys.exit(1)
@@ -897,33 +1030,34 @@ def cmd_tile(ws_url: str) -> None:
     tile_mode: str = pick_tile_mode()
     _log(f"tile_mode={tile_mode}")
 
-    # -- stack selected tabs first --
-    tab_ids: List[int] = [t["id"] for t in selected_tabs]
-    group_id: Optional[str] = create_tab_stack(ws_url, tab_ids)
-    if group_id:
-        _log(f"stacked tabs: group={group_id}")
-        time.sleep(0.2)  # let the stack settle in the UI
+    # -- stack, select and tile in one round trip --
+    # Each step waits for Vivaldi's UI to reflect the previous one
+    report: Dict[str, Any] = stack_select_tile(conn, selected_tabs, tile_mode)
+    if not report:
+        h.notify_send("No response from Vivaldi while tiling", "critical")
+        _log("FAIL: no response to stack_select_tile")
+        sys.exit(1)
+
+    stack: Dict[str, Any] = report.get("stack") or {}
+    if stack.get("grouped", 0) >= 2:
+        _log(f"stacked tabs: group={stack.get('groupId')} shown={stack.get('shown')}")
     else:
-        _log("stack creation failed, proceeding with select+tile only")
+        _log(f"stack creation failed, proceeding with select+tile only: {stack}")
 
-    # -- select tabs via Vivaldi's internal React API --
-    sel_ok: bool = select_tabs_vivaldi(ws_url, selected_urls)
-    _log(f"select_tabs_vivaldi returned {sel_ok}")
-    if not sel_ok:
+    selected: Dict[str, Any] = report.get("select") or {}
+    _log(f"select result: {selected}")
+    if selected.get("selected", 0) < 2:
         h.notify_send("Failed to select tabs in Vivaldi", "critical")
-        _log("FAIL: select_tabs_vivaldi")
+        _log("FAIL: select")
         sys.exit(1)
 
-    # -- tile via CDP --
-    time.sleep(0.2)  # let selection settle
-    tile_ok: bool = send_tile_via_cdp(ws_url, tile_mode)
-    _log(f"send_tile_via_cdp returned {tile_ok}")
-    if tile_ok:
+    _log(f"tile result: {report.get('tile')}")
+    if report.get("tile") is True:
         h.notify_send(f"Tiled {len(selected_tabs)} tabs ({tile_mode})", "low")
         _log("SUCCESS")
     else:
-        h.notify_send("Failed to send tile shortcut", "critical")
-        _log("FAIL: send_tile_via_cdp")
+        h.notify_send("Failed to tile", "critical")
+        _log("FAIL: tile")
         sys.exit(1)
 
 
@@ -966,18 +1100,19 @@ def main() -> None:
         # execvp does not return
 
     args: argparse.Namespace = parse_args()
-    ws_url: str = preflight()
-
-    if args.list:
-        cmd_list(ws_url)
-    elif args.untile:
-        cmd_untile(ws_url)
-    elif args.stack:
-        cmd_stack(ws_url)
-    elif args.switch:
-        cmd_switch(ws_url)
-    else:
-        cmd_tile(ws_url)
+    conn: vb.CDPConnection = preflight()
+
+    with conn:
+        if args.list:
+            cmd_list(conn)
+        elif args.untile:
+            cmd_untile(conn)
+        elif args.stack:
+            cmd_stack(conn)
+        elif args.switch:
+            cmd_switch(conn)
+        else:
+            cmd_tile(conn)
 
 
 if __name__ == "__main__":
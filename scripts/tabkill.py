@@ -1,13 +1,15 @@
 #!/bin/env python3
 """Vivaldi Tab Killer - close tabs by pattern matching.
 
-Uses Chrome DevTools Protocol (CDP) over HTTP to discover and close
-tabs reliably. Falls back to SNSS session file parsing for discovery
-if CDP is unavailable (requires Vivaldi restart with debug port).
+Uses Chrome DevTools Protocol (CDP) to discover tabs over HTTP and
+close them over a single browser WebSocket. Falls back to SNSS session
+file parsing for discovery if CDP is unavailable (requires Vivaldi
+restart with debug port).
 
 CDP setup: ~/.config/vivaldi-stable.conf must contain:
   --remote-debugging-port=9222
 """
+import asyncio
 import glob
 import os
 import struct
@@ -132,12 +134,45 @@ def dmenu_input(prompt: str, items: str = "") -> str:
     return output.strip()
 
 
+def close_tabs(tab_ids: List[str]) -> int:
+    """Close tabs by CDP target ID. Returns the number closed.
+
+    Sends every Target.closeTarget at once over one browser-level
+    WebSocket, then collects the responses. Tabs whose command never got
+    an answer (connection refused, dropped or timed out) are retried one
+    by one through /json/close; tabs the browser refused to close are not.
+    """
+    closed: int = 0
+    retry: List[str] = tab_ids
+    ws_url: Optional[str] = vb.find_browser_ws()
+    if ws_url and tab_ids:
+        commands: List = [
+            ("Target.closeTarget", {"targetId": tab_id}) for tab_id in tab_ids
+        ]
+        try:
+            results: List = vb.cdp_run_many(ws_url, commands)
+        except (OSError, ValueError):
+            results = [ConnectionError()] * len(tab_ids)
+
+        retry = []
+        for tab_id, result in zip(tab_ids, results):
+            if isinstance(result, (OSError, asyncio.TimeoutError)):
+                retry.append(tab_id)
+            elif isinstance(result, dict) and result.get("success", True):
+                closed += 1
+
+    closed += sum(1 for tab_id in retry if vb.cdp_close_tab(tab_id))
+    return closed
+
+
 def main() -> None:
     """Entry point: search for tabs by pattern and close matches via CDP."""
-    use_cdp: bool = vb.cdp_available()
+    # Served by the tab daemon when it is running; only probe the debug
+    # port if that comes back empty
+    raw_tabs: List[Dict[str, str]] = vb.cdp_list_tabs()
+    use_cdp: bool = bool(raw_tabs) or vb.cdp_available()
 
     if use_cdp:
-        raw_tabs: List[Dict[str, str]] = vb.cdp_list_tabs()
         if not raw_tabs:
             h.notify_send("CDP connected but no tabs found", "critical")
             sys.exit(1)
@@ -185,17 +220,9 @@ def main() -> None:
         sys.exit(1)
 
     # Close matched tabs via CDP
-    closed: int = 0
-    failed: int = 0
-    for tab in matched:
-        tab_id: str = tab.get("id", "")
-        if not tab_id:
-            failed += 1
-            continue
-        if vb.cdp_close_tab(tab_id):
-            closed += 1
-        else:
-            failed += 1
+    tab_ids: List[str] = [t["id"] for t in matched if t.get("id")]
+    closed: int = close_tabs(tab_ids)
+    failed: int = len(matched) - closed
 
     msg: str = f'Closed {closed}/{len(matched)} tab(s) matching "{search_term}"'
     if failed > 0:
@@ -7,7 +7,10 @@ and Vivaldi-themed dmenu wrappers for use by all Vivaldi scripts.
 CDP setup: ~/.config/vivaldi-stable.conf must contain:
   --remote-debugging-port=9222
 """
+import asyncio
 import base64
+import fnmatch
+import hashlib
 import json
 import os
 import socket
@@ -15,7 +18,7 @@ import struct
 import subprocess as sp
 import urllib.error
 import urllib.request
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Generator, List, Optional, Tuple
 
 
 # -- CDP constants --
@@ -27,6 +30,24 @@ CDP_BASE: str = f"http://{CDP_HOST}:{CDP_PORT}"
 # Vivaldi UI extension ID (stable across installations)
 VIVALDI_EXT_ID: str = "mpognobbkildjkofajifpdfhcoklimli"
 
+# chrome.tabs.query({}) run in the Vivaldi UI: {id, index, windowId, title,
+# url, vivExtData} per tab, with vivExtData parsed from JSON
+CHROME_TABS_QUERY: str = (
+    "chrome.tabs.query({}).then(function(tabs) {"
+    "  return tabs.map(function(t) {"
+    "    var ext = {};"
+    "    try { ext = JSON.parse(t.vivExtData || '{}'); } catch(e) {}"
+    "    return {id: t.id, index: t.index, windowId: t.windowId,"
+    "            title: t.title, url: t.url, vivExtData: ext};"
+    "  });"
+    "})"
+)
+
+# Unix socket of vivaldi_tab_daemon.py (optional tab-state cache)
+TAB_DAEMON_SOCKET: str = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or "/tmp", f"vivaldi-tabs-{os.getuid()}.sock"
+)
+
 
 # -- dmenu theming --
 
@@ -53,8 +74,44 @@ def cdp_available() -> bool:
     return cdp_get("/json/version") is not None
 
 
-def cdp_list_tabs() -> List[Dict[str, str]]:
-    """Fetch open tabs from Vivaldi via CDP. Returns list of {id, title, url}."""
+def query_tab_daemon(timeout: float = 0.5) -> Optional[Dict[str, Any]]:
+    """Ask a running vivaldi_tab_daemon.py for its tab snapshot.
+
+    The snapshot holds "tabs" (page targets, as cdp_list_tabs), "chromeTabs"
+    (as CHROME_TABS_QUERY), "stacks" ({group: [tab ids]}), "uiWebSocket"
+    and "browserWebSocket".
+    Returns None when no daemon is listening or it is not connected to
+    Vivaldi, so callers can fall back to querying CDP directly.
+    """
+    if not os.path.exists(TAB_DAEMON_SOCKET):
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(TAB_DAEMON_SOCKET)
+            sock.sendall(b"snapshot\n")
+            chunks: List[bytes] = []
+            while True:
+                chunk: bytes = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        return json.loads(b"".join(chunks)) if chunks else None
+    except (OSError, ValueError):
+        return None
+
+
+def cdp_list_tabs(use_daemon: bool = True) -> List[Dict[str, str]]:
+    """Fetch open tabs from Vivaldi via CDP. Returns list of {id, title, url}.
+
+    Served by the tab daemon when it is running.
+    """
+    if use_daemon:
+        snapshot: Optional[Dict[str, Any]] = query_tab_daemon()
+        if snapshot is not None:
+            return snapshot["tabs"]
+
     body: Optional[str] = cdp_get("/json")
     if body is None:
         return []
@@ -171,87 +228,553 @@ def dmenu_vivaldi(prompt: str, items: str = "") -> str:
 # -- CDP WebSocket helpers --
 
 
-def _ws_connect(ws_url: str) -> socket.socket:
-    """Open a raw WebSocket connection to a CDP target.
+# RFC 6455 opcodes
+WS_CONTINUATION: int = 0x0
+WS_TEXT: int = 0x1
+WS_BINARY: int = 0x2
+WS_CLOSE: int = 0x8
+WS_PING: int = 0x9
+WS_PONG: int = 0xA
+WS_GUID: bytes = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
 
-    Parses ws://host:port/path from ws_url, performs the HTTP upgrade
-    handshake, and returns the connected socket ready for framing.
-    """
-    # Parse ws://host:port/path
+
+def _ws_parse_url(ws_url: str) -> Tuple[str, int, str]:
+    """Split ws://host:port/path into (host, port, /path)."""
     stripped: str = ws_url.replace("ws://", "")
     host_port, _, path = stripped.partition("/")
     host, _, port_str = host_port.partition(":")
     port: int = int(port_str) if port_str else 80
-    path = "/" + path
+    return host, port, "/" + path
 
-    key: str = base64.b64encode(os.urandom(16)).decode()
-    sock: socket.socket = socket.create_connection((host, port), timeout=5)
+
+def _ws_handshake(host: str, port: int, path: str) -> Tuple[bytes, bytes]:
+    """Build the HTTP upgrade request. Returns (request, expected accept key)."""
+    key: bytes = base64.b64encode(os.urandom(16))
     request: str = (
         f"GET {path} HTTP/1.1\r\n"
         f"Host: {host}:{port}\r\n"
         f"Upgrade: websocket\r\n"
         f"Connection: Upgrade\r\n"
-        f"Sec-WebSocket-Key: {key}\r\n"
+        f"Sec-WebSocket-Key: {key.decode()}\r\n"
         f"Sec-WebSocket-Version: 13\r\n"
         f"\r\n"
     )
-    sock.sendall(request.encode())
+    accept: bytes = base64.b64encode(hashlib.sha1(key + WS_GUID).digest())
+    return request.encode(), accept
+
+
+def _ws_check_handshake(response: bytes, accept: bytes) -> None:
+    """Raise ConnectionError unless response is a valid 101 upgrade."""
+    lines: List[bytes] = response.split(b"\r\n")
+    if b" 101 " not in lines[0] + b" ":
+        raise ConnectionError(
+            f"WebSocket upgrade refused: {lines[0].decode(errors='replace')}"
+        )
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"sec-websocket-accept":
+            if value.strip() != accept:
+                raise ConnectionError("WebSocket upgrade: bad Sec-WebSocket-Accept")
+            return
+    raise ConnectionError("WebSocket upgrade: missing Sec-WebSocket-Accept")
 
-    # Consume the HTTP 101 response
-    response: bytes = b""
-    while b"\r\n\r\n" not in response:
-        response += sock.recv(4096)
+
+def _ws_connect(ws_url: str) -> socket.socket:
+    """Open a raw WebSocket connection to a CDP target.
+
+    Parses ws://host:port/path from ws_url, performs the HTTP upgrade
+    handshake, and returns the connected socket ready for framing.
+    """
+    host, port, path = _ws_parse_url(ws_url)
+    request, accept = _ws_handshake(host, port, path)
+    sock: socket.socket = socket.create_connection((host, port), timeout=5)
+    try:
+        sock.sendall(request)
+
+        # Consume the HTTP 101 response byte by byte, so no frame data
+        # that follows it is swallowed
+        response: bytearray = bytearray()
+        while not response.endswith(b"\r\n\r\n"):
+            byte: bytes = sock.recv(1)
+            if not byte:
+                raise ConnectionError("WebSocket upgrade: connection closed")
+            response += byte
+        _ws_check_handshake(bytes(response), accept)
+    except OSError:
+        sock.close()
+        raise
 
     return sock
 
 
-def _ws_send(sock: socket.socket, msg: str) -> None:
-    """Send a text frame over a WebSocket connection (client-masked)."""
-    data: bytes = msg.encode("utf-8")
-    frame: bytearray = bytearray([0x81])  # FIN + text opcode
+def _ws_mask(data: bytes, mask_key: bytes) -> bytes:
+    """XOR data with the repeating 4-byte mask, as one big-integer operation."""
+    length: int = len(data)
+    if not length:
+        return b""
+    key: bytes = (mask_key * (length // 4 + 1))[:length]
+    masked: int = int.from_bytes(data, "big") ^ int.from_bytes(key, "big")
+    return masked.to_bytes(length, "big")
+
+
+def _ws_frame(payload: Any, opcode: int = WS_TEXT) -> bytes:
+    """Encode a masked, final WebSocket frame. str payloads are sent as UTF-8."""
+    data: bytes = payload.encode("utf-8") if isinstance(payload, str) else bytes(payload)
     mask_key: bytes = os.urandom(4)
     length: int = len(data)
 
     if length < 126:
-        frame.append(0x80 | length)
+        header: bytes = struct.pack(">BB", 0x80 | opcode, 0x80 | length)
     elif length < 65536:
-        frame.append(0x80 | 126)
-        frame.extend(struct.pack(">H", length))
+        header = struct.pack(">BBH", 0x80 | opcode, 0x80 | 126, length)
     else:
-        frame.append(0x80 | 127)
-        frame.extend(struct.pack(">Q", length))
+        header = struct.pack(">BBQ", 0x80 | opcode, 0x80 | 127, length)
+
+    return header + mask_key + _ws_mask(data, mask_key)
+
+
+def _ws_close_frame(code: int = 1000) -> bytes:
+    """A close frame with the given status code (1000 = normal closure)."""
+    return _ws_frame(struct.pack(">H", code), WS_CLOSE)
+
+
+def _ws_read_message() -> Generator[Any, Any, str]:
+    """Protocol logic for receiving one text message, shared by both clients.
+
+    A sans-IO generator: it yields an int when it needs that many bytes
+    (the driver sends them back), or bytes when a frame must be written
+    back to the peer (pongs, the close reply). It returns the decoded
+    message once all of its fragments have arrived. Control frames may
+    be interleaved with fragments; a close frame raises ConnectionError
+    after the reply has been yielded.
+    """
+    fragments: Optional[bytearray] = None
+
+    while True:
+        head: bytes = yield 2
+        fin: bool = bool(head[0] & 0x80)
+        opcode: int = head[0] & 0x0F
+        masked: bool = bool(head[1] & 0x80)
+        length: int = head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", (yield 2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", (yield 8))[0]
+        mask_key: bytes = bytes((yield 4)) if masked else b""
+        payload: Any = (yield length) if length else b""
+        if masked:
+            payload = _ws_mask(payload, mask_key)
+
+        if opcode == WS_PING:
+            yield _ws_frame(payload, WS_PONG)
+        elif opcode == WS_PONG:
+            pass
+        elif opcode == WS_CLOSE:
+            code: int = struct.unpack(">H", payload[:2])[0] if length >= 2 else 1005
+            yield _ws_close_frame(1000 if code == 1005 else code)
+            raise ConnectionError(f"WebSocket closed by peer ({code})")
+        elif opcode == WS_CONTINUATION:
+            if fragments is None:
+                raise ConnectionError("WebSocket: continuation without a start frame")
+            fragments += payload
+            if fin:
+                return str(fragments, "utf-8")
+        elif fragments is not None:
+            raise ConnectionError("WebSocket: new message inside a fragmented one")
+        elif fin:
+            return str(payload, "utf-8")
+        else:
+            fragments = bytearray(payload)
+
+
+def _recv_exact(sock: socket.socket, length: int) -> memoryview:
+    """Read exactly length bytes into a preallocated buffer."""
+    buf: memoryview = memoryview(bytearray(length))
+    pos: int = 0
+    while pos < length:
+        got: int = sock.recv_into(buf[pos:])
+        if not got:
+            raise ConnectionError("WebSocket connection closed")
+        pos += got
+    return buf
 
-    frame.extend(mask_key)
-    frame.extend(
-        bytearray(data[i] ^ mask_key[i % 4] for i in range(length))
-    )
-    sock.sendall(frame)
+
+def _ws_send(sock: socket.socket, msg: str) -> None:
+    """Send a text frame over a WebSocket connection (client-masked)."""
+    sock.sendall(_ws_frame(msg))
 
 
 def _ws_recv(sock: socket.socket) -> str:
-    """Read one WebSocket text frame and return the payload as a string."""
-    header: bytes = sock.recv(2)
-    length: int = header[1] & 0x7F
+    """Read one WebSocket message and return the payload as a string.
+
+    Reassembles fragmented messages and answers pings on the way.
+    """
+    steps: Generator[Any, Any, str] = _ws_read_message()
+    request: Any = next(steps)
+    try:
+        while True:
+            if isinstance(request, int):
+                request = steps.send(_recv_exact(sock, request))
+            else:
+                sock.sendall(request)
+                request = next(steps)
+    except StopIteration as done:
+        return done.value
+
+
+class CDPError(Exception):
+    """Raised when a CDP command returns an error response."""
+
+
+class CDPConnection:
+    """A persistent CDP WebSocket connection to one target.
+
+    Performs the HTTP upgrade once and keeps the socket open, so a
+    sequence of commands costs one handshake instead of one per call.
+    Each command gets the next message id; responses are matched by id
+    and any CDP events (messages with a "method") read in between are
+    skipped. Use as a context manager to close the socket on exit.
+    """
+
+    def __init__(self, ws_url: str, timeout: float = 5) -> None:
+        self.ws_url: str = ws_url
+        self.timeout: float = timeout
+        self.sock: socket.socket = _ws_connect(ws_url)
+        self.next_id: int = 1
+
+    def __enter__(self) -> "CDPConnection":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Send a close frame (best effort) and close the socket."""
+        try:
+            self.sock.sendall(_ws_close_frame())
+        except OSError:
+            pass
+        self.sock.close()
+
+    def send(self, method: str, params: Optional[Dict[str, Any]] = None) -> int:
+        """Send a CDP command without waiting. Returns its message id."""
+        msg_id: int = self.next_id
+        self.next_id += 1
+        _ws_send(self.sock, json.dumps({
+            "id": msg_id,
+            "method": method,
+            "params": params or {},
+        }))
+        return msg_id
+
+    def wait(self, msg_id: int) -> Dict[str, Any]:
+        """Read messages until the response to msg_id arrives and return it."""
+        while True:
+            parsed: Dict[str, Any] = json.loads(_ws_recv(self.sock))
+            if parsed.get("id") == msg_id:
+                return parsed
+
+    def reconnect(self) -> None:
+        """Replace the socket with a fresh connection to the same target."""
+        self.sock.close()
+        self.sock = _ws_connect(self.ws_url)
+
+    def call(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Send a CDP command and return its result.
+
+        timeout overrides the connection's socket timeout for this command
+        (e.g. for a Runtime.evaluate awaiting a slow promise). Raises
+        CDPError if the browser answers with an error, and OSError or
+        ValueError if the connection fails or returns garbage. After a
+        failure the socket may hold part of a frame or a late reply, so it
+        is replaced before the error is raised.
+        """
+        self.sock.settimeout(timeout or self.timeout)
+        try:
+            response: Dict[str, Any] = self.wait(self.send(method, params))
+        except (OSError, ValueError, struct.error):
+            try:
+                self.reconnect()
+            except OSError:
+                pass
+            raise
+        finally:
+            self.sock.settimeout(self.timeout)
+        if "error" in response:
+            raise CDPError(response["error"].get("message", "unknown error"))
+        return response.get("result", {})
+
+    def evaluate(self, expression: str, timeout: Optional[float] = None) -> Any:
+        """Evaluate a JS expression on this target, like cdp_ws_evaluate.
+
+        Returns the unwrapped value on success, or None on failure.
+        """
+        try:
+            result: Dict[str, Any] = self.call("Runtime.evaluate", {
+                "expression": expression,
+                "returnByValue": True,
+                "awaitPromise": True,
+            }, timeout)
+        except (OSError, CDPError, ValueError, struct.error):
+            return None
+        return result.get("result", {}).get("value")
+
+
+# -- asyncio CDP client --
+
+
+async def _ws_connect_async(
+    ws_url: str,
+) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """asyncio counterpart of _ws_connect. Returns the open stream pair."""
+    host, port, path = _ws_parse_url(ws_url)
+    request, accept = _ws_handshake(host, port, path)
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(host, port), timeout=5
+    )
+    try:
+        writer.write(request)
+        await writer.drain()
+        response: bytes = await asyncio.wait_for(
+            reader.readuntil(b"\r\n\r\n"), timeout=5
+        )
+        _ws_check_handshake(response, accept)
+    except (OSError, asyncio.TimeoutError):
+        writer.close()
+        raise
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        # Same errors as _ws_connect, so callers only catch OSError
+        writer.close()
+        raise ConnectionError("WebSocket upgrade: connection closed")
 
-    if length == 126:
-        length = struct.unpack(">H", sock.recv(2))[0]
-    elif length == 127:
-        length = struct.unpack(">Q", sock.recv(8))[0]
+    return reader, writer
 
-    data: bytes = b""
-    while len(data) < length:
-        data += sock.recv(length - len(data))
 
-    return data.decode("utf-8")
+def _ws_write(writer: asyncio.StreamWriter, msg: str) -> None:
+    """Queue a text frame on an asyncio stream (client-masked)."""
+    writer.write(_ws_frame(msg))
 
 
-def find_vivaldi_ui_ws() -> Optional[str]:
+async def _ws_recv_async(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> str:
+    """asyncio counterpart of _ws_recv."""
+    steps: Generator[Any, Any, str] = _ws_read_message()
+    request: Any = next(steps)
+    try:
+        while True:
+            if isinstance(request, int):
+                request = steps.send(await reader.readexactly(request))
+            else:
+                writer.write(request)
+                request = next(steps)
+    except StopIteration as done:
+        return done.value
+
+
+class AsyncCDPConnection:
+    """An asyncio CDP WebSocket connection with many commands in flight.
+
+    A background task reads every message: responses resolve the future
+    registered for their id, and events are copied to the queues of any
+    matching subscriptions. Commands can therefore be issued together
+    and awaited with asyncio.gather instead of one round trip at a time:
+
+        async with await AsyncCDPConnection.open(ws_url) as conn:
+            events = conn.subscribe("Target.*")
+            await conn.call("Target.setDiscoverTargets", {"discover": True})
+            results = await asyncio.gather(*(
+                conn.call("Target.closeTarget", {"targetId": t})
+                for t in target_ids
+            ), return_exceptions=True)
+    """
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+        self.next_id: int = 1
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.subscriptions: List[Tuple[str, asyncio.Queue]] = []
+        self.reader_task: asyncio.Task = asyncio.ensure_future(self._read_loop())
+
+    @classmethod
+    async def open(cls, ws_url: str) -> "AsyncCDPConnection":
+        """Connect to a CDP target and start reading."""
+        reader, writer = await _ws_connect_async(ws_url)
+        return cls(reader, writer)
+
+    async def __aenter__(self) -> "AsyncCDPConnection":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Stop the reader, send a close frame and close the connection."""
+        self.reader_task.cancel()
+        if not self.writer.is_closing():
+            self.writer.write(_ws_close_frame())
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except OSError:
+            pass
+
+    async def _read_loop(self) -> None:
+        error: Exception = ConnectionError("CDP connection closed")
+        try:
+            while True:
+                message: Dict[str, Any] = json.loads(
+                    await _ws_recv_async(self.reader, self.writer)
+                )
+                if "id" in message:
+                    future: Optional[asyncio.Future] = self.pending.pop(
+                        message["id"], None
+                    )
+                    if future is not None and not future.done():
+                        future.set_result(message)
+                elif "method" in message:
+                    for pattern, queue in self.subscriptions:
+                        if fnmatch.fnmatchcase(message["method"], pattern):
+                            queue.put_nowait(message)
+        except (OSError, EOFError, asyncio.IncompleteReadError, ValueError) as e:
+            error = ConnectionError(f"CDP connection lost: {e}")
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self.pending.clear()
+
+    def subscribe(self, pattern: str) -> asyncio.Queue:
+        """Return a queue receiving every event whose method matches pattern.
+
+        pattern is a glob such as "Target.*" or "Page.loadEventFired".
+        Subscribing only routes events; the domain itself still has to be
+        enabled with a command (e.g. Target.setDiscoverTargets, Page.enable).
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self.subscriptions.append((pattern, queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Stop routing events to a queue returned by subscribe."""
+        self.subscriptions = [
+            (pattern, q) for pattern, q in self.subscriptions if q is not queue
+        ]
+
+    async def call(
+        self, method: str, params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Send a CDP command and await its result.
+
+        Raises CDPError if the browser answers with an error and
+        ConnectionError if the connection drops first.
+        """
+        if self.reader_task.done():
+            raise ConnectionError("CDP connection closed")
+
+        msg_id: int = self.next_id
+        self.next_id += 1
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.pending[msg_id] = future
+        _ws_write(self.writer, json.dumps({
+            "id": msg_id,
+            "method": method,
+            "params": params or {},
+        }))
+        await self.writer.drain()
+
+        response: Dict[str, Any] = await future
+        if "error" in response:
+            raise CDPError(response["error"].get("message", "unknown error"))
+        return response.get("result", {})
+
+    async def evaluate(self, expression: str) -> Any:
+        """Evaluate a JS expression, like CDPConnection.evaluate."""
+        try:
+            result: Dict[str, Any] = await self.call("Runtime.evaluate", {
+                "expression": expression,
+                "returnByValue": True,
+                "awaitPromise": True,
+            })
+        except (OSError, CDPError):
+            return None
+        return result.get("result", {}).get("value")
+
+
+def cdp_run_many(
+    ws_url: str,
+    commands: List[Tuple[str, Dict[str, Any]]],
+    timeout: float = 10,
+) -> List[Any]:
+    """Send many (method, params) commands over one connection at once.
+
+    Blocking wrapper around AsyncCDPConnection for synchronous scripts.
+    Returns one entry per command in order: its result dict, or the
+    exception it raised (CDPError, ConnectionError). Commands still
+    unanswered after timeout seconds get an asyncio.TimeoutError, so the
+    answers that did arrive are kept. Raises OSError if the connection
+    cannot be opened.
+    """
+    async def run() -> List[Any]:
+        async with await AsyncCDPConnection.open(ws_url) as conn:
+            tasks: List[asyncio.Task] = [
+                asyncio.ensure_future(conn.call(method, params))
+                for method, params in commands
+            ]
+            if not tasks:
+                return []
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            return [
+                asyncio.TimeoutError() if task in pending
+                else task.exception() or task.result()
+                for task in tasks
+            ]
+
+    return asyncio.run(run())
+
+
+def find_browser_ws(use_daemon: bool = True) -> Optional[str]:
+    """Return the browser-level WebSocket URL from /json/version, or None.
+
+    Asks the tab daemon first when it is running.
+    """
+    if use_daemon:
+        snapshot: Optional[Dict[str, Any]] = query_tab_daemon()
+        if snapshot is not None and snapshot.get("browserWebSocket"):
+            return snapshot["browserWebSocket"]
+
+    body: Optional[str] = cdp_get("/json/version")
+    if body is None:
+        return None
+
+    try:
+        return json.loads(body).get("webSocketDebuggerUrl")
+    except json.JSONDecodeError:
+        return None
+
+
+def find_vivaldi_ui_ws(use_daemon: bool = True) -> Optional[str]:
     """Find the Vivaldi UI page WebSocket URL from CDP targets.
 
     Scans /json for the target of type "app" whose URL belongs to the
-    Vivaldi extension (window.html). Returns the webSocketDebuggerUrl
-    or None if not found.
+    Vivaldi extension (window.html), or asks the tab daemon when it is
+    running. Returns the webSocketDebuggerUrl or None if not found.
     """
+    if use_daemon:
+        snapshot: Optional[Dict[str, Any]] = query_tab_daemon()
+        if snapshot is not None and snapshot.get("uiWebSocket"):
+            return snapshot["uiWebSocket"]
+
     body: Optional[str] = cdp_get("/json")
     if body is None:
         return None
@@ -275,33 +798,14 @@ def cdp_ws_evaluate(ws_url: str, expression: str) -> Any:
 
     Sends Runtime.evaluate with awaitPromise=True so both sync and
     async (Promise-returning) expressions work. Returns the unwrapped
-    value on success, or None on failure.
+    value on success, or None on failure. Opens a connection for this
+    one call; use CDPConnection to run several commands over one socket.
     """
-    sock: Optional[socket.socket] = None
     try:
-        sock = _ws_connect(ws_url)
-        msg: str = json.dumps({
-            "id": 1,
-            "method": "Runtime.evaluate",
-            "params": {
-                "expression": expression,
-                "returnByValue": True,
-                "awaitPromise": True,
-            },
-        })
-        _ws_send(sock, msg)
-        raw: str = _ws_recv(sock)
-        parsed: Dict = json.loads(raw)
-        return (
-            parsed.get("result", {})
-            .get("result", {})
-            .get("value")
-        )
-    except (OSError, TimeoutError, json.JSONDecodeError, struct.error):
+        with CDPConnection(ws_url) as conn:
+            return conn.evaluate(expression)
+    except OSError:
         return None
-    finally:
-        if sock is not None:
-            sock.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,282 @@
+#!/bin/env python3
+"""Vivaldi tab daemon - keeps a live tab and stack model for the Vivaldi scripts.
+
+Holds two CDP connections open:
+  - the browser endpoint, with Target.setDiscoverTargets, so
+    targetCreated / targetDestroyed / targetInfoChanged events keep the
+    list of page targets (what /json returns) current;
+  - the Vivaldi UI, where chrome.tabs listeners call back through a
+    Runtime binding, so the chrome.tabs model (tab ids, vivExtData and
+    therefore stacks) is re-queried only after something changed.
+
+Snapshots are served over a Unix socket (vivaldi_base.TAB_DAEMON_SOCKET),
+so tabTiler and tabkill get the tab list without probing /json/version,
+listing /json, locating the UI target or running chrome.tabs.query.
+Scripts use it when it is running and fall back to CDP otherwise. If
+Vivaldi is not running (or restarts), the daemon keeps retrying and
+answers nothing in the meantime.
+
+Protocol: connect, send "snapshot\\n", read the JSON snapshot until EOF.
+
+Start it from ~/.xinitrc:
+  python3 ~/programming/python_projects/scripts/vivaldi_tab_daemon.py &
+"""
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import vivaldi_base as vb
+
+
+# Seconds to wait after a chrome.tabs event before re-querying, so a
+# burst of events (a page load, a stack being created) costs one query
+DEBOUNCE_SECONDS: float = 0.05
+RECONNECT_SECONDS: float = 2.0
+BINDING_NAME: str = "__vivaldiTabDaemon"
+
+# Install chrome.tabs listeners in the Vivaldi UI that call the binding.
+# Guarded so a restarted daemon does not stack duplicate listeners; the
+# old listeners call the re-added binding by name.
+LISTENER_JS: str = f'''
+(function() {{
+    if (window.__vivaldiTabDaemonListeners) return true;
+    window.__vivaldiTabDaemonListeners = true;
+    [
+        "onCreated", "onRemoved", "onUpdated", "onMoved",
+        "onAttached", "onDetached", "onReplaced"
+    ].forEach(function(name) {{
+        chrome.tabs[name].addListener(function() {{
+            try {{ {BINDING_NAME}(name); }} catch (e) {{}}
+        }});
+    }});
+    return true;
+}})()
+'''
+
+
+class TabStateDaemon:
+    """In-memory tab and stack model kept current from CDP events."""
+
+    def __init__(self) -> None:
+        self.targets: Dict[str, Dict[str, Any]] = {}  # targetId -> targetInfo
+        self.chrome_tabs: List[Dict[str, Any]] = []
+        self.browser_ws: Optional[str] = None
+        self.ui_ws: Optional[str] = None
+        self.ui_conn: Optional[vb.AsyncCDPConnection] = None
+        self.connected: bool = False
+        # chrome.tabs events received, and how many the model reflects
+        self.tab_events: int = 0
+        self.tab_events_loaded: int = 0
+        self.tab_event_queue: Optional[asyncio.Queue] = None
+        self.refresh_lock: asyncio.Lock = asyncio.Lock()
+        self.response: Optional[bytes] = None
+
+    # -- model --
+
+    def snapshot(self) -> bytes:
+        """Return the cached snapshot JSON, rebuilding it after a change."""
+        if self.response is None:
+            tabs: List[Dict[str, str]] = [
+                {"id": target_id, "title": info.get("title", ""), "url": info.get("url", "")}
+                for target_id, info in self.targets.items()
+                if info.get("type") == "page"
+            ]
+
+            stacks: Dict[str, List[int]] = {}
+            for tab in self.chrome_tabs:
+                group_id: Optional[str] = (tab.get("vivExtData") or {}).get("group")
+                if group_id:
+                    stacks.setdefault(group_id, []).append(tab["id"])
+
+            self.response = json.dumps({
+                "tabs": tabs,
+                "chromeTabs": self.chrome_tabs,
+                "stacks": {gid: ids for gid, ids in stacks.items() if len(ids) >= 2},
+                "uiWebSocket": self.ui_ws,
+                "browserWebSocket": self.browser_ws,
+                "updated": time.time(),
+            }).encode()
+        return self.response
+
+    def handle_target_event(self, event: Dict[str, Any]) -> None:
+        params: Dict[str, Any] = event.get("params", {})
+        method: str = event["method"]
+        if method in ("Target.targetCreated", "Target.targetInfoChanged"):
+            info: Dict[str, Any] = params["targetInfo"]
+            self.targets[info["targetId"]] = info
+        elif method == "Target.targetDestroyed":
+            self.targets.pop(params["targetId"], None)
+        else:
+            return
+        self.response = None
+
+    async def refresh_chrome_tabs(self) -> None:
+        """Re-run chrome.tabs.query in the UI if a tabs event arrived since the last run."""
+        async with self.refresh_lock:
+            events: int = self.tab_events
+            if events == self.tab_events_loaded or self.ui_conn is None:
+                return
+            result: Any = await self.ui_conn.evaluate(vb.CHROME_TABS_QUERY)
+            if isinstance(result, list):
+                self.chrome_tabs = result
+                self.tab_events_loaded = events
+                self.response = None
+
+    # -- CDP --
+
+    async def load_targets(self, conn: vb.AsyncCDPConnection) -> asyncio.Queue:
+        """Seed the target list and start discovery. Returns the event queue."""
+        events: asyncio.Queue = conn.subscribe("Target.*")
+        result: Dict[str, Any] = await conn.call("Target.getTargets")
+        for info in result.get("targetInfos", []):
+            self.targets[info["targetId"]] = info
+        await conn.call("Target.setDiscoverTargets", {"discover": True})
+        return events
+
+    async def follow_targets(self, events: asyncio.Queue) -> None:
+        while True:
+            self.handle_target_event(await events.get())
+
+    async def load_chrome_tabs(self, conn: vb.AsyncCDPConnection) -> asyncio.Queue:
+        """Hook chrome.tabs events and load the tab model. Returns the event queue."""
+        events: asyncio.Queue = conn.subscribe("Runtime.bindingCalled")
+        await conn.call("Runtime.addBinding", {"name": BINDING_NAME})
+        await conn.call("Runtime.enable")
+        if await conn.evaluate(LISTENER_JS) is not True:
+            raise ConnectionError("could not install chrome.tabs listeners")
+
+        self.tab_events += 1
+        await self.refresh_chrome_tabs()
+        return events
+
+    def count_tab_event(self, event: Dict[str, Any]) -> None:
+        if event.get("params", {}).get("name") == BINDING_NAME:
+            self.tab_events += 1
+
+    def drain_tab_events(self, events: asyncio.Queue) -> None:
+        """Count the chrome.tabs binding calls already waiting in events."""
+        while not events.empty():
+            self.count_tab_event(events.get_nowait())
+
+    async def follow_chrome_tabs(self, events: asyncio.Queue) -> None:
+        while True:
+            self.count_tab_event(await events.get())
+            await asyncio.sleep(DEBOUNCE_SECONDS)
+            self.drain_tab_events(events)
+            await self.refresh_chrome_tabs()
+
+    async def run_session(self) -> None:
+        """Connect to Vivaldi and follow events until either connection drops."""
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        browser_ws: Optional[str] = await loop.run_in_executor(
+            None, lambda: vb.find_browser_ws(use_daemon=False)
+        )
+        ui_ws: Optional[str] = await loop.run_in_executor(
+            None, lambda: vb.find_vivaldi_ui_ws(use_daemon=False)
+        )
+        if not browser_ws or not ui_ws:
+            return
+
+        async with await vb.AsyncCDPConnection.open(browser_ws) as browser, \
+                await vb.AsyncCDPConnection.open(ui_ws) as ui:
+            self.browser_ws, self.ui_ws, self.ui_conn = browser_ws, ui_ws, ui
+            target_events, tab_events = await asyncio.gather(
+                self.load_targets(browser), self.load_chrome_tabs(ui)
+            )
+            self.tab_event_queue = tab_events
+            tasks: List[asyncio.Task] = [
+                asyncio.ensure_future(self.follow_targets(target_events)),
+                asyncio.ensure_future(self.follow_chrome_tabs(tab_events)),
+                browser.reader_task,
+                ui.reader_task,
+            ]
+            self.connected = True
+            print(f"Following Vivaldi tabs ({len(self.targets)} targets)")
+            try:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                errors: List[str] = [
+                    str(task.exception()) for task in done
+                    if not task.cancelled() and task.exception()
+                ]
+                print(f"Lost Vivaldi: {'; '.join(errors) or 'connection closed'}")
+            finally:
+                self.connected = False
+                self.ui_conn = None
+                for task in tasks[:2]:
+                    task.cancel()
+
+    async def follow_vivaldi(self) -> None:
+        """Keep a session open, reconnecting whenever Vivaldi goes away."""
+        while True:
+            try:
+                await self.run_session()
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, vb.CDPError) as e:
+                print(f"Cannot follow Vivaldi: {e}")
+            self.connected = False
+            self.ui_conn = None
+            self.targets.clear()
+            self.chrome_tabs = []
+            self.response = None
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    # -- serving --
+
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request: bytes = await asyncio.wait_for(reader.readline(), timeout=1.0)
+            if request.strip() == b"snapshot" and self.connected:
+                # Never serve a chrome.tabs model that is known to be stale
+                self.drain_tab_events(self.tab_event_queue)
+                await asyncio.wait_for(self.refresh_chrome_tabs(), timeout=1.0)
+                writer.write(self.snapshot())
+                await writer.drain()
+        except (OSError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        socket_path: str = vb.TAB_DAEMON_SOCKET
+        if os.path.exists(socket_path):
+            try:
+                _, writer = await asyncio.open_unix_connection(socket_path)
+                writer.close()
+                print(f"Daemon already running on {socket_path}")
+                sys.exit(1)
+            except OSError:
+                os.unlink(socket_path)
+
+        server: asyncio.AbstractServer = await asyncio.start_unix_server(
+            self.handle_client, path=socket_path
+        )
+        os.chmod(socket_path, 0o600)
+        try:
+            async with server:
+                await self.follow_vivaldi()
+        finally:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+
+def main() -> None:
+    """Entry point: serve tab snapshots until interrupted."""
+    # Turn SIGTERM into a normal exit so the socket gets cleaned up
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    async def run() -> None:
+        await TabStateDaemon().serve()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The session tools are flat scripts in the repo root; the Vivaldi ones live in scripts/
+for path in (ROOT, os.path.join(ROOT, "scripts")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import claude_session_index as csi  # noqa: E402
+
+
+@pytest.fixture
+def claude_home(tmp_path, monkeypatch):
+    """Point the session tools at an empty projects dir, archive and cache under tmp_path."""
+    monkeypatch.setattr(csi, "CLAUDE_PROJECTS_DIR", tmp_path / "projects")
+    monkeypatch.setattr(csi, "ARCHIVE_DIR", tmp_path / "archive")
+    monkeypatch.setattr(csi, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(csi, "CATALOG_PATH", tmp_path / "cache" / "catalog.sqlite")
+    monkeypatch.setattr(csi, "DAEMON_SOCKET", tmp_path / "claude-sessions.sock")
+    (tmp_path / "projects").mkdir()
+    return tmp_path
+
+
+def write_transcript(project_dir, session_id, prompt, cwd="/home/me/app", extra=0):
+    """Write a minimal transcript: one user prompt plus extra assistant lines."""
+    project_dir.mkdir(parents=True, exist_ok=True)
+    lines = [{"type": "user", "cwd": cwd, "message": {"role": "user", "content": [{"type": "text", "text": prompt}]}}]
+    lines += [
+        {"type": "assistant", "message": {"role": "assistant", "content": [{"type": "text", "text": f"reply {i}"}]}}
+        for i in range(extra)
+    ]
+    path = project_dir / f"{session_id}.jsonl"
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines))
+    return path
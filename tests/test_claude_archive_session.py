@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+import claude_archive_session as cas
+import claude_session_index as csi
+from conftest import write_transcript
+
+
+@pytest.fixture
+def project(claude_home):
+    project = claude_home / "projects" / "-home-me-app"
+    write_transcript(project, "s1", "first session", extra=3)
+    write_transcript(project, "s2", "second session")
+    (project / "s1").mkdir()
+    (project / "s1" / "agent-1.jsonl").write_text("{}\n")
+    return project
+
+
+def session(sessions, session_id):
+    return next(s for s in sessions if s["sessionId"] == session_id)
+
+
+def test_archive_then_restore_round_trip(project):
+    original = (project / "s1.jsonl").read_bytes()
+    s1 = session(csi.get_sessions(), "s1")
+
+    assert cas.archive_sessions([s1]) == 1
+    assert sorted(p.name for p in project.iterdir()) == ["s2.jsonl"]
+
+    archived = csi.load_archived_sessions()
+    assert [(s["sessionId"], s["sessionName"], s["archived"]) for s in archived] == [
+        ("s1", "first session", True),
+    ]
+    assert archived[0]["size"] == len(original)
+    assert archived[0]["preview"][-1] == ["assistant", "reply 2"]
+    assert [s["sessionId"] for s in csi.load_sessions(include_archived=True)] == ["s2", "s1"]
+
+    assert cas.restore_session(archived[0]) is True
+    assert (project / "s1.jsonl").read_bytes() == original
+    assert (project / "s1" / "agent-1.jsonl").exists()
+    assert csi.load_archived_sessions() == []
+    assert not list((csi.ARCHIVE_DIR / project.name).glob("*.tar.xz"))
+
+
+def test_restore_puts_index_entry_back(project):
+    index_entry = {"sessionId": "s1", "projectPath": "/home/me/app", "customTitle": "titled"}
+    (project / "sessions-index.json").write_text(json.dumps({"version": 1, "entries": [index_entry]}))
+    s1 = session(csi.get_sessions(), "s1")
+    assert s1["indexFile"]
+
+    cas.archive_sessions([s1])
+    assert json.loads((project / "sessions-index.json").read_text())["entries"] == []
+
+    cas.restore_session(csi.load_archived_sessions()[0])
+    assert json.loads((project / "sessions-index.json").read_text())["entries"] == [index_entry]
+
+
+def test_failed_extract_keeps_the_archive(project, capsys):
+    s1 = session(csi.get_sessions(), "s1")
+    cas.archive_sessions([s1])
+    entry = csi.load_archived_sessions()[0]
+    with open(entry["archivePath"], "r+b") as f:
+        f.truncate(20)
+
+    assert cas.restore_session(entry) is False
+    assert "Failed to restore s1" in capsys.readouterr().out
+    assert csi.load_archived_sessions() == [entry]
+
+
+def test_archive_policy_dry_run(project, monkeypatch, capsys):
+    monkeypatch.setattr(cas.sys, "argv", ["claude_archive_session.py", "--larger-than", "0", "-n"])
+    monkeypatch.setattr(cas.csi, "load_sessions", csi.get_sessions)
+    cas.main()
+
+    assert "2 session(s)" in capsys.readouterr().out
+    assert csi.load_archived_sessions() == []
+    assert (project / "s1.jsonl").exists()
+
+
+def test_archive_dry_run_without_policy_is_rejected(claude_home, monkeypatch):
+    monkeypatch.setattr(cas.sys, "argv", ["claude_archive_session.py", "-n"])
+    monkeypatch.setattr(cas, "pick", lambda *a: pytest.fail("reached the interactive picker"))
+    with pytest.raises(SystemExit) as e:
+        cas.main()
+    assert e.value.code == 2
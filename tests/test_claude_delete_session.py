@@ -0,0 +1,157 @@
+import argparse
+import os
+import time
+
+import pytest
+
+import claude_delete_session as cds
+
+
+DAY = 86400
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("90m", 90 * 60),
+    ("12h", 12 * 3600),
+    ("30d", 30 * DAY),
+    ("2w", 14 * DAY),
+    ("7", 7 * DAY),
+    (" 1.5D ", 1.5 * DAY),
+])
+def test_parse_age(value, seconds):
+    assert cds.parse_age(value) == seconds
+
+
+@pytest.mark.parametrize("value", ["", "d", "soon", "3y"])
+def test_parse_age_rejects_garbage(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        cds.parse_age(value)
+
+
+@pytest.mark.parametrize("value, size", [
+    ("512", 512),
+    ("100b", 100),
+    ("500K", 500 * 1024),
+    ("50MB", 50 * 1024 ** 2),
+    ("1G", 1024 ** 3),
+    ("0.5m", 512 * 1024),
+])
+def test_parse_size(value, size):
+    assert cds.parse_size(value) == size
+
+
+@pytest.mark.parametrize("value", ["", "MB", "big", "10T"])
+def test_parse_size_rejects_garbage(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        cds.parse_size(value)
+
+
+def make_session(tmp_path, session_id, size, modified, project="/home/me/app", file_age=None):
+    project_dir = tmp_path / project.strip("/").replace("/", "-")
+    project_dir.mkdir(exist_ok=True)
+    transcript = project_dir / f"{session_id}.jsonl"
+    transcript.write_bytes(b"x" * size)
+    if file_age is not None:
+        mtime = time.time() - file_age
+        os.utime(transcript, (mtime, mtime))
+    return {
+        "sessionId": session_id,
+        "sessionName": f"session {session_id}",
+        "projectPath": project,
+        "projectDir": str(project_dir),
+        "modified": modified,
+    }
+
+
+def selected_ids(candidates):
+    return sorted(session["sessionId"] for session, _ in candidates)
+
+
+def test_select_prune_candidates_applies_every_policy(tmp_path):
+    now = time.time()
+    sessions = [
+        make_session(tmp_path, "old-big", 4096, now - 60 * DAY),
+        make_session(tmp_path, "old-small", 10, now - 60 * DAY),
+        make_session(tmp_path, "new-big", 4096, now - DAY),
+        make_session(tmp_path, "other-project", 4096, now - 60 * DAY, project="/srv/api"),
+    ]
+
+    assert selected_ids(cds.select_prune_candidates(sessions, 30 * DAY, None, None)) == [
+        "old-big", "old-small", "other-project",
+    ]
+    assert selected_ids(cds.select_prune_candidates(sessions, None, 1024, None)) == [
+        "new-big", "old-big", "other-project",
+    ]
+    assert selected_ids(cds.select_prune_candidates(sessions, 30 * DAY, 1024, "app")) == ["old-big"]
+
+
+def test_select_prune_candidates_reports_transcript_size(tmp_path):
+    session = make_session(tmp_path, "s", 2048, time.time() - 60 * DAY)
+    assert cds.select_prune_candidates([session], None, None, None) == [(session, 2048)]
+
+
+def test_select_prune_candidates_falls_back_to_transcript_mtime(tmp_path):
+    sessions = [
+        make_session(tmp_path, "no-modified-recent", 10, None, file_age=DAY),
+        make_session(tmp_path, "bad-modified-old", 10, "not a date", file_age=40 * DAY),
+    ]
+    assert selected_ids(cds.select_prune_candidates(sessions, 30 * DAY, None, None)) == [
+        "bad-modified-old",
+    ]
+
+
+def test_select_prune_candidates_skips_sessions_of_unknown_age(tmp_path):
+    session = {"sessionId": "gone", "projectPath": "/p", "projectDir": str(tmp_path), "modified": None}
+    assert cds.select_prune_candidates([session], 30 * DAY, None, None) == []
+
+
+def run_main(monkeypatch, argv, sessions=()):
+    """Run main() with argv; returns what reached the interactive picker or prune."""
+    calls = []
+    monkeypatch.setattr(cds.sys, "argv", ["claude_delete_session.py", *argv])
+    monkeypatch.setattr(cds.csi, "load_sessions", lambda: list(sessions) or [{"sessionName": "s"}])
+    monkeypatch.setattr(cds, "gum_multi_select", lambda *a, **k: calls.append("picker") or [])
+    monkeypatch.setattr(cds, "prune", lambda args, sessions: calls.append("prune"))
+    try:
+        cds.main()
+    except SystemExit as e:
+        calls.append(f"exit {e.code}")
+    return calls
+
+
+@pytest.mark.parametrize("argv", [["-n"], ["--dry-run"], ["-y"], ["--project", "app"], ["--project", "app", "-n"]])
+def test_policy_modifiers_without_a_policy_are_rejected(monkeypatch, capsys, argv):
+    assert run_main(monkeypatch, argv) == ["exit 2"]
+    assert "requires --older-than or --larger-than" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("argv, expected", [
+    ([], ["picker", "exit 0"]),
+    (["--older-than", "30d", "-n"], ["prune"]),
+    (["--larger-than", "1M", "--project", "app", "-y"], ["prune"]),
+])
+def test_policy_dispatch(monkeypatch, argv, expected):
+    assert run_main(monkeypatch, argv) == expected
+
+
+def test_prune_dry_run_changes_nothing(tmp_path, monkeypatch, capsys):
+    session = make_session(tmp_path, "old", 4096, time.time() - 60 * DAY)
+    monkeypatch.setattr(cds, "delete_sessions", lambda sessions: pytest.fail("dry run deleted"))
+    args = argparse.Namespace(older_than=30 * DAY, larger_than=None, project=None, dry_run=True, yes=False)
+
+    cds.prune(args, [session])
+    assert "1 session(s), 0.0MB would be deleted" in capsys.readouterr().out
+    assert os.path.exists(os.path.join(session["projectDir"], "old.jsonl"))
+
+
+def test_prune_deletes_after_confirmation(tmp_path, monkeypatch, capsys):
+    sessions = [
+        make_session(tmp_path, "old", 10, time.time() - 60 * DAY),
+        make_session(tmp_path, "new", 10, time.time()),
+    ]
+    monkeypatch.setattr(cds, "confirm_delete", lambda count, names, verb="Delete": True)
+    args = argparse.Namespace(older_than=30 * DAY, larger_than=None, project=None, dry_run=False, yes=False)
+
+    cds.prune(args, sessions)
+    assert "1/1 sessions deleted" in capsys.readouterr().out
+    assert sorted(os.listdir(sessions[0]["projectDir"])) == ["new.jsonl"]
@@ -0,0 +1,83 @@
+import json
+import threading
+import time
+
+import pytest
+
+import claude_session_daemon as csd
+import claude_session_index as csi
+from conftest import write_transcript
+
+
+def names(sessions):
+    return sorted(s["sessionName"] for s in sessions)
+
+
+@pytest.fixture
+def daemon(claude_home):
+    d = csd.SessionIndexDaemon()
+    yield d
+    d.inotify.close()
+
+
+def served(daemon):
+    daemon.handle_events()
+    daemon.rescan()
+    return json.loads(daemon.response)
+
+
+def test_initial_scan_matches_direct_scan(claude_home, daemon):
+    write_transcript(claude_home / "projects" / "-a", "s1", "first session")
+    write_transcript(claude_home / "projects" / "-b", "s2", "second session")
+
+    daemon.initial_scan()
+    assert json.loads(daemon.response) == csi.get_sessions()
+
+
+def test_events_rescan_only_dirty_projects(claude_home, daemon, monkeypatch):
+    write_transcript(claude_home / "projects" / "-a", "s1", "first session")
+    write_transcript(claude_home / "projects" / "-b", "s2", "second session")
+    daemon.initial_scan()
+
+    scanned = []
+    original = csi.scan_project_dir
+    monkeypatch.setattr(csi, "scan_project_dir", lambda d, c: scanned.append(d.name) or original(d, c))
+
+    write_transcript(claude_home / "projects" / "-b", "s3", "third session")
+    assert names(served(daemon)) == ["first session", "second session", "third session"]
+    assert scanned == ["-b"]
+
+    scanned.clear()
+    (claude_home / "projects" / "-b" / "s2.jsonl").unlink()
+    assert names(served(daemon)) == ["first session", "third session"]
+    assert scanned == ["-b"]
+
+
+def test_new_and_removed_project_dirs(claude_home, daemon):
+    daemon.initial_scan()
+    assert served(daemon) == []
+
+    project = claude_home / "projects" / "-new"
+    project.mkdir()
+    daemon.handle_events()
+    write_transcript(project, "s1", "first session")
+    assert names(served(daemon)) == ["first session"]
+
+    (project / "s1.jsonl").unlink()
+    project.rmdir()
+    assert served(daemon) == []
+
+
+def test_socket_query(claude_home, daemon):
+    write_transcript(claude_home / "projects" / "-a", "s1", "first session")
+    daemon.initial_scan()
+    threading.Thread(target=daemon.serve, daemon=True).start()
+
+    deadline = time.monotonic() + 2
+    while csi.query_daemon() is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert names(csi.query_daemon()) == ["first session"]
+
+    # A query right after a write already sees it, without waiting for the debounce
+    write_transcript(claude_home / "projects" / "-a", "s2", "second session")
+    assert names(csi.query_daemon()) == ["first session", "second session"]
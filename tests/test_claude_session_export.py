@@ -0,0 +1,94 @@
+
+import pytest
+
+import claude_session_export as cse
+
+
+def row(session_id, **overrides):
+    values = {
+        "sessionId": session_id,
+        "projectPath": "/home/me/app",
+        "sessionName": f"Session {session_id} – ünïcode",
+        "projectDir": "/home/me/.claude/projects/-home-me-app",
+        "jsonlPath": f"/home/me/.claude/projects/-home-me-app/{session_id}.jsonl",
+        "firstActivity": "2025-01-01T10:00:00Z",
+        "lastActivity": "2025-01-02T10:00:00Z",
+        "modified": 1735725600.25,
+        "size": 123456789012,
+        "messages": 42,
+        "toolUses": 7,
+        "inputTokens": 1000,
+        "outputTokens": 2000,
+    }
+    values.update(overrides)
+    return values
+
+
+def test_round_trip():
+    rows = [row("a"), row("b", sessionName="", size=0, modified=0.0)]
+    host, exported_at, decoded = cse.decode_catalog(cse.encode_catalog(rows, "devbox"), host="devbox")
+    assert host == "devbox"
+    assert exported_at > 0
+    assert decoded == [dict(r, host="devbox") for r in rows]
+
+
+def test_round_trip_empty_catalog():
+    assert cse.decode_catalog(cse.encode_catalog([], "devbox"))[2] == []
+
+
+def test_nul_in_strings_does_not_shift_columns():
+    host, _, decoded = cse.decode_catalog(cse.encode_catalog([row("a", sessionName="x\0y"), row("b")], "h"))
+    assert [r["sessionName"] for r in decoded] == ["x y", row("b")["sessionName"]]
+    assert [r["sessionId"] for r in decoded] == ["a", "b"]
+
+
+def test_rejects_foreign_or_corrupt_data():
+    data = cse.encode_catalog([row("a")], "devbox")
+    with pytest.raises(cse.ExportError):
+        cse.decode_catalog(b"CLS")
+    with pytest.raises(cse.ExportError):
+        cse.decode_catalog(b"NOPE" + data[4:])
+    with pytest.raises(cse.ExportError):
+        cse.decode_catalog(data[:-5])
+
+
+def test_rejects_row_count_mismatch():
+    data = cse.encode_catalog([row("a"), row("b")], "devbox")
+    _, version, _, exported_at, host_len = cse.HEADER.unpack_from(data)
+    header = cse.HEADER.pack(cse.EXPORT_MAGIC, version, 3, exported_at, host_len)
+    with pytest.raises(cse.ExportError):
+        cse.decode_catalog(header + data[cse.HEADER.size:])
+
+
+def with_host(data, host_bytes):
+    """Replace the host name in an export with raw host_bytes."""
+    _, version, count, exported_at, host_len = cse.HEADER.unpack_from(data)
+    header = cse.HEADER.pack(cse.EXPORT_MAGIC, version, count, exported_at, len(host_bytes))
+    return header + host_bytes + data[cse.HEADER.size + host_len:]
+
+
+@pytest.mark.parametrize("host", [b"", b"../evil", b"a/b", b"a\0b", b"..", b"-oProxyCommand=x"])
+def test_rejects_unsafe_host_names(host):
+    data = with_host(cse.encode_catalog([row("a")], "devbox"), host)
+    with pytest.raises(cse.ExportError):
+        cse.decode_catalog(data)
+
+
+def test_rejects_undecodable_host_name():
+    data = with_host(cse.encode_catalog([row("a")], "devbox"), b"\xff\xfe")
+    with pytest.raises(cse.ExportError):
+        cse.decode_catalog(data)
+
+
+def test_import_never_writes_outside_hosts_dir(claude_home, tmp_path, monkeypatch):
+    monkeypatch.setattr(cse, "HOSTS_DIR", claude_home / "cache" / "hosts")
+    bad = tmp_path / "bad.clsx"
+    bad.write_bytes(with_host(cse.encode_catalog([row("a")], "devbox"), b"../../escaped"))
+    good = tmp_path / "good.clsx"
+    good.write_bytes(cse.encode_catalog([row("a"), row("b")], "devbox"))
+
+    with pytest.raises(cse.ExportError):
+        cse.import_exports([str(bad)])
+    assert cse.import_exports([str(good)]) == [("devbox", 2)]
+    assert sorted(p.name for p in cse.HOSTS_DIR.iterdir()) == ["devbox.clsx"]
+    assert not list(tmp_path.rglob("escaped*"))
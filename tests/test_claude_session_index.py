@@ -0,0 +1,317 @@
+import json
+import os
+import random
+
+import pytest
+
+import claude_session_index as csi
+from conftest import write_transcript
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Record every transcript that get_sessions actually opens."""
+    parsed = []
+    original = csi.parse_session_jsonl
+
+    def counting(path):
+        parsed.append(path.stem)
+        return original(path)
+
+    monkeypatch.setattr(csi, "parse_session_jsonl", counting)
+    return parsed
+
+
+def names(sessions):
+    return sorted(s["sessionName"] for s in sessions)
+
+
+def test_catalog_warm_start_parses_nothing(claude_home, parses):
+    project = claude_home / "projects" / "-home-me-app"
+    write_transcript(project, "s1", "first session")
+    write_transcript(project, "s2", "second session")
+
+    assert names(csi.get_sessions()) == ["first session", "second session"]
+    assert sorted(parses) == ["s1", "s2"]
+
+    parses.clear()
+    assert names(csi.get_sessions()) == ["first session", "second session"]
+    assert parses == []
+
+
+def test_catalog_rescans_changed_transcripts_only(claude_home, parses):
+    project = claude_home / "projects" / "-home-me-app"
+    write_transcript(project, "s1", "first session")
+    path = write_transcript(project, "s2", "second session")
+    csi.get_sessions()
+
+    parses.clear()
+    write_transcript(project, "s2", "renamed session", extra=2)
+    assert names(csi.get_sessions()) == ["first session", "renamed session"]
+    assert parses == ["s2"]
+
+    # Same size, new mtime
+    parses.clear()
+    st = path.stat()
+    os.utime(path, (st.st_atime, st.st_mtime + 10))
+    csi.get_sessions()
+    assert parses == ["s2"]
+
+
+def test_catalog_drops_deleted_transcripts(claude_home, parses):
+    project = claude_home / "projects" / "-home-me-app"
+    write_transcript(project, "s1", "first session")
+    write_transcript(project, "s2", "second session").unlink()
+    csi.get_sessions()
+
+    conn = csi.open_catalog()
+    try:
+        assert [os.path.basename(path) for path in csi.load_catalog(conn)] == ["s1.jsonl"]
+    finally:
+        conn.close()
+
+
+def test_catalog_remembers_transcripts_without_a_session(claude_home, parses):
+    project = claude_home / "projects" / "-home-me-app"
+    (project / "empty.jsonl").parent.mkdir(parents=True)
+    (project / "empty.jsonl").write_text("")
+    assert csi.get_sessions() == []
+    assert parses == ["empty"]
+
+    parses.clear()
+    assert csi.get_sessions() == []
+    assert parses == []
+
+
+def test_scan_project_dir_reuses_matching_entries(claude_home):
+    project = claude_home / "projects" / "-home-me-app"
+    path = write_transcript(project, "s1", "first session")
+    st = path.stat()
+    cached = {"sessionId": "s1", "projectPath": "/cached", "sessionName": "from catalog"}
+
+    sessions, seen = csi.scan_project_dir(project, {str(path): (st.st_mtime, st.st_size, cached)})
+    assert sessions == [cached]
+    assert seen == {str(path): (st.st_mtime, st.st_size, cached)}
+
+    sessions, _ = csi.scan_project_dir(project, {str(path): (st.st_mtime, st.st_size + 1, cached)})
+    assert names(sessions) == ["first session"]
+
+
+# -- incremental transcript stats --
+
+def line(entry_type, timestamp="", tool_uses=0, input_tokens=0, output_tokens=0):
+    content = [{"type": "tool_use", "name": "Bash"} for _ in range(tool_uses)]
+    message = {"content": content, "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens}}
+    return json.dumps({"type": entry_type, "timestamp": timestamp, "message": message}) + "\n"
+
+
+def append(path, text):
+    with open(path, "a") as f:
+        f.write(text)
+
+
+def test_stats_parse_whole_transcript(tmp_path):
+    path = str(tmp_path / "s.jsonl")
+    append(path, line("user", "2025-01-01T10:00:00Z", input_tokens=5))
+    append(path, line("assistant", "2025-01-01T10:01:00Z", tool_uses=2, output_tokens=7))
+    append(path, line("summary"))
+
+    inode, size, offset, stats = csi.update_transcript_stats(path, None)
+
+    assert (size, offset) == (os.path.getsize(path), os.path.getsize(path))
+    assert stats["messages"] == 2
+    assert stats["types"] == {"user": 1, "assistant": 1, "summary": 1}
+    assert stats["toolUses"] == 2
+    assert (stats["inputTokens"], stats["outputTokens"]) == (5, 7)
+    assert (stats["firstActivity"], stats["lastActivity"]) == ("2025-01-01T10:00:00Z", "2025-01-01T10:01:00Z")
+
+
+def test_stats_unchanged_transcript_returns_cache(tmp_path):
+    path = str(tmp_path / "s.jsonl")
+    append(path, line("user", "2025-01-01T10:00:00Z"))
+    cached = csi.update_transcript_stats(path, None)
+    assert csi.update_transcript_stats(path, cached) is cached
+
+
+def test_stats_only_parse_appended_bytes(tmp_path):
+    path = str(tmp_path / "s.jsonl")
+    append(path, line("user", "2025-01-01T10:00:00Z"))
+    cached = csi.update_transcript_stats(path, None)
+
+    # Pretend the cache saw an extra message; an incremental pass keeps it
+    inode, size, offset, stats = cached
+    stats = dict(stats, messages=stats["messages"] + 100)
+    append(path, line("assistant", "2025-01-02T10:00:00Z", output_tokens=3))
+
+    _, new_size, new_offset, new_stats = csi.update_transcript_stats(path, (inode, size, offset, stats))
+
+    assert new_offset == new_size == os.path.getsize(path)
+    assert new_stats["messages"] == 102
+    assert new_stats["outputTokens"] == 3
+    assert new_stats["lastActivity"] == "2025-01-02T10:00:00Z"
+    # The cached stats are not modified in place
+    assert stats["outputTokens"] == 0
+
+
+def test_stats_leave_partial_line_for_next_pass(tmp_path):
+    path = str(tmp_path / "s.jsonl")
+    append(path, line("user", "2025-01-01T10:00:00Z"))
+    complete = os.path.getsize(path)
+    partial = line("assistant", "2025-01-01T10:05:00Z")
+    append(path, partial[:10])
+
+    cached = csi.update_transcript_stats(path, None)
+    assert cached[2] == complete
+    assert cached[3]["messages"] == 1
+
+    append(path, partial[10:])
+    _, _, offset, stats = csi.update_transcript_stats(path, cached)
+    assert offset == os.path.getsize(path)
+    assert stats["messages"] == 2
+
+
+def test_stats_restart_after_truncation_or_replacement(tmp_path):
+    path = str(tmp_path / "s.jsonl")
+    append(path, line("user") * 3)
+    cached = csi.update_transcript_stats(path, None)
+
+    with open(path, "w") as f:
+        f.write(line("assistant"))
+    truncated = csi.update_transcript_stats(path, cached)
+    assert truncated[3]["types"] == {"assistant": 1}
+
+    replacement = tmp_path / "new.jsonl"
+    replacement.write_text(line("user") * 4)
+    os.replace(replacement, path)
+    replaced = csi.update_transcript_stats(path, truncated)
+    assert replaced[3]["types"] == {"user": 4}
+
+
+def test_stats_missing_transcript(tmp_path):
+    assert csi.update_transcript_stats(str(tmp_path / "gone.jsonl"), None) is None
+
+
+def test_session_stats_cache_survives_runs(claude_home, monkeypatch):
+    project = claude_home / "projects" / "-home-me-app"
+    path = write_transcript(project, "s1", "first session", extra=3)
+    session = {"sessionId": "s1", "projectDir": str(project)}
+
+    folded = []
+    original = csi.fold_entry
+    monkeypatch.setattr(csi, "fold_entry", lambda stats, entry: folded.append(entry) or original(stats, entry))
+
+    assert csi.get_session_stats([session])["s1"]["messages"] == 4
+    assert len(folded) == 4
+
+    folded.clear()
+    append(str(path), line("assistant"))
+    assert csi.get_session_stats([session])["s1"]["messages"] == 5
+    assert len(folded) == 1
+
+
+# -- mmap transcript scan --
+
+def baseline_parse(path):
+    """The line-by-line parser the mmap scan replaced (session fields only)."""
+    custom_title = first_prompt = project_path = ""
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry.get("type") == "custom-title":
+                custom_title = entry.get("customTitle", "")
+            if entry.get("type") == "user" and not project_path:
+                project_path = entry.get("cwd", "")
+            if entry.get("type") == "user" and not first_prompt:
+                for item in entry.get("message", {}).get("content", []):
+                    if isinstance(item, dict) and item.get("type") == "text":
+                        first_prompt = item.get("text", "")[:60]
+                        break
+                    elif isinstance(item, str):
+                        first_prompt = item[:60]
+                        break
+    if not project_path:
+        return None
+    return {"projectPath": project_path, "sessionName": custom_title or first_prompt or path.stem}
+
+
+def random_line(rng):
+    kind = rng.choices(
+        ["user", "assistant", "summary", "custom-title", "progress"], weights=[30, 30, 10, 2, 10]
+    )[0]
+    filler = "".join(rng.choice('ab "user" \\ ü{}\t') for _ in range(rng.randint(0, 300)))
+    if kind == "custom-title":
+        return {"type": kind, "customTitle": f"title {filler[:20]}"}
+    if kind == "user":
+        content = rng.choice([
+            [{"type": "text", "text": f"prompt {filler}"}],
+            [{"type": "tool_result", "content": filler}],
+            [{"type": "tool_result", "content": "x"}, {"type": "text", "text": f"late {filler}"}],
+            [],
+        ])
+        entry = {"type": kind, "message": {"role": "user", "content": content}}
+        if rng.random() < 0.7:
+            entry["cwd"] = rng.choice(["", "/home/me/app", "/srv/api"])
+        return entry
+    if kind == "assistant":
+        return {"type": kind, "message": {"content": [{"type": "text", "text": f'said "user" {filler}'}]}}
+    return {"type": kind, "data": filler}
+
+
+def write_random_transcript(path, rng):
+    lines = [json.dumps(random_line(rng)) for _ in range(rng.randint(0, 40))]
+    if rng.random() < 0.2:
+        lines.insert(rng.randint(0, len(lines)), '{"type": "user", broken')
+    text = "\n".join(lines)
+    if lines and rng.random() < 0.8:
+        text += "\n"
+    path.write_text(text)
+
+
+def scanned(path):
+    session = csi.parse_session_jsonl(path)
+    if session is None:
+        return None
+    return {"projectPath": session["projectPath"], "sessionName": session["sessionName"]}
+
+
+@pytest.mark.parametrize("window", [16, 64, 1024, csi.SCAN_WINDOW])
+def test_mmap_scan_matches_baseline_parser(tmp_path, monkeypatch, window):
+    monkeypatch.setattr(csi, "SCAN_WINDOW", window)
+    rng = random.Random(window)
+    for i in range(150):
+        path = tmp_path / f"s{i}.jsonl"
+        write_random_transcript(path, rng)
+        assert scanned(path) == baseline_parse(path), path.read_text()
+
+
+def test_marked_lines_across_window_boundaries(monkeypatch):
+    monkeypatch.setattr(csi, "SCAN_WINDOW", 8)
+    buf = b'{"type": "user", "n": 1}\nnothing here at all\n{"x": "user"}{"type": "user"}\nlast "user"'
+    assert list(csi.iter_marked_lines(buf, b'"user"')) == [
+        b'{"type": "user", "n": 1}',
+        b'{"x": "user"}{"type": "user"}',
+        b'last "user"',
+    ]
+    assert list(csi.iter_marked_lines(b"", b'"user"')) == []
+
+
+def test_custom_title_is_the_last_one(tmp_path, monkeypatch):
+    monkeypatch.setattr(csi, "SCAN_WINDOW", 32)
+    lines = [
+        {"type": "custom-title", "customTitle": "first"},
+        {"type": "assistant", "message": {"content": 'mentions "custom-title" in text'}},
+        {"type": "custom-title", "customTitle": "second"},
+        {"type": "user", "message": {"content": "the \"custom-title\" marker again"}},
+    ]
+    buf = "".join(json.dumps(line) + "\n" for line in lines).encode()
+    assert csi.find_custom_title(buf) == "second"
+    assert csi.find_custom_title(b"") == ""
+
+
+def test_empty_transcript(tmp_path):
+    path = tmp_path / "empty.jsonl"
+    path.write_text("")
+    assert csi.parse_session_jsonl(path) is None
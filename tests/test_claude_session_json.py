@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+import claude_session_index as csi
+import claude_session_json as csj
+
+
+LINES = [
+    {"type": "summary", "summary": "ignored"},
+    {"type": "user", "cwd": "/home/me/app", "message": {"role": "user", "content": [
+        {"type": "tool_result", "content": "output"},
+        {"type": "text", "text": "fix the ünïcode parser please " * 4},
+    ]}},
+    {"type": "assistant", "message": {"role": "assistant", "content": [
+        {"type": "text", "text": "done"}, {"type": "tool_use", "name": "Edit"},
+    ], "usage": {"input_tokens": 3, "output_tokens": 5}}},
+    {"type": "user", "cwd": "/home/me/app", "message": {"role": "user", "content": "plain string prompt"}},
+    {"type": "custom-title", "customTitle": "Parser work"},
+    {"type": "user", "message": None},
+    [1, 2, 3],
+]
+
+
+@pytest.fixture
+def transcript(tmp_path):
+    path = tmp_path / "s1.jsonl"
+    text = "".join(json.dumps(line) + "\n" for line in LINES)
+    path.write_text(text + "{not json\n" + json.dumps(LINES[2]) + "\n")
+    return path
+
+
+def results(path):
+    """Everything the session tools derive from a transcript."""
+    session = csi.parse_session_jsonl(path)
+    session.pop("modified")
+    return (
+        session,
+        csi.read_tail_messages(str(path), 6),
+        csi.update_transcript_stats(str(path), None)[3],
+        [csj.loads(json.dumps(line)) for line in LINES],
+    )
+
+
+@pytest.mark.parametrize("backend", [b for b in csj.BACKENDS if b != "json"])
+def test_backends_match_stdlib_json(transcript, monkeypatch, backend):
+    monkeypatch.setattr(csj, "BACKEND", "json")
+    expected = results(transcript)
+    assert expected[0]["sessionName"] == "Parser work"
+
+    monkeypatch.setattr(csj, "BACKEND", backend)
+    assert results(transcript) == expected
+
+
+@pytest.mark.parametrize("backend", csj.BACKENDS)
+def test_backends_raise_value_error(monkeypatch, backend):
+    monkeypatch.setattr(csj, "BACKEND", backend)
+    with pytest.raises(ValueError):
+        csj.loads(b"{not json")
+    with pytest.raises(ValueError):
+        csj.decode_header(b'{"type": "user", ')
+
+
+def test_msgspec_header_keeps_fields_discovery_needs(monkeypatch):
+    pytest.importorskip("msgspec")
+    monkeypatch.setattr(csj, "BACKEND", "msgspec")
+    header = csj.decode_header(json.dumps(LINES[1]).encode())
+    assert header["type"] == "user"
+    assert header["cwd"] == "/home/me/app"
+    assert header["message"]["content"][-1] == {"type": "text", "text": LINES[1]["message"]["content"][1]["text"]}
+    # Unexpected shapes fall back to a full decode
+    odd = {"type": "user", "cwd": 5, "message": {"content": 7}}
+    assert csj.decode_header(json.dumps(odd).encode()) == odd
@@ -0,0 +1,74 @@
+import os
+
+import claude_session_picker as csp
+
+
+ITEMS = [
+    "fix flaky deploy test",
+    "deploy docs site",
+    "refactor session picker",
+    "Deploy hotfix",
+    "unrelated chat",
+]
+
+
+def names(index, query):
+    return [index.items[idx] for idx in index.match(query)]
+
+
+def test_fuzzy_match_contiguous_and_subsequence():
+    index = csp.FuzzyIndex(ITEMS)
+    assert set(names(index, "deploy")) == {"fix flaky deploy test", "deploy docs site", "Deploy hotfix"}
+    assert names(index, "rfsp") == ["refactor session picker"]
+    assert names(index, "") == ITEMS
+
+
+def test_fuzzy_match_prefers_word_start_and_requires_every_term():
+    index = csp.FuzzyIndex(ITEMS)
+    assert names(index, "deploy")[0] in ("deploy docs site", "Deploy hotfix")
+    assert names(index, "deploy docs") == ["deploy docs site"]
+    assert names(index, "'ploy 'site") == ["deploy docs site"]
+    assert names(index, "'xyz") == []
+
+
+def test_fuzzy_narrowing_matches_fresh_index():
+    narrowed = csp.FuzzyIndex(ITEMS)
+    for end in range(1, len("deploy h") + 1):
+        query = "deploy h"[:end]
+        assert narrowed.match(query) == csp.FuzzyIndex(ITEMS).match(query)
+
+
+def test_fuzzy_narrowing_rescores_only_prefix_matches():
+    index = csp.FuzzyIndex(ITEMS)
+    index.match("dep")
+    scored = []
+    original = index.score
+    index.score = lambda idx, terms: scored.append(idx) or original(idx, terms)
+
+    index.match("depl")
+    assert set(scored) <= set(index.cache["dep"])
+
+    scored.clear()
+    index.match("depl")
+    assert scored == []
+
+
+def test_fuzzy_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(csp, "MAX_CACHED_QUERIES", 3)
+    index = csp.FuzzyIndex(ITEMS)
+    for query in ["a", "b", "c", "d", "e"]:
+        index.match(query)
+    assert len(index.cache) <= 3
+    assert "" in index.cache
+
+
+def test_fzf_select_maps_rows_with_tabs_back(tmp_path, monkeypatch):
+    fzf = tmp_path / "fzf"
+    # Pick the second row, as fzf would print it
+    fzf.write_text("#!/bin/sh\nsed -n 2p\n")
+    fzf.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    items = ["plain", "name\twith tab", "other"]
+    assert csp.fzf_select(items) == "name\twith tab"
+    assert csp.fzf_select(items, keys=["k1", "k2", "k3"]) == "name\twith tab"
@@ -0,0 +1,122 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+import claude_session_search as css
+
+
+def message(role, text):
+    return json.dumps({"type": role, "message": {"role": role, "content": text}}) + "\n"
+
+
+@pytest.fixture
+def search_env(claude_home, monkeypatch):
+    project = claude_home / "projects" / "-home-me-app"
+    project.mkdir()
+    monkeypatch.setattr(css, "SEARCH_DB_PATH", claude_home / "cache" / "search.sqlite")
+    conn = css.open_search_index()
+    yield project, conn
+    conn.close()
+
+
+def indexed(conn, session_id):
+    return [text for (text,) in conn.execute(
+        "SELECT text FROM messages WHERE session_id = ? ORDER BY rowid", (session_id,)
+    )]
+
+
+def test_search_indexes_only_appended_messages(search_env):
+    project, conn = search_env
+    transcript = project / "s1.jsonl"
+    transcript.write_text(message("user", "deploy the walrus") + message("assistant", "walrus deployed"))
+
+    assert css.update_search_index(conn) == 2
+    assert css.update_search_index(conn) == 0
+
+    with open(transcript, "a") as f:
+        f.write(message("user", "now scale the penguin"))
+    assert css.update_search_index(conn) == 1
+    assert indexed(conn, "s1") == ["deploy the walrus", "walrus deployed", "now scale the penguin"]
+    assert [session_id for session_id, _, _ in css.search(conn, "penguin")] == ["s1"]
+
+
+def test_search_waits_for_partial_line(search_env):
+    project, conn = search_env
+    transcript = project / "s1.jsonl"
+    partial = message("user", "half written")
+    transcript.write_text(message("user", "first") + partial[:12])
+
+    assert css.update_search_index(conn) == 1
+    with open(transcript, "a") as f:
+        f.write(partial[12:])
+    assert css.update_search_index(conn) == 1
+    assert indexed(conn, "s1") == ["first", "half written"]
+
+
+def test_search_reindexes_replaced_transcript(search_env):
+    project, conn = search_env
+    transcript = project / "s1.jsonl"
+    transcript.write_text(message("user", "old text") + message("assistant", "more old text"))
+    css.update_search_index(conn)
+
+    replacement = project / "tmp"
+    replacement.write_text(message("user", "new text"))
+    os.replace(replacement, transcript)
+
+    assert css.update_search_index(conn) == 1
+    assert indexed(conn, "s1") == ["new text"]
+
+
+def test_search_drops_deleted_transcript(search_env):
+    project, conn = search_env
+    transcript = project / "s1.jsonl"
+    transcript.write_text(message("user", "soon gone"))
+    css.update_search_index(conn)
+
+    transcript.unlink()
+    css.update_search_index(conn)
+    assert indexed(conn, "s1") == []
+    assert css.search(conn, "gone") == []
+
+
+def test_search_replacing_one_session_keeps_the_others(search_env):
+    project, conn = search_env
+    (project / "s1.jsonl").write_text(message("user", "alpha one") + message("assistant", "alpha two"))
+    (project / "s2.jsonl").write_text(message("user", "beta one"))
+    css.update_search_index(conn)
+    with open(project / "s2.jsonl", "a") as f:
+        f.write(message("user", "beta two"))
+    css.update_search_index(conn)
+
+    replacement = project / "tmp"
+    replacement.write_text(message("user", "alpha three"))
+    os.replace(replacement, project / "s1.jsonl")
+    css.update_search_index(conn)
+
+    assert indexed(conn, "s1") == ["alpha three"]
+    assert indexed(conn, "s2") == ["beta one", "beta two"]
+    assert conn.execute("SELECT COUNT(*) FROM batches WHERE session_id = 's1'").fetchone() == (1,)
+
+
+def test_search_rebuilds_index_from_older_schema(search_env):
+    project, conn = search_env
+    conn.close()
+    db_path = css.SEARCH_DB_PATH
+    os.remove(db_path)
+    old = sqlite3.connect(db_path)
+    old.execute("CREATE TABLE files (path TEXT PRIMARY KEY, session_id TEXT, inode INTEGER, offset INTEGER)")
+    old.execute("CREATE VIRTUAL TABLE messages USING fts5(session_id UNINDEXED, role UNINDEXED, text)")
+    old.execute("INSERT INTO messages VALUES ('s1', 'user', 'stale text')")
+    old.execute("INSERT INTO files VALUES (?, 's1', 0, 999)", (str(project / "s1.jsonl"),))
+    old.commit()
+    old.close()
+
+    (project / "s1.jsonl").write_text(message("user", "fresh text"))
+    conn = css.open_search_index()
+    try:
+        assert css.update_search_index(conn) == 1
+        assert indexed(conn, "s1") == ["fresh text"]
+    finally:
+        conn.close()
@@ -0,0 +1,75 @@
+import multiprocessing
+import time
+
+import pytest
+
+import claude_session_usage as csu
+
+
+DAY = 86400
+
+
+@pytest.fixture
+def usage_log(claude_home, monkeypatch):
+    path = claude_home / "cache" / "usage.log"
+    monkeypatch.setattr(csu, "USAGE_LOG", path)
+    return path
+
+
+def test_weights_halve_every_half_life():
+    now = 1_000_000_000.0
+    week = csu.HALF_LIFE_DAYS * DAY
+    data = f"{now:.0f}\ta\t1\n{now - week:.0f}\tb\t1\n{now - 2 * week:.0f}\tb\t1\n"
+    scores = csu.read_scores(data, now)
+    assert scores["a"] == pytest.approx(1.0)
+    assert scores["b"] == pytest.approx(0.75)
+
+
+def test_malformed_lines_are_skipped():
+    scores = csu.read_scores("garbage\n1\ta\tnot-a-number\n\n100\tb\t1\n", 100)
+    assert scores == {"b": 1.0}
+
+
+def test_compaction_keeps_scores_and_drops_faded_sessions(usage_log, monkeypatch):
+    now = time.time()
+    usage_log.parent.mkdir(parents=True)
+    lines = [f"{now - i * 3600:.0f}\thot\t1\n" for i in range(50)]
+    lines += [f"{now - 3 * DAY:.0f}\twarm\t1\n"]
+    lines += [f"{now - 365 * DAY:.0f}\tfaded\t1\n"]
+    usage_log.write_text("".join(lines))
+    before = csu.load_scores(now)
+
+    monkeypatch.setattr(csu, "COMPACT_BYTES", 0)
+    csu.record_use("warm")
+
+    after = csu.load_scores()
+    assert len(usage_log.read_text().splitlines()) == 2
+    assert set(after) == {"hot", "warm"}
+    assert after["hot"] == pytest.approx(before["hot"], abs=1e-3)
+    assert after["warm"] == pytest.approx(before["warm"] + 1, abs=1e-3)
+
+
+def record_many(args):
+    session_id, count = args
+    for _ in range(count):
+        csu.record_use(session_id)
+
+
+def test_concurrent_uses_survive_compaction(usage_log, monkeypatch):
+    # Compact every few appends while other processes keep writing
+    monkeypatch.setattr(csu, "COMPACT_BYTES", 200)
+    ctx = multiprocessing.get_context("fork")
+    with ctx.Pool(4) as pool:
+        pool.map(record_many, [(f"s{i}", 25) for i in range(4)])
+
+    scores = csu.load_scores()
+    assert sorted(scores) == ["s0", "s1", "s2", "s3"]
+    for score in scores.values():
+        assert score == pytest.approx(25, abs=0.01)
+    assert not list(usage_log.parent.glob(".usage.*"))
+
+
+def test_rank_sessions_orders_by_score_then_keeps_modified_order():
+    sessions = [{"sessionId": sid} for sid in ["newest", "used-once", "older", "used-often"]]
+    csu.rank_sessions(sessions, {"used-often": 3.0, "used-once": 1.0})
+    assert [s["sessionId"] for s in sessions] == ["used-often", "used-once", "newest", "older"]
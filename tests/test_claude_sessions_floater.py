@@ -0,0 +1,109 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import claude_sessions_floater as csf
+
+
+@pytest.fixture
+def floater_env(claude_home, tmp_path, monkeypatch):
+    """Fake claude and zellij on PATH; claude records its args and runs until killed."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "claude").write_text(f'#!/bin/sh\necho "$@ in $(pwd)" >> {tmp_path}/claude.log\nexec sleep 30\n')
+    (bin_dir / "zellij").write_text(f'#!/bin/sh\necho "$@" >> {tmp_path}/zellij.log\n')
+    for tool in ("claude", "zellij"):
+        (bin_dir / tool).chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    monkeypatch.setattr(csf, "POOL_DIR", claude_home / "cache" / "pane-pool")
+    monkeypatch.setattr(csf, "SESSION_LOCK_DIR", claude_home / "cache" / "open-sessions")
+
+    procs = []
+
+    def start(*args):
+        code = (
+            "import sys, claude_sessions_floater as csf, pathlib;"
+            f"csf.POOL_DIR = pathlib.Path({str(csf.POOL_DIR)!r});"
+            f"csf.SESSION_LOCK_DIR = pathlib.Path({str(csf.SESSION_LOCK_DIR)!r});"
+            f"sys.argv = ['floater', *{list(args)!r}]; csf.main()"
+        )
+        proc = subprocess.Popen([sys.executable, "-c", code], cwd=os.path.dirname(csf.__file__),
+                                stdout=subprocess.DEVNULL)
+        procs.append(proc)
+        return proc
+
+    yield tmp_path, start
+    for proc in procs:
+        proc.kill()
+        proc.wait()
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_warm_slots_are_probed_without_waking_helpers(floater_env):
+    _, start = floater_env
+    start("--warm-pane", "0")
+    start("--warm-pane", "1")
+    assert wait_for(lambda: csf.warm_slot_alive(0) and csf.warm_slot_alive(1))
+
+    # Probing again and again never makes a helper drop its slot
+    for _ in range(20):
+        assert csf.warm_slot_alive(0) and csf.warm_slot_alive(1)
+    assert not csf.warm_slot_alive(2)
+
+
+def test_claim_hands_session_to_helper_and_marks_it_open(floater_env):
+    tmp_path, start = floater_env
+    start("--warm-pane", "0")
+    assert wait_for(lambda: csf.warm_slot_alive(0))
+
+    assert csf.claim_warm_pane(1, str(tmp_path / "missing"), "s1") is None
+    assert csf.warm_slot_alive(0)
+
+    assert csf.claim_warm_pane(1, str(tmp_path), "s1") == 0
+    assert not csf.warm_slot_alive(0)
+    assert wait_for(lambda: (tmp_path / "claude.log").exists())
+    assert (tmp_path / "claude.log").read_text().strip() == f"--resume s1 --dangerously-skip-permissions in {tmp_path}"
+    assert csf.lock_held(csf.session_lock("s1"))
+
+
+def test_session_lock_is_released_when_claude_exits(floater_env):
+    _, start = floater_env
+    proc = start("--run-session", "s2")
+    assert wait_for(lambda: csf.lock_held(csf.session_lock("s2")))
+
+    proc.kill()
+    proc.wait()
+    assert not csf.lock_held(csf.session_lock("s2"))
+
+
+def test_exited_pane_is_not_reused(floater_env, monkeypatch):
+    tmp_path, _ = floater_env
+    layout = 'tab name="work" focus=true {\n    pane name="claude:s3" command="python3"\n}\n'
+    calls = []
+    monkeypatch.setattr(csf, "zellij_action", lambda *args: calls.append(args) or layout)
+    monkeypatch.setattr(csf, "open_zellij_pane", lambda cwd, session_id: calls.append(("run", session_id)))
+
+    csf.open_session(str(tmp_path), "s3", 0)
+    assert calls[-1] == ("run", "s3")
+
+
+def test_pool_layout_escapes_paths(floater_env, monkeypatch):
+    tmp_path, _ = floater_env
+    monkeypatch.setattr(csf.sys, "executable", '/opt/py "3"/bin\\python')
+    csf.refill_pool(1, "")
+
+    layout = (csf.POOL_DIR / "0.kdl").read_text()
+    assert 'command="/opt/py \\"3\\"/bin\\\\python"' in layout
+    assert "new-tab --layout" in (tmp_path / "zellij.log").read_text()
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+import tabkill
+import vivaldi_base as vb
+
+
+@pytest.fixture
+def cdp(monkeypatch):
+    """Stub the browser: batch results per tab id and /json/close outcomes."""
+    state = {"batch": {}, "http_ok": set(), "http_calls": [], "raise": None}
+
+    def run_many(ws_url, commands, timeout=10):
+        if state["raise"]:
+            raise state["raise"]
+        return [state["batch"][params["targetId"]] for _, params in commands]
+
+    def close_tab(tab_id):
+        state["http_calls"].append(tab_id)
+        return tab_id in state["http_ok"]
+
+    monkeypatch.setattr(vb, "find_browser_ws", lambda use_daemon=True: "ws://127.0.0.1:9222/devtools/browser/x")
+    monkeypatch.setattr(vb, "cdp_run_many", run_many)
+    monkeypatch.setattr(vb, "cdp_close_tab", close_tab)
+    return state
+
+
+def test_counts_batch_answers_and_retries_only_unanswered(cdp):
+    cdp["batch"] = {
+        "ok": {"success": True},
+        "ok-empty": {},
+        "refused": {"success": False},
+        "gone": vb.CDPError("No target with given id"),
+        "timed-out": asyncio.TimeoutError(),
+        "dropped": ConnectionError(),
+    }
+    cdp["http_ok"] = {"timed-out"}
+
+    assert tabkill.close_tabs(list(cdp["batch"])) == 3
+    assert cdp["http_calls"] == ["timed-out", "dropped"]
+
+
+def test_falls_back_to_http_when_the_connection_fails(cdp):
+    cdp["raise"] = ConnectionRefusedError()
+    cdp["http_ok"] = {"a", "c"}
+
+    assert tabkill.close_tabs(["a", "b", "c"]) == 2
+    assert cdp["http_calls"] == ["a", "b", "c"]
+
+
+def test_falls_back_to_http_without_a_browser_socket(cdp, monkeypatch):
+    monkeypatch.setattr(vb, "find_browser_ws", lambda use_daemon=True: None)
+    cdp["http_ok"] = {"a"}
+
+    assert tabkill.close_tabs(["a", "b"]) == 1
+    assert tabkill.close_tabs([]) == 0
@@ -0,0 +1,225 @@
+import asyncio
+import base64
+import hashlib
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+import vivaldi_base as vb
+
+
+class FakeBrowser:
+    """A one-connection CDP WebSocket server running in a thread.
+
+    handler(message, send) is called for every command the client sends;
+    send(dict) writes a frame back. Returning "drop" closes the socket.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.url = f"ws://127.0.0.1:{self.server.getsockname()[1]}/devtools/browser/x"
+        self.received = []
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        conn, _ = self.server.accept()
+        with conn:
+            request = b""
+            while not request.endswith(b"\r\n\r\n"):
+                request += conn.recv(1)
+            key = next(
+                line.split(b":", 1)[1].strip() for line in request.split(b"\r\n")
+                if line.lower().startswith(b"sec-websocket-key")
+            )
+            accept = base64.b64encode(hashlib.sha1(key + vb.WS_GUID).digest())
+            conn.sendall(
+                b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+            )
+            lock = threading.Lock()
+
+            def send(message):
+                with lock:
+                    vb._ws_send(conn, json.dumps(message))
+
+            while True:
+                try:
+                    message = json.loads(vb._ws_recv(conn))
+                except (OSError, ValueError):
+                    return
+                self.received.append(message)
+                if self.handler(message, send) == "drop":
+                    conn.shutdown(socket.SHUT_RDWR)
+                    return
+
+    def close(self):
+        self.server.close()
+        self.thread.join(timeout=5)
+
+
+@pytest.fixture
+def browser():
+    servers = []
+
+    def start(handler):
+        server = FakeBrowser(handler)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def echo(message, send):
+    send({"id": message["id"], "result": {"echo": message["params"]}})
+
+
+def test_concurrent_calls_resolve_by_id(browser):
+    held = []
+
+    def answer_in_reverse(message, send):
+        held.append(message)
+        if len(held) == 5:
+            for m in reversed(held):
+                echo(m, send)
+
+    server = browser(answer_in_reverse)
+
+    async def run():
+        async with await vb.AsyncCDPConnection.open(server.url) as conn:
+            return await asyncio.gather(*(conn.call("Test.echo", {"n": n}) for n in range(5)))
+
+    results = asyncio.run(run())
+    assert [r["echo"]["n"] for r in results] == list(range(5))
+    assert len({m["id"] for m in server.received}) == 5
+
+
+def test_events_reach_matching_subscriptions(browser):
+    def emit_events(message, send):
+        send({"method": "Target.targetCreated", "params": {"n": 1}})
+        send({"method": "Page.loadEventFired", "params": {}})
+        send({"method": "Target.targetDestroyed", "params": {"n": 2}})
+        echo(message, send)
+
+    server = browser(emit_events)
+
+    async def run():
+        async with await vb.AsyncCDPConnection.open(server.url) as conn:
+            targets = conn.subscribe("Target.*")
+            pages = conn.subscribe("Page.loadEventFired")
+            ignored = conn.subscribe("Network.*")
+            conn.unsubscribe(pages)
+            await conn.call("Target.setDiscoverTargets", {"discover": True})
+            return (
+                [targets.get_nowait()["method"] for _ in range(targets.qsize())],
+                pages.qsize(),
+                ignored.qsize(),
+            )
+
+    assert asyncio.run(run()) == (["Target.targetCreated", "Target.targetDestroyed"], 0, 0)
+
+
+def test_error_reply_raises_cdp_error(browser):
+    server = browser(lambda m, send: send({"id": m["id"], "error": {"message": "No target"}}))
+
+    async def run():
+        async with await vb.AsyncCDPConnection.open(server.url) as conn:
+            with pytest.raises(vb.CDPError, match="No target"):
+                await conn.call("Target.closeTarget", {"targetId": "x"})
+            assert await conn.evaluate("1 + 1") is None
+
+    asyncio.run(run())
+
+
+def test_dropped_connection_fails_pending_and_later_calls(browser):
+    def drop_on_second(message, send):
+        if message["id"] == 1:
+            return None  # never answered
+        return "drop"
+
+    server = browser(drop_on_second)
+
+    async def run():
+        async with await vb.AsyncCDPConnection.open(server.url) as conn:
+            results = await asyncio.gather(
+                conn.call("Test.never"), conn.call("Test.drop"), return_exceptions=True
+            )
+            await asyncio.sleep(0)
+            with pytest.raises(ConnectionError):
+                await conn.call("Test.after")
+            return results
+
+    results = asyncio.run(asyncio.wait_for(run(), 5))
+    assert all(isinstance(r, ConnectionError) for r in results)
+
+
+def test_refused_upgrade_raises_connection_error():
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+
+    def refuse():
+        conn, _ = server.accept()
+        with conn:
+            conn.recv(4096)
+            conn.sendall(b"HTTP/1.1 404 Not Found\r\n\r\n")
+
+    thread = threading.Thread(target=refuse, daemon=True)
+    thread.start()
+    with pytest.raises(ConnectionError, match="refused"):
+        asyncio.run(vb.AsyncCDPConnection.open(f"ws://127.0.0.1:{port}/x"))
+    thread.join(timeout=5)
+    server.close()
+
+
+def test_run_many_returns_results_and_errors_in_order(browser):
+    def close_target(message, send):
+        if message["params"]["targetId"] == "bad":
+            send({"id": message["id"], "error": {"message": "No target with given id"}})
+        else:
+            send({"id": message["id"], "result": {"success": True}})
+
+    server = browser(close_target)
+    commands = [("Target.closeTarget", {"targetId": t}) for t in ["a", "bad", "c"]]
+
+    start = time.monotonic()
+    results = vb.cdp_run_many(server.url, commands)
+    assert time.monotonic() - start < 5
+    assert results[0] == {"success": True} and results[2] == {"success": True}
+    assert isinstance(results[1], vb.CDPError)
+
+
+def test_run_many_keeps_answers_that_beat_the_timeout(browser):
+    def answer_some(message, send):
+        if message["params"]["targetId"] != "slow":
+            send({"id": message["id"], "result": {"success": True}})
+
+    server = browser(answer_some)
+    commands = [("Target.closeTarget", {"targetId": t}) for t in ["a", "slow", "c"]]
+
+    results = vb.cdp_run_many(server.url, commands, timeout=0.3)
+    assert results[0] == results[2] == {"success": True}
+    assert isinstance(results[1], asyncio.TimeoutError)
+
+
+def test_truncated_upgrade_raises_connection_error():
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+
+    def hang_up():
+        conn, _ = server.accept()
+        with conn:
+            conn.recv(4096)
+            conn.sendall(b"HTTP/1.1 101 Switching")
+
+    thread = threading.Thread(target=hang_up, daemon=True)
+    thread.start()
+    with pytest.raises(ConnectionError):
+        asyncio.run(vb.AsyncCDPConnection.open(f"ws://127.0.0.1:{port}/x"))
+    thread.join(timeout=5)
+    server.close()
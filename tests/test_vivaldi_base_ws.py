@@ -0,0 +1,131 @@
+import socket
+import struct
+import threading
+
+import pytest
+
+import vivaldi_base as vb
+
+
+def server_frame(payload, opcode=vb.WS_TEXT, fin=True):
+    """An unmasked frame, as the browser sends them."""
+    data = payload.encode() if isinstance(payload, str) else payload
+    first = (0x80 if fin else 0) | opcode
+    if len(data) < 126:
+        header = struct.pack(">BB", first, len(data))
+    elif len(data) < 65536:
+        header = struct.pack(">BBH", first, 126, len(data))
+    else:
+        header = struct.pack(">BBQ", first, 127, len(data))
+    return header + data
+
+
+def unmask(frame):
+    """Return (opcode, payload) of a client frame built by _ws_frame."""
+    assert frame[0] & 0x80 and frame[1] & 0x80
+    length, pos = frame[1] & 0x7F, 2
+    if length == 126:
+        (length,), pos = struct.unpack(">H", frame[2:4]), 4
+    elif length == 127:
+        (length,), pos = struct.unpack(">Q", frame[2:10]), 10
+    mask_key = frame[pos:pos + 4]
+    return frame[0] & 0x0F, vb._ws_mask(frame[pos + 4:pos + 4 + length], mask_key)
+
+
+def drive(wire, sent=None):
+    """Run _ws_read_message over wire bytes. Returns (message, frames written back)."""
+    steps = vb._ws_read_message()
+    sent = [] if sent is None else sent
+    pos = 0
+    request = next(steps)
+    try:
+        while True:
+            if isinstance(request, int):
+                chunk, pos = wire[pos:pos + request], pos + request
+                assert len(chunk) == request, "read past the end of the wire"
+                request = steps.send(chunk)
+            else:
+                sent.append(request)
+                request = next(steps)
+    except StopIteration as done:
+        return done.value, sent
+
+
+@pytest.mark.parametrize("size", [0, 5, 125, 126, 65535, 65536])
+def test_single_frame_lengths(size):
+    text = "x" * size
+    assert drive(server_frame(text)) == (text, [])
+
+
+def test_masked_frame_from_peer():
+    assert drive(vb._ws_frame("hello"))[0] == "hello"
+
+
+def test_mask_round_trip():
+    key = b"\x01\x02\x03\x04"
+    data = bytes(range(256)) * 3
+    assert vb._ws_mask(vb._ws_mask(data, key), key) == data
+    assert vb._ws_mask(b"", key) == b""
+
+
+def test_fragments_are_reassembled():
+    wire = (
+        server_frame('{"id": 1, ', fin=False)
+        + server_frame('"result": "ü', vb.WS_CONTINUATION, fin=False)
+        + server_frame('nï"}', vb.WS_CONTINUATION)
+    )
+    assert drive(wire) == ('{"id": 1, "result": "ünï"}', [])
+
+
+def test_ping_between_fragments_is_answered():
+    wire = (
+        server_frame("part one, ", fin=False)
+        + server_frame(b"are you there", vb.WS_PING)
+        + server_frame(b"", vb.WS_PONG)
+        + server_frame("part two", vb.WS_CONTINUATION)
+    )
+    message, sent = drive(wire)
+    assert message == "part one, part two"
+    assert [unmask(frame) for frame in sent] == [(vb.WS_PONG, b"are you there")]
+
+
+def test_close_is_echoed_then_raises():
+    sent = []
+    with pytest.raises(ConnectionError, match="1001"):
+        drive(server_frame(struct.pack(">H", 1001) + b"going away", vb.WS_CLOSE), sent)
+    assert [unmask(frame) for frame in sent] == [(vb.WS_CLOSE, struct.pack(">H", 1001))]
+
+
+def test_close_without_code_replies_normal_closure():
+    sent = []
+    with pytest.raises(ConnectionError, match="1005"):
+        drive(server_frame(b"", vb.WS_CLOSE), sent)
+    assert [unmask(frame) for frame in sent] == [(vb.WS_CLOSE, struct.pack(">H", 1000))]
+
+
+@pytest.mark.parametrize("wire", [
+    server_frame("orphan", vb.WS_CONTINUATION),
+    server_frame("start", fin=False) + server_frame("another start"),
+])
+def test_bad_fragment_sequences(wire):
+    with pytest.raises(ConnectionError):
+        drive(wire)
+
+
+def test_ws_recv_over_socket():
+    client, server = socket.socketpair()
+    wire = (
+        server_frame("a" * 70000, fin=False)
+        + server_frame(b"ping", vb.WS_PING)
+        + server_frame("b", vb.WS_CONTINUATION)
+    )
+    # Written from a thread so a full socket buffer cannot deadlock the reader
+    writer = threading.Thread(target=server.sendall, args=(wire,))
+    writer.start()
+    try:
+        assert vb._ws_recv(client) == "a" * 70000 + "b"
+        writer.join()
+        assert unmask(server.recv(64)) == (vb.WS_PONG, b"ping")
+    finally:
+        client.close()
+        server.close()